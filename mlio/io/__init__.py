@@ -1,10 +1,16 @@
 from .pack import Pack
-from .compat import load, dump
+from .compat import load, dump, aload, adump
+from .cache import ObjectCache
+from .verification import VerificationPolicy
 from . import exc
 
 __all__ = [
     "Pack",
     "load",
     "dump",
+    "aload",
+    "adump",
+    "ObjectCache",
+    "VerificationPolicy",
     "exc"
 ]
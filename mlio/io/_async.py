@@ -0,0 +1,151 @@
+import os
+import asyncio
+import threading
+from contextlib import contextmanager
+from functools import partial
+
+
+class CoalescedCalls(object):
+    """
+    Run blocking calls in an executor from coroutines, so that concurrent awaits of calls with the same key share a
+    single run and its result.
+
+    Awaiters can be cancelled independently. The run itself is cancelled only when all of its awaiters are cancelled,
+    and only if it has not started yet, as a blocking call cannot be interrupted.
+    """
+
+    def __init__(self):
+        self._pending = {}
+
+    async def call(self, key, executor, func, *args, **kwargs):
+        """
+        Run a call in an executor, or join a pending run with the same key
+        :param typing.Hashable key: The key of the call. Calls with equal keys must be interchangeable.
+        :param concurrent.futures.Executor|None executor: The executor to run the call in. If None the default
+        executor of the event loop will be used.
+        :param typing.Callable func: The blocking function to call
+        :return: The result of the call
+        """
+        loop = asyncio.get_event_loop()
+        # Futures cannot be awaited from other event loops
+        key = (id(loop), key)
+
+        entry = self._pending.get(key)
+        if entry is None:
+            entry = [loop.run_in_executor(executor, partial(func, *args, **kwargs)), 0]
+            self._pending[key] = entry
+            entry[0].add_done_callback(partial(self._forget, key, entry))
+
+        future = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            entry[1] -= 1
+            if not entry[1] and not future.done():
+                future.cancel()
+
+    def _forget(self, key, entry, future):
+        """
+        Remove a finished run from the pending ones
+        """
+        if self._pending.get(key) is entry:
+            del self._pending[key]
+
+    def __len__(self):
+        return len(self._pending)
+
+
+class ReadWriteLock(object):
+    """
+    Lock that is shared by many readers or held by a single writer. Waiting writers are preferred over new readers,
+    so that a steady flow of reads does not starve writes.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        """
+        Hold the lock for reading
+        """
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        """
+        Hold the lock for writing
+        """
+        with self._condition:
+            self._waiting_writers += 1
+            try:
+                while self._writer or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class KeyedLocks(object):
+    """
+    Locks that are created on demand per key, and dropped when they are neither held nor awaited
+    """
+
+    def __init__(self):
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def hold(self, key):
+        """
+        Hold the lock of a key
+        :param typing.Hashable key: The key
+        """
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+    def __len__(self):
+        return len(self._locks)
+
+
+def file_identity(fp):
+    """
+    Get a key that identifies the file of a file object, so that calls on different file objects of the same file
+    can be coalesced
+    :param typing.IO fp: The file object
+    :rtype: tuple
+    """
+    try:
+        file_stat = os.fstat(fp.fileno())
+    except (AttributeError, OSError, ValueError):
+        return 'object', id(fp)
+    return 'file', file_stat.st_dev, file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns
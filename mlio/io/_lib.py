@@ -1,5 +1,10 @@
+import os
+import io as sys_io
+import struct
 import hashlib
 
+from .exc import MLIOPackSlotWrongChecksum, MLIOPackWrongFormat
+
 
 def file_as_blockiter(file, block_size=65536):
     """
@@ -14,16 +19,528 @@ def file_as_blockiter(file, block_size=65536):
         block = file.read(block_size)
 
 
-def hash_file_object(file, hasher=hashlib.sha256):
+def readinto_file(file, buffer):
+    """
+    Read data from a file object into a pre-allocated buffer. File objects without readinto() are supported too,
+    at the cost of an extra copy.
+    :param typing.IO[bytes] file: The file object to read data from
+    :param memoryview buffer: The writable buffer to fill
+    :return: The number of bytes that were read, 0 at the end of the stream
+    :rtype: int
     """
-    Calculate SHA256 hash for a file object
+    if hasattr(file, 'readinto'):
+        return file.readinto(buffer) or 0
+
+    data = file.read(len(buffer))
+    buffer[:len(data)] = data
+    return len(data)
+
+
+def hash_file_object(file, hasher=hashlib.sha256, block_size=65536):
+    """
+    Calculate the hash for a file object. Data are read in a single reusable buffer.
     :param typing.FileIO[bytes] file: The file object to read date from
     :param typing.Callable hasher: Factory function for the hasher object
+    :param int block_size: The size of the blocks that are read
     :rtype: str
     """
     h = hasher()
+    buffer = memoryview(bytearray(block_size))
 
-    for block in file_as_blockiter(file):
-        h.update(block)
+    n = readinto_file(file, buffer)
+    while n:
+        h.update(buffer[:n])
+        n = readinto_file(file, buffer)
 
     return h.hexdigest()
+
+
+class VerifiedFileObject(object):
+    """
+    Read-only file-like wrapper that hashes data while they are consumed and verifies the digest against
+    an expected one when the end of the stream is reached.
+
+    Every byte of the underlying stream is hashed exactly once. Re-reading data after a backward seek will not
+    hash them again, while seeking forward will consume (and hash) the skipped data.
+    """
+
+    def __init__(self, file, expected_hash, hasher=hashlib.sha256, error_message=None):
+        """
+        Initialize the wrapper
+        :param typing.IO[bytes] file: The file object to read data from. It must be positioned at the beginning.
+        :param str expected_hash: The expected hex digest of the whole stream
+        :param typing.Callable hasher: Factory function for the hasher object
+        :param str|None error_message: The message of the exception raised if verification fails
+        """
+        self._file = file
+        self._expected_hash = expected_hash
+        self._hasher = hasher()
+        self._error_message = error_message or "Data seem corrupted as they do not match the expected checksum"
+        self._position = 0
+        self._hashed_position = 0
+        self._eof = False
+        self._verified = False
+
+    @property
+    def is_verified(self):
+        """
+        Check if the whole stream was consumed and matched the expected hash
+        :rtype: bool
+        """
+        return self._verified
+
+    def _consume(self, start, data):
+        """
+        Update hash with the part of data that has not been hashed yet
+        :param int start: The position of the stream that data were read from
+        :param bytes|memoryview data: The data that were read
+        """
+        end = start + len(data)
+        if end > self._hashed_position >= start:
+            self._hasher.update(memoryview(data)[self._hashed_position - start:])
+            self._hashed_position = end
+        self._position = end
+
+    def _reached_eof(self):
+        """
+        Mark that the stream has been consumed and check its digest
+        """
+        if self._eof:
+            return
+        self._eof = True
+
+        if self._hasher.hexdigest() != self._expected_hash:
+            raise MLIOPackSlotWrongChecksum(self._error_message)
+        self._verified = True
+
+    def _hash_until(self, position=None):
+        """
+        Consume the underlying stream until a specific position is hashed
+        :param int|None position: The position that must be reached. If None it will consume the whole stream
+        """
+        if self._eof or (position is not None and position <= self._hashed_position):
+            return
+
+        if self._position != self._hashed_position:
+            self._file.seek(self._hashed_position, sys_io.SEEK_SET)
+            self._position = self._hashed_position
+
+        buffer = memoryview(bytearray(65536))
+        while position is None or self._hashed_position < position:
+            block_size = len(buffer) if position is None else min(len(buffer), position - self._hashed_position)
+            n = readinto_file(self._file, buffer[:block_size])
+            if not n:
+                self._reached_eof()
+                break
+            self._consume(self._position, buffer[:n])
+
+    def read(self, size=-1):
+        data = self._file.read(size)
+        self._consume(self._position, data)
+        if (not data and size != 0) or size is None or size < 0:
+            self._reached_eof()
+        return data
+
+    def readinto(self, b):
+        b = memoryview(b).cast('B')
+        n = readinto_file(self._file, b)
+        self._consume(self._position, b[:n])
+        if n == 0 and len(b):
+            self._reached_eof()
+        return n
+
+    def readline(self, size=-1):
+        line = self._file.readline(size)
+        self._consume(self._position, line)
+        if not line and size != 0:
+            self._reached_eof()
+        return line
+
+    def peek(self, size=0):
+        if hasattr(self._file, 'peek'):
+            return self._file.peek(size)
+
+        position = self._position
+        data = self.read(size or 1)
+        self.seek(position, sys_io.SEEK_SET)
+        return data
+
+    def seek(self, offset, whence=sys_io.SEEK_SET):
+        if whence == sys_io.SEEK_SET:
+            target = offset
+        elif whence == sys_io.SEEK_CUR:
+            target = self._position + offset
+        elif whence == sys_io.SEEK_END:
+            self._hash_until(None)
+            target = self._hashed_position + offset
+        else:
+            raise ValueError("Invalid whence ({!r})".format(whence))
+
+        if target < 0:
+            raise ValueError("Negative seek position {}".format(target))
+
+        self._hash_until(target)
+        if target != self._position:
+            self._file.seek(target, sys_io.SEEK_SET)
+            self._position = target
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self._file.seekable()
+
+    def writable(self):
+        return False
+
+    def verify(self, drain=True):
+        """
+        Verify the hash of the stream. Must be called after consumer has finished reading.
+        :param bool drain: If True, trailing data that were not consumed will be read and hashed. Otherwise
+        unconsumed data are treated as verification failure.
+        """
+        if not self._eof:
+            if not drain:
+                # Consumers usually stop at the end of their format without reading the end of the stream
+                self._hash_until(self._hashed_position + 1)
+                if not self._eof:
+                    raise MLIOPackSlotWrongChecksum("{} (stream was not consumed till the end)".format(
+                        self._error_message))
+            self._hash_until(None)
+
+        if not self._verified:
+            raise MLIOPackSlotWrongChecksum(self._error_message)
+
+
+class HashingFileObject(object):
+    """
+    Write-only file-like wrapper that hashes data on the fly while they are written to the underlying file object
+    """
+
+    def __init__(self, file, hasher=hashlib.sha256):
+        """
+        Initialize the wrapper
+        :param typing.IO[bytes] file: The file object to forward data to
+        :param typing.Callable hasher: Factory function for the hasher object
+        """
+        self._file = file
+        self._hasher = hasher()
+        self._size = 0
+
+    @property
+    def size(self):
+        """
+        The total number of bytes that have been written
+        :rtype: int
+        """
+        return self._size
+
+    def hexdigest(self):
+        """
+        Get the hex digest of the data that have been written so far
+        :rtype: str
+        """
+        return self._hasher.hexdigest()
+
+    def write(self, b):
+        b = memoryview(b).cast('B')
+        self._hasher.update(b)
+        self._file.write(b)
+        self._size += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._size
+
+    def flush(self):
+        self._file.flush()
+
+    def readable(self):
+        return False
+
+    def seekable(self):
+        return False
+
+    def writable(self):
+        return True
+
+
+# Layout of the local file header of a zip member (see PKWARE APPNOTE 4.3.7)
+_ZIP_LOCAL_HEADER_STRUCT = struct.Struct("<4s2B4HL2L2H")
+_ZIP_LOCAL_HEADER_SIGNATURE = b"PK\003\004"
+_ZIP_LOCAL_HEADER_FILENAME_LENGTH = 10
+_ZIP_LOCAL_HEADER_EXTRA_FIELD_LENGTH = 11
+
+
+def zip_member_data_offset(buffer, zip_info):
+    """
+    Calculate the absolute offset where the data of a zip member starts. The length of the extra field in the
+    local header may differ from the one in the central directory, so the local header must be parsed.
+    :param bytes|memoryview|mmap.mmap buffer: A buffer with the contents of the whole zip file
+    :param zipfile.ZipInfo zip_info: The info object of the member
+    :rtype: int
+    """
+    return zip_info.header_offset + _local_header_size(buffer, zip_info.header_offset, zip_info.filename)
+
+
+def read_zip_member_data_offset(fh, zip_info):
+    """
+    Same as zip_member_data_offset() but it will read the local header from a file object
+    :param typing.IO[bytes] fh: The file object of the zip file
+    :param zipfile.ZipInfo zip_info: The info object of the member
+    :rtype: int
+    """
+    fh.seek(zip_info.header_offset, sys_io.SEEK_SET)
+    header = fh.read(_ZIP_LOCAL_HEADER_STRUCT.size)
+    if len(header) != _ZIP_LOCAL_HEADER_STRUCT.size:
+        raise MLIOPackWrongFormat("Truncated local header of member {}".format(zip_info.filename))
+
+    return zip_info.header_offset + _local_header_size(header, 0, zip_info.filename)
+
+
+def _local_header_size(buffer, offset, filename):
+    """
+    Parse the local header of a zip member and calculate its size
+    :param bytes|memoryview|mmap.mmap buffer: A buffer that contains the local header
+    :param int offset: The offset of the local header in the buffer
+    :param str filename: The name of the member
+    :rtype: int
+    """
+    header = _ZIP_LOCAL_HEADER_STRUCT.unpack_from(buffer, offset)
+    if header[0] != _ZIP_LOCAL_HEADER_SIGNATURE:
+        raise MLIOPackWrongFormat("Bad magic number for local header of member {}".format(filename))
+
+    return _ZIP_LOCAL_HEADER_STRUCT.size \
+        + header[_ZIP_LOCAL_HEADER_FILENAME_LENGTH] \
+        + header[_ZIP_LOCAL_HEADER_EXTRA_FIELD_LENGTH]
+
+
+# Extra field used to pad local headers so that member data are aligned, as defined by Android's zipalign
+ZIP_ALIGNMENT_EXTRA_ID = 0xD935
+_ZIP_EXTRA_HEADER_STRUCT = struct.Struct("<2H")
+_ZIP_ALIGNMENT_EXTRA_MIN_SIZE = _ZIP_EXTRA_HEADER_STRUCT.size + 2
+# Size of the zip64 extra field that ZipFile adds in local headers of large members
+_ZIP64_LOCAL_EXTRA_SIZE = 20
+
+
+def zip_alignment_extra(header_offset, zip_info, alignment, data_offset=0, zip64=False):
+    """
+    Create the extra field that will pad the local header of a new zip member so that a specific offset
+    of its data is aligned in the zip file.
+    :param int header_offset: The offset where the local header of the member will be written
+    :param zipfile.ZipInfo zip_info: The info object of the member. Any existing extra data are preserved.
+    :param int alignment: The requested alignment in bytes
+    :param int data_offset: The offset inside the data of the member that must be aligned
+    :param bool zip64: If True, the member will be written with zip64 extensions
+    :return: The extra data of the member, including the padding
+    :rtype: bytes
+    """
+    unpadded_offset = header_offset \
+        + _ZIP_LOCAL_HEADER_STRUCT.size \
+        + len(zip_info.filename.encode('utf-8')) \
+        + len(zip_info.extra) \
+        + (_ZIP64_LOCAL_EXTRA_SIZE if zip64 else 0) \
+        + data_offset
+
+    padding = -unpadded_offset % alignment
+    while padding and padding < _ZIP_ALIGNMENT_EXTRA_MIN_SIZE:
+        padding += alignment
+    if not padding:
+        return zip_info.extra
+
+    return zip_info.extra \
+        + _ZIP_EXTRA_HEADER_STRUCT.pack(ZIP_ALIGNMENT_EXTRA_ID, padding - _ZIP_EXTRA_HEADER_STRUCT.size) \
+        + struct.pack("<H", min(alignment, 0xFFFF)) \
+        + b"\0" * (padding - _ZIP_ALIGNMENT_EXTRA_MIN_SIZE)
+
+
+def zip_member_alignment(zip_info):
+    """
+    Get the alignment that was requested for a zip member through the alignment extra field
+    :param zipfile.ZipInfo zip_info: The info object of the member
+    :return: The alignment in bytes or None if the member is not aligned
+    :rtype: int|None
+    """
+    extra = zip_info.extra
+    position = 0
+    while position + _ZIP_EXTRA_HEADER_STRUCT.size <= len(extra):
+        extra_id, extra_size = _ZIP_EXTRA_HEADER_STRUCT.unpack_from(extra, position)
+        position += _ZIP_EXTRA_HEADER_STRUCT.size
+        if extra_id == ZIP_ALIGNMENT_EXTRA_ID and extra_size >= 2:
+            return struct.unpack_from("<H", extra, position)[0]
+        position += extra_size
+    return None
+
+
+def strip_zip_alignment_padding(extra):
+    """
+    Remove the padding from the alignment extra field of a zip member, keeping only the requested alignment. The
+    padding is needed only in the local header, it must not be repeated in the central directory.
+    :param bytes extra: The extra data of the member
+    :return: The extra data without padding
+    :rtype: bytes
+    """
+    stripped = b""
+    position = 0
+    while position + _ZIP_EXTRA_HEADER_STRUCT.size <= len(extra):
+        extra_id, extra_size = _ZIP_EXTRA_HEADER_STRUCT.unpack_from(extra, position)
+        end = position + _ZIP_EXTRA_HEADER_STRUCT.size + extra_size
+        if extra_id == ZIP_ALIGNMENT_EXTRA_ID and extra_size > 2:
+            stripped += _ZIP_EXTRA_HEADER_STRUCT.pack(ZIP_ALIGNMENT_EXTRA_ID, 2) \
+                + extra[position + _ZIP_EXTRA_HEADER_STRUCT.size:position + _ZIP_ALIGNMENT_EXTRA_MIN_SIZE]
+        else:
+            stripped += extra[position:end]
+        position = end
+    return stripped + extra[position:]
+
+
+class MemoryViewFileObject(object):
+    """
+    Read-only seekable file-like object on top of a buffer. Data are not copied unless they are requested
+    through read() calls, consumers that support readinto() or getbuffer() can work without intermediate copies.
+    """
+
+    def __init__(self, buffer):
+        """
+        Initialize the file object
+        :param bytes|memoryview buffer: The buffer to read data from
+        """
+        self._view = memoryview(buffer).cast('B')
+        self._position = 0
+
+    def getbuffer(self):
+        """
+        Get a read-only view on the whole buffer
+        :rtype: memoryview
+        """
+        return self._view.toreadonly() if hasattr(self._view, 'toreadonly') else self._view
+
+    def _remaining(self, size):
+        """
+        Get the view on the next chunk of data and advance position
+        :param int|None size: The maximum size of the chunk. Negative or None for the remaining buffer
+        :rtype: memoryview
+        """
+        start = min(self._position, len(self._view))
+        end = len(self._view) if size is None or size < 0 else min(start + size, len(self._view))
+        self._position = end
+        return self._view[start:end]
+
+    def read(self, size=-1):
+        return self._remaining(size).tobytes()
+
+    def readinto(self, b):
+        chunk = self._remaining(len(b))
+        memoryview(b).cast('B')[:len(chunk)] = chunk
+        return len(chunk)
+
+    def readline(self, size=-1):
+        start = min(self._position, len(self._view))
+        end = len(self._view) if size is None or size < 0 else min(start + size, len(self._view))
+        for block_start in range(start, end, 65536):
+            newline = self._view[block_start:min(block_start + 65536, end)].tobytes().find(b'\n')
+            if newline >= 0:
+                end = block_start + newline + 1
+                break
+        self._position = end
+        return self._view[start:end].tobytes()
+
+    def peek(self, size=0):
+        start = min(self._position, len(self._view))
+        return self._view[start:start + max(size, 1)].tobytes()
+
+    def seek(self, offset, whence=sys_io.SEEK_SET):
+        if whence == sys_io.SEEK_SET:
+            position = offset
+        elif whence == sys_io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == sys_io.SEEK_END:
+            position = len(self._view) + offset
+        else:
+            raise ValueError("Invalid whence ({!r})".format(whence))
+
+        if position < 0:
+            raise ValueError("Negative seek position {}".format(position))
+        self._position = position
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def writable(self):
+        return False
+
+    def close(self):
+        # Views exported to consumers must stay valid, so we only drop our reference
+        self._view = memoryview(b'')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class PositionalFileReader(sys_io.RawIOBase):
+    """
+    Read-only raw file object on top of a file descriptor that keeps its own position. Data are read with
+    positional reads, so multiple readers can share the same descriptor without affecting each other.
+    """
+
+    def __init__(self, fileno):
+        """
+        Initialize the reader
+        :param int fileno: The file descriptor to read from. It will not be closed by the reader.
+        """
+        super(PositionalFileReader, self).__init__()
+        self._fileno = fileno
+        self._position = 0
+
+    @classmethod
+    def is_supported(cls):
+        """
+        Check if positional reads are supported on the current platform
+        :rtype: bool
+        """
+        return hasattr(os, 'pread')
+
+    def readinto(self, b):
+        data = os.pread(self._fileno, len(b), self._position)
+        n = len(data)
+        memoryview(b).cast('B')[:n] = data
+        self._position += n
+        return n
+
+    def seek(self, offset, whence=sys_io.SEEK_SET):
+        if whence == sys_io.SEEK_SET:
+            position = offset
+        elif whence == sys_io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == sys_io.SEEK_END:
+            position = os.fstat(self._fileno).st_size + offset
+        else:
+            raise ValueError("Invalid whence ({!r})".format(whence))
+
+        if position < 0:
+            raise ValueError("Negative seek position {}".format(position))
+        self._position = position
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
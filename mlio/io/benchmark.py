@@ -0,0 +1,371 @@
+"""
+Benchmarks of the hot paths of packs: dump and load throughput, open latency, manifest updates and hashing.
+
+Results are written as JSON and can be compared against the results of a previous run, e.g. of the main branch:
+
+    python -m mlio.io.benchmark --output baseline.json
+    python -m mlio.io.benchmark --baseline baseline.json --threshold 0.1
+
+The exit status is non-zero if any benchmark is slower than its baseline by more than the threshold.
+"""
+import os
+import io as sys_io
+import gc
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+from .pack import Pack
+
+# The version of the format of the results
+RESULTS_VERSION = 1
+
+DEFAULT_SLOT_COUNTS = (1, 100, 1000)
+DEFAULT_OBJECT_SIZES = (1024, 1024 * 1024, 64 * 1024 * 1024)
+DEFAULT_SERIALIZERS = ('default', 'numpy-ndarray', 'numpy-chunked-ndarray', 'pickle-out-of-band')
+
+# The size of objects of benchmarks that depend on the number of slots
+SMALL_OBJECT_SIZE = 1024
+
+_SIZE_UNITS = {'': 1, 'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+
+def parse_size(value):
+    """
+    Parse a human readable size (e.g. 64KB, 1GB)
+    :param str value: The size, in bytes if no unit is given
+    :rtype: int
+    """
+    value = value.strip().upper()
+    number = value.rstrip('KMGB')
+    unit = value[len(number):]
+    if not number.isdigit() or unit not in _SIZE_UNITS:
+        raise ValueError("Invalid size: {}".format(value))
+    return int(number) * _SIZE_UNITS[unit]
+
+
+def _make_object(size, seed=0):
+    """
+    Create an incompressible array object of a specific size
+    :param int size: The size of the object in bytes
+    :param int seed: The seed of the random data
+    :rtype: numpy.ndarray
+    """
+    return np.random.RandomState(seed).randint(0, 256, size=size, dtype=np.uint8)
+
+
+def _make_serializer(serializer_type):
+    """
+    Instantiate a serializer by its type
+    :param str serializer_type: The type of the serializer
+    :rtype: mlio.io.serializers.base.SerializerBase
+    """
+    from .serializers import get_serializer_by_type
+
+    return get_serializer_by_type(serializer_type)()
+
+
+def _is_serializer_supported(serializer_type):
+    """
+    Check if a serializer can be used in the current environment
+    :param str serializer_type: The type of the serializer
+    :rtype: bool
+    """
+    from .serializers import get_serializer_by_type
+
+    serializer_class = get_serializer_by_type(serializer_type)
+    return getattr(serializer_class, 'is_supported', lambda: True)()
+
+
+def measure(func, repeat=3):
+    """
+    Measure the duration and the peak memory of a function. The function is called once more under tracemalloc,
+    so that tracing does not affect the measured durations.
+    :param typing.Callable[[], None] func: The function to measure. It is called once per repetition.
+    :param int repeat: The number of timed repetitions
+    :return: The durations in seconds and the peak of allocated memory in bytes
+    :rtype: (list[float], int)
+    """
+    durations = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return durations, peak_memory
+
+
+def _result(name, params, durations, peak_memory, processed_bytes=None):
+    """
+    Build the record of a benchmark result
+    :param str name: The name of the benchmark
+    :param dict params: The parameters of the benchmark
+    :param list[float] durations: The durations of all repetitions in seconds
+    :param int peak_memory: The peak of allocated memory in bytes
+    :param int|None processed_bytes: The bytes processed in each repetition, to calculate throughput
+    :rtype: dict
+    """
+    seconds = sorted(durations)[len(durations) // 2]
+    result = {
+        'name': name,
+        'params': params,
+        'seconds': seconds,
+        'min_seconds': min(durations),
+        'repeat': len(durations),
+        'peak_memory_bytes': peak_memory
+    }
+    if processed_bytes is not None:
+        result['throughput_mb_s'] = processed_bytes / (1024 * 1024) / seconds if seconds else None
+    return result
+
+
+def _new_pack_path(directory):
+    """
+    Get the path of a new pack file
+    :param str directory: The working directory of the benchmarks
+    :rtype: str
+    """
+    fd, path = tempfile.mkstemp(dir=directory, suffix='.pack')
+    os.close(fd)
+    os.unlink(path)
+    return path
+
+
+def bench_dump_load(directory, object_size, serializer_type, repeat=3):
+    """
+    Measure the throughput of dumping and loading a single object
+    :param str directory: The working directory of the benchmarks
+    :param int object_size: The size of the object in bytes
+    :param str serializer_type: The type of the serializer
+    :param int repeat: The number of repetitions
+    :rtype: list[dict]
+    """
+    obj = _make_object(object_size)
+    params = {'object_size': object_size, 'serializer': serializer_type}
+    path = _new_pack_path(directory)
+
+    def dump():
+        with open(path, 'w+b') as f:
+            with Pack(f) as pck:
+                pck.dump('slot', obj, serializer=_make_serializer(serializer_type))
+
+    def load():
+        with open(path, 'rb') as f:
+            with Pack(f, mode='r') as pck:
+                pck.load('slot')
+
+    try:
+        results = [_result('dump', params, *measure(dump, repeat), processed_bytes=object_size)]
+        results.append(_result('load', params, *measure(load, repeat), processed_bytes=object_size))
+    finally:
+        os.unlink(path)
+    return results
+
+
+def bench_slot_count(directory, slot_count, repeat=3):
+    """
+    Measure the operations that depend on the number of slots: opening a pack and updating its manifest
+    :param str directory: The working directory of the benchmarks
+    :param int slot_count: The number of slots in the pack
+    :param int repeat: The number of repetitions
+    :rtype: list[dict]
+    """
+    params = {'slot_count': slot_count}
+    path = _new_pack_path(directory)
+    obj = _make_object(SMALL_OBJECT_SIZE)
+
+    def dump_many():
+        with open(path, 'w+b') as f:
+            with Pack(f) as pck:
+                with pck.transaction():
+                    for index in range(slot_count):
+                        pck.dump('slot-{}'.format(index), obj)
+
+    def open_pack():
+        with open(path, 'rb') as f:
+            with Pack(f, mode='r'):
+                pass
+
+    try:
+        results = [_result('dump_transaction', params, *measure(dump_many, repeat))]
+        results.append(_result('open', params, *measure(open_pack, repeat)))
+
+        with open(path, 'r+b') as f:
+            with Pack(f) as pck:
+                results.append(_result('update_manifest', params, *measure(pck._update_manifest, repeat)))
+    finally:
+        os.unlink(path)
+    return results
+
+
+def bench_hash_file_object(object_size, repeat=3):
+    """
+    Measure the throughput of hashing a file object
+    :param int object_size: The size of the data in bytes
+    :param int repeat: The number of repetitions
+    :rtype: list[dict]
+    """
+    from ._lib import hash_file_object
+
+    data = _make_object(object_size).tobytes()
+
+    def hash_data():
+        hash_file_object(sys_io.BytesIO(data))
+
+    return [_result('hash_file_object', {'object_size': object_size}, *measure(hash_data, repeat),
+                    processed_bytes=object_size)]
+
+
+def run_benchmarks(slot_counts=DEFAULT_SLOT_COUNTS, object_sizes=DEFAULT_OBJECT_SIZES,
+                   serializers=DEFAULT_SERIALIZERS, repeat=3, directory=None):
+    """
+    Run all the benchmarks
+    :param typing.Iterable[int] slot_counts: The numbers of slots of the benchmarks that depend on them
+    :param typing.Iterable[int] object_sizes: The sizes in bytes of objects of the throughput benchmarks
+    :param typing.Iterable[str] serializers: The types of serializers of the throughput benchmarks. Serializers
+    that are not supported in the current environment are skipped.
+    :param int repeat: The number of repetitions of each benchmark
+    :param str|None directory: The directory to write packs in. If None a temporary directory will be used.
+    :return: The results in a jsonable format
+    :rtype: dict
+    """
+    from .. import __version__
+
+    work_directory = tempfile.mkdtemp(dir=directory)
+    results = []
+    try:
+        for object_size in object_sizes:
+            for serializer_type in serializers:
+                if _is_serializer_supported(serializer_type):
+                    results.extend(bench_dump_load(work_directory, object_size, serializer_type, repeat))
+            results.extend(bench_hash_file_object(object_size, repeat))
+
+        for slot_count in slot_counts:
+            results.extend(bench_slot_count(work_directory, slot_count, repeat))
+    finally:
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+    return {
+        'version': RESULTS_VERSION,
+        'environment': {
+            'mlio': __version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__
+        },
+        'results': results
+    }
+
+
+def _result_key(result):
+    """
+    Get the key that matches results of the same benchmark across runs
+    :param dict result: The record of a result
+    :rtype: (str, str)
+    """
+    return result['name'], json.dumps(result['params'], sort_keys=True)
+
+
+def compare_results(results, baseline, threshold=0.1):
+    """
+    Compare results with the results of a baseline run
+    :param dict results: The results of run_benchmarks()
+    :param dict baseline: The results of a previous run
+    :param float threshold: The relative slow down above which a benchmark is considered regressed
+    :return: The comparison of each benchmark that exists in both runs
+    :rtype: list[dict]
+    """
+    baseline_by_key = {
+        _result_key(result): result
+        for result in baseline.get('results', [])
+    }
+
+    comparisons = []
+    for result in results['results']:
+        baseline_result = baseline_by_key.get(_result_key(result))
+        if baseline_result is None or not baseline_result['seconds']:
+            continue
+        ratio = result['seconds'] / baseline_result['seconds']
+        comparisons.append({
+            'name': result['name'],
+            'params': result['params'],
+            'baseline_seconds': baseline_result['seconds'],
+            'seconds': result['seconds'],
+            'ratio': ratio,
+            'regressed': ratio > 1 + threshold
+        })
+    return comparisons
+
+
+def _parse_list(value, item_parser=str):
+    """
+    Parse a comma separated list of command line
+    :param str value: The comma separated values
+    :param typing.Callable item_parser: The parser of each item
+    :rtype: list
+    """
+    return [item_parser(item) for item in value.split(',') if item.strip()]
+
+
+def main(argv=None):
+    """
+    Entry point of the command line
+    :param list[str]|None argv: The arguments. If None the arguments of the process are used.
+    :return: The exit status, 1 if any benchmark regressed compared to the baseline
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(prog='python -m mlio.io.benchmark',
+                                     description="Benchmark the dump and load paths of mlio packs")
+    parser.add_argument('--slot-counts', type=lambda v: _parse_list(v, int),
+                        default=list(DEFAULT_SLOT_COUNTS), help="Comma separated numbers of slots, e.g. 1,100,10000")
+    parser.add_argument('--object-sizes', type=lambda v: _parse_list(v, parse_size),
+                        default=list(DEFAULT_OBJECT_SIZES), help="Comma separated sizes of objects, e.g. 1KB,1MB,1GB")
+    parser.add_argument('--serializers', type=_parse_list, default=list(DEFAULT_SERIALIZERS),
+                        help="Comma separated types of serializers")
+    parser.add_argument('--repeat', type=int, default=3, help="Repetitions of each benchmark")
+    parser.add_argument('--directory', default=None, help="Directory to write packs in")
+    parser.add_argument('--output', default=None, help="File to write the JSON results in, instead of stdout")
+    parser.add_argument('--baseline', default=None, help="JSON results of a previous run to compare with")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="Relative slow down that is considered a regression (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(slot_counts=args.slot_counts, object_sizes=args.object_sizes,
+                             serializers=args.serializers, repeat=args.repeat, directory=args.directory)
+
+    regressed = []
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as f:
+            results['comparison'] = compare_results(results, json.load(f), threshold=args.threshold)
+        regressed = [comparison for comparison in results['comparison'] if comparison['regressed']]
+
+    output = json.dumps(results, indent=2)
+    if args.output is None:
+        print(output)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+    for comparison in regressed:
+        sys.stderr.write("Regression: {} {} is {:.0%} slower than baseline\n".format(
+            comparison['name'], json.dumps(comparison['params'], sort_keys=True), comparison['ratio'] - 1))
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,245 @@
+import os
+import mmap
+import time
+import tempfile
+from collections import namedtuple
+
+from .exc import MLIOPackExternalObjectError
+
+
+class BlobStoreGCStats(namedtuple('BlobStoreGCStats',
+                                  ['objects_before', 'objects_after', 'bytes_before', 'bytes_after'])):
+    """
+    Statistics about the garbage collection of a blob store
+    """
+
+    @property
+    def reclaimed_objects(self):
+        """:rtype: int"""
+        return self.objects_before - self.objects_after
+
+    @property
+    def reclaimed_bytes(self):
+        """:rtype: int"""
+        return self.bytes_before - self.bytes_after
+
+
+class BlobStore(object):
+    """
+    A content-addressed store of pack objects that is shared by many packs. Packs that are opened with a blob store
+    keep the objects of their slots in the store instead of their archive and only reference them by their name in
+    the manifest. The name of an object is derived from the hash of its data, so identical objects of different packs
+    are stored once.
+
+    Objects are never removed when slots are removed, as the store does not know which packs reference them. Objects
+    that are not referenced by any pack are removed by collect_garbage().
+
+    store = BlobStore(LocalDirectoryRepository('blobs', '/srv/models/blobs', writable=True))
+    with open('customer-1.pack', 'w+b') as f:
+        with Pack(f, blob_store=store) as pck:
+            pck.dump('embeddings', embeddings)
+    """
+
+    # The sub-directory of the repository where objects are stored
+    OBJECTS_DIRECTORY = 'objects'
+
+    # The suffix of temporary files of objects that are being written
+    TEMP_SUFFIX = '.tmp'
+
+    def __init__(self, repository):
+        """
+        Initialize a blob store on a local directory repository
+        :param mlio.resources.repositories.LocalDirectoryRepository repository: The repository to store objects in.
+        It must be writable in order to dump slots or collect garbage.
+        """
+        self._repository = repository
+        self._objects_path = os.path.join(repository.directory_path, self.OBJECTS_DIRECTORY)
+
+    @property
+    def repository(self):
+        """:rtype: mlio.resources.repositories.LocalDirectoryRepository"""
+        return self._repository
+
+    def _check_writable(self):
+        """
+        Ensure that the store can be modified
+        """
+        from ..resources.exceptions import RepositoryReadOnlyError
+
+        if not self._repository.is_writable:
+            raise RepositoryReadOnlyError("Repository[{}]: Cannot modify blob store because repository is readonly"
+                                          .format(self._repository.id))
+
+    def _object_path(self, name):
+        """
+        Get the absolute path of an object
+        :param str name: The name of the object
+        :rtype: str
+        """
+        if not name or name.startswith('.') or '/' in name or os.sep in name or name.endswith(self.TEMP_SUFFIX):
+            raise ValueError("Invalid name of blob store object: {}".format(name))
+        return os.path.join(self._objects_path, name)
+
+    def has(self, name):
+        """
+        Check if an object exists in the store
+        :param str name: The name of the object
+        :rtype: bool
+        """
+        return os.path.isfile(self._object_path(name))
+
+    def object_size(self, name):
+        """
+        Get the size of the stored data of an object
+        :param str name: The name of the object
+        :rtype: int
+        """
+        try:
+            return os.path.getsize(self._object_path(name))
+        except FileNotFoundError:
+            raise MLIOPackExternalObjectError("Object {} was not found in the blob store".format(name))
+
+    def put(self, name, fp, codec, compresslevel=None):
+        """
+        Store an object, unless it already exists. Data are written in a temporary file that is atomically
+        renamed, so that concurrent writers and readers never see partial objects.
+        :param str name: The name of the object
+        :param typing.IO[bytes] fp: The file object to read the uncompressed data from
+        :param mlio.io.compression.CompressionCodecBase codec: The codec to compress data with. It must be a codec
+        that is not applied by the zip archive.
+        :param int|None compresslevel: The compression level, if None the default of the codec will be used
+        :return: True if the object was written or False if it already existed
+        :rtype: bool
+        """
+        self._check_writable()
+        path = self._object_path(name)
+
+        if os.path.isfile(path):
+            # Refresh it so that a concurrent garbage collection spares it until it is referenced by a manifest
+            os.utime(path)
+            return False
+
+        os.makedirs(self._objects_path, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self._objects_path, suffix=self.TEMP_SUFFIX)
+        try:
+            with open(fd, 'wb') as f:
+                codec.copy_compressed(fp, f, compresslevel)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return True
+
+    def open_object(self, name):
+        """
+        Open the stored data of an object for reading
+        :param str name: The name of the object
+        :rtype: typing.IO[bytes]
+        """
+        try:
+            return open(self._object_path(name), 'rb')
+        except FileNotFoundError:
+            raise MLIOPackExternalObjectError("Object {} was not found in the blob store".format(name))
+
+    def map_object(self, name):
+        """
+        Get a read-only memory view on the stored data of an object
+        :param str name: The name of the object
+        :return: The view or None if the object cannot be memory-mapped
+        :rtype: memoryview|None
+        """
+        with self.open_object(name) as f:
+            try:
+                # The map stays valid after closing the file, it is released with the last view on it
+                return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            except (OSError, ValueError):
+                return None
+
+    def object_identity(self, name, hash_algorithm, data_hash):
+        """
+        Get the identity of an object for the memo of verified objects. See VerifiedObjectsMemo.object_identity()
+        :param str name: The name of the object
+        :param str hash_algorithm: The type of the hash algorithm of the object
+        :param str data_hash: The hash of the object data
+        :return: The identity of the object or None if it does not exist
+        :rtype: tuple|None
+        """
+        try:
+            file_stat = os.stat(self._object_path(name))
+        except OSError:
+            return None
+        return (file_stat.st_dev, file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns, 0,
+                hash_algorithm, data_hash)
+
+    def iter_objects(self):
+        """
+        Iterate over the names of all stored objects
+        :rtype: typing.Iterator[str]
+        """
+        try:
+            names = sorted(os.listdir(self._objects_path))
+        except FileNotFoundError:
+            return
+        for name in names:
+            if not name.endswith(self.TEMP_SUFFIX):
+                yield name
+
+    def collect_garbage(self, packs, grace_period=3600):
+        """
+        Remove the objects that are not referenced by any of the given packs (mark and sweep).
+
+        All packs that use the store must be given, objects of any other pack will be lost. Objects that were
+        stored or reused within the grace period are kept, so that packs that are being written concurrently do not
+        lose objects before their manifest references them. Left-overs of interrupted writes are removed too.
+        :param typing.Iterable[mlio.io.Pack] packs: All the packs that use the store
+        :param int|float grace_period: The age in seconds under which unreferenced objects are kept
+        :return: Statistics of the collection
+        :rtype: BlobStoreGCStats
+        """
+        self._check_writable()
+
+        # Mark
+        referenced_objects = set()
+        for pack in packs:
+            referenced_objects.update(pack._external_pack_objects())
+
+        # Sweep
+        objects_before = objects_after = bytes_before = bytes_after = 0
+        expiration_time = time.time() - grace_period
+        try:
+            names = os.listdir(self._objects_path)
+        except FileNotFoundError:
+            names = []
+
+        for name in names:
+            path = os.path.join(self._objects_path, name)
+            try:
+                file_stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            objects_before += 1
+            bytes_before += file_stat.st_size
+
+            if name in referenced_objects or file_stat.st_mtime > expiration_time:
+                objects_after += 1
+                bytes_after += file_stat.st_size
+                continue
+
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+        return BlobStoreGCStats(
+            objects_before=objects_before,
+            objects_after=objects_after,
+            bytes_before=bytes_before,
+            bytes_after=bytes_after
+        )
+
+    def __str__(self):
+        return "<BlobStore: {}>".format(self._repository)
+
+    __repr__ = __str__
@@ -0,0 +1,192 @@
+import weakref
+import threading
+from collections import namedtuple, OrderedDict
+
+
+class CacheInfo(namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'entries', 'size_bytes'])):
+    """
+    Snapshot of the statistics of an object cache
+    """
+
+    @property
+    def hit_ratio(self):
+        """
+        The ratio of lookups that were served by the cache
+        :rtype: float
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ObjectCache(object):
+    """
+    A thread-safe LRU cache of unserialized objects, keyed by the content hash of their serialized data.
+    Slots that share the same pack object, even in different packs, are unserialized only once. The same
+    instance can be given to multiple Pack objects of the same process.
+
+    Cached objects are returned as they are, without copying them. Callers must not modify loaded objects
+    in-place when a cache is used.
+
+    pack_cache = ObjectCache(max_bytes=512 * 1024 * 1024)
+    with Pack(fp, cache=pack_cache) as pck:
+        model = pck.load('model')
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, weak=False):
+        """
+        Initialize a new cache
+        :param int|None max_entries: The maximum number of cached objects. If None the number is not limited.
+        :param int|None max_bytes: The maximum total size of serialized data of the cached objects. Size in
+        memory of unserialized objects cannot be measured reliably, so this is used as an estimation of it.
+        If None the size is not limited.
+        :param bool weak: If True, only weak references of the objects will be kept, so that objects are cached
+        as long as they are used elsewhere. Objects that do not support weak references are not cached at all.
+        """
+        if max_entries is not None and max_entries < 0:
+            raise ValueError("The maximum number of entries cannot be negative")
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError("The maximum size cannot be negative")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.weak = weak
+
+        self._entries = OrderedDict()
+        self._size_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        """
+        Get a cached object, marking it as recently used
+        :param typing.Hashable key: The key of the object
+        :param T default: The value that will be returned if the object is not cached
+        :return: The cached object or the default value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                obj, size = entry
+                if self.weak:
+                    obj = obj()
+                    if obj is None:
+                        # Referent was garbage collected
+                        self._discard(key)
+                        entry = None
+            if entry is None:
+                self._misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return obj
+
+    def put(self, key, obj, size=0):
+        """
+        Add an object in the cache, evicting the least recently used ones if it is needed
+        :param typing.Hashable key: The key of the object
+        :param T obj: The object to cache
+        :param int size: The size of the object in bytes
+        :return: True if the object was cached
+        :rtype: bool
+        """
+        if self.max_bytes is not None and size > self.max_bytes:
+            return False
+
+        if self.weak:
+            try:
+                obj = weakref.ref(obj, self._weak_callback(key))
+            except TypeError:
+                return False
+
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (obj, size)
+            self._size_bytes += size
+            self._evict()
+        return key in self._entries
+
+    def _weak_callback(self, key):
+        """
+        Create the callback that drops an entry when its object is garbage collected
+        :param typing.Hashable key: The key of the entry
+        """
+        self_ref = weakref.ref(self)
+
+        def callback(ref):
+            cache = self_ref()
+            if cache is None:
+                return
+            with cache._lock:
+                entry = cache._entries.get(key)
+                if entry is not None and entry[0] is ref:
+                    cache._discard(key)
+        return callback
+
+    def _discard(self, key):
+        """
+        Remove an entry without counting it as eviction
+        :param typing.Hashable key: The key of the entry
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size_bytes -= entry[1]
+
+    def _evict(self):
+        """
+        Evict least recently used entries until the cache fits in its budget
+        """
+        while self._entries and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries)
+                or (self.max_bytes is not None and self._size_bytes > self.max_bytes)):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._size_bytes -= size
+            self._evictions += 1
+
+    def invalidate(self, key):
+        """
+        Remove an object from the cache
+        :param typing.Hashable key: The key of the object
+        """
+        with self._lock:
+            self._discard(key)
+
+    def clear(self):
+        """
+        Remove all objects from the cache. Statistics are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    @property
+    def hits(self):
+        """:rtype: int"""
+        return self._hits
+
+    @property
+    def misses(self):
+        """:rtype: int"""
+        return self._misses
+
+    def info(self):
+        """
+        Get the statistics of the cache
+        :rtype: CacheInfo
+        """
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size_bytes=self._size_bytes
+            )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
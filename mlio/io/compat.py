@@ -1,4 +1,8 @@
+import asyncio
+from functools import partial
+
 from .pack import Pack
+from ._async import CoalescedCalls, KeyedLocks, file_identity
 
 _DEFAULT_SLOT = "_default"
 
@@ -17,13 +21,75 @@ def dump(model, fp, slot_key=_DEFAULT_SLOT):
         mlio_pack.dump(slot_key, model)
 
 
-def load(fp, slot_key=_DEFAULT_SLOT):
+def load(fp, slot_key=_DEFAULT_SLOT, cache=None, verification=None):
     """
     Load an object from a serialized pack file
     :param typing.IO fp: The file object to load pack from
     :param slot_key: The key of the slot where the model is saved. If None it will try to load the default slot.
+    :param mlio.io.cache.ObjectCache|None cache: A cache of loaded objects, to avoid unserializing again objects
+    that were already loaded
+    :param mlio.io.verification.VerificationPolicy|str|None verification: The policy for verifying loaded data.
+    Use 'once-per-process' to skip verification of data that were already verified. If None, data are always
+    verified.
     :return: The recovered object
     """
 
-    with Pack(fp) as mlio_pack:
+    with Pack(fp, cache=cache, mode='r', verification=verification) as mlio_pack:
         return mlio_pack.load(slot_key)
+
+
+# Pending loads of all files, so that concurrent loads of the same slot are coalesced
+_coalesced_loads = CoalescedCalls()
+
+# Jobs on the same file object share its position, so they are run one at a time per file object
+_file_object_locks = KeyedLocks()
+
+
+def _locked_file_job(func, fp, *args, **kwargs):
+    """
+    Run a blocking dump or load while holding the lock of its file object
+    :param typing.Callable func: The function to run
+    :param typing.IO fp: The file object of the job
+    :return: The result of the function
+    """
+    # The file object is referenced by the job, so its id is not reused while the lock is held
+    with _file_object_locks.hold(id(fp)):
+        return func(fp, *args, **kwargs)
+
+
+async def adump(model, fp, slot_key=_DEFAULT_SLOT, executor=None):
+    """
+    Coroutine version of dump(). Serialization, hashing and writing run in an executor so that the event loop is not
+    blocked. Dumps and loads on the same file object share its position, so they run one at a time.
+    :param T model: Any object that must be serialized
+    :param typing.IO fp: A file object to store the final pack
+    :param str slot_key: The key of the slot to save the model in
+    :param concurrent.futures.Executor|None executor: A thread pool executor to run the dump in. If None the
+    default executor of the event loop will be used.
+    """
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(executor, partial(_locked_file_job, partial(dump, model), fp, slot_key=slot_key))
+
+
+async def aload(fp, slot_key=_DEFAULT_SLOT, cache=None, verification=None, executor=None):
+    """
+    Coroutine version of load(). Reading, hashing and unserialization run in an executor so that the event loop is
+    not blocked. Concurrent awaits for the same slot of the same file, with the same cache and verification, are
+    coalesced in a single load and get the same object. Loads of different slots of the same file object run one at
+    a time, as they share its position. See Pack.aload() for cancellation.
+    :param typing.IO fp: The file object to load pack from
+    :param slot_key: The key of the slot where the model is saved
+    :param mlio.io.cache.ObjectCache|None cache: See load()
+    :param mlio.io.verification.VerificationPolicy|str|None verification: See load()
+    :param concurrent.futures.Executor|None executor: A thread pool executor to run the load in. If None the
+    default executor of the event loop will be used.
+    :return: The recovered object
+    """
+    # Options are referenced by the pending call, so their identities are not reused while it can be joined
+    options = (
+        None if cache is None else id(cache),
+        verification if verification is None or isinstance(verification, str) else id(verification)
+    )
+    return await _coalesced_loads.call(
+        (file_identity(fp), slot_key, options), executor, _locked_file_job, load, fp, slot_key=slot_key,
+        cache=cache, verification=verification)
@@ -0,0 +1,248 @@
+import io as sys_io
+import shutil
+import zipfile
+
+
+class UnknownCompressionCodec(KeyError):
+    """
+    Exception raised when an unknown or unavailable compression codec was asked to be used.
+    """
+    pass
+
+
+class CompressionCodecBase(object):
+    """
+    Base class for defining a compression codec of pack objects.
+
+    Codecs that are supported by the zip format are applied by the archive itself. The rest are applied
+    by the codec on the data stream, which is then stored uncompressed in the archive.
+    """
+
+    # The block size that is used when streaming data through the codec
+    BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self):
+        """
+        Default constructor. It will fail if the codec is not available in the current execution context.
+        """
+        if not self.is_available():
+            raise UnknownCompressionCodec("Compression codec: {} is not available in the current environment"
+                                          .format(self.codec_type()))
+
+    @classmethod
+    def codec_type(cls):
+        """
+        Get a unique id for the codec type
+        :rtype: str
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def is_available(cls):
+        """
+        Check if the codec can be used under the current execution context
+        :rtype: bool
+        """
+        return True
+
+    @classmethod
+    def zip_compress_type(cls):
+        """
+        The compression method that must be declared on the zip member
+        :rtype: int
+        """
+        return zipfile.ZIP_STORED
+
+    @classmethod
+    def pack_object_suffix(cls):
+        """
+        Suffix of the pack object name. Objects compressed outside of the zip archive are not interchangeable
+        with plain ones, so they are stored under a different name.
+        :rtype: str
+        """
+        return ''
+
+    def copy_compressed(self, src_fh, dst_fh, level=None):
+        """
+        Copy data from a source file to a zip member, compressing them if needed
+        :param typing.IO[bytes] src_fh: File object to read uncompressed data from
+        :param typing.IO[bytes] dst_fh: File object of the zip member
+        :param int|None level: The compression level, if None the default of the codec will be used
+        """
+        shutil.copyfileobj(src_fh, dst_fh, self.BLOCK_SIZE)
+
+    def open_decompressed(self, fh):
+        """
+        Get a file object that reads uncompressed data from a zip member
+        :param typing.IO[bytes] fh: File object of the zip member
+        :rtype: typing.IO[bytes]
+        """
+        return fh
+
+
+class StoredCodec(CompressionCodecBase):
+    """
+    No compression at all. Stored objects can be memory-mapped directly from the pack file.
+    """
+
+    @classmethod
+    def codec_type(cls):
+        return 'stored'
+
+
+class DeflateCodec(CompressionCodecBase):
+    """
+    Deflate compression as applied by the zip archive (levels 0-9)
+    """
+
+    @classmethod
+    def codec_type(cls):
+        return 'deflate'
+
+    @classmethod
+    def zip_compress_type(cls):
+        return zipfile.ZIP_DEFLATED
+
+
+class Bzip2Codec(CompressionCodecBase):
+    """
+    Bzip2 compression as applied by the zip archive (levels 1-9)
+    """
+
+    @classmethod
+    def codec_type(cls):
+        return 'bzip2'
+
+    @classmethod
+    def zip_compress_type(cls):
+        return zipfile.ZIP_BZIP2
+
+
+class LzmaCodec(CompressionCodecBase):
+    """
+    LZMA compression as applied by the zip archive. The zip archive does not support compression levels for LZMA.
+    """
+
+    @classmethod
+    def codec_type(cls):
+        return 'lzma'
+
+    @classmethod
+    def zip_compress_type(cls):
+        return zipfile.ZIP_LZMA
+
+
+class ZstdCodec(CompressionCodecBase):
+    """
+    Zstandard compression. It requires the optional package `zstandard`.
+    """
+
+    @classmethod
+    def codec_type(cls):
+        return 'zstd'
+
+    @classmethod
+    def is_available(cls):
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    @classmethod
+    def pack_object_suffix(cls):
+        return '.zst'
+
+    def copy_compressed(self, src_fh, dst_fh, level=None):
+        import zstandard
+
+        compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+        compressor.copy_stream(src_fh, dst_fh, read_size=self.BLOCK_SIZE, write_size=self.BLOCK_SIZE)
+
+    def open_decompressed(self, fh):
+        import zstandard
+
+        # Buffered reader adds peek() and backward seeks inside its buffer that some serializers need
+        return sys_io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(fh), self.BLOCK_SIZE)
+
+
+class Lz4Codec(CompressionCodecBase):
+    """
+    LZ4 frame compression. It requires the optional package `lz4`.
+    """
+
+    @classmethod
+    def codec_type(cls):
+        return 'lz4'
+
+    @classmethod
+    def is_available(cls):
+        try:
+            import lz4.frame  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    @classmethod
+    def pack_object_suffix(cls):
+        return '.lz4'
+
+    def copy_compressed(self, src_fh, dst_fh, level=None):
+        import lz4.frame
+
+        compressor = lz4.frame.LZ4FrameCompressor(compression_level=0 if level is None else level)
+        dst_fh.write(compressor.begin())
+        block = src_fh.read(self.BLOCK_SIZE)
+        while block:
+            dst_fh.write(compressor.compress(block))
+            block = src_fh.read(self.BLOCK_SIZE)
+        dst_fh.write(compressor.flush())
+
+    def open_decompressed(self, fh):
+        import lz4.frame
+
+        return lz4.frame.LZ4FrameFile(fh, mode='rb')
+
+
+__codecs_registry = {
+    codec.codec_type(): codec
+    for codec in [StoredCodec, DeflateCodec, Bzip2Codec, LzmaCodec, ZstdCodec, Lz4Codec]
+}
+
+
+def get_codec_by_type(codec_type):
+    """
+    Find a compression codec based on its type
+    :param str codec_type: The unique type of the codec as it was provided by CompressionCodecBase.codec_type()
+    :return: The codec class
+    :rtype: type[CompressionCodecBase]
+    """
+    if codec_type in __codecs_registry:
+        return __codecs_registry[codec_type]
+
+    raise UnknownCompressionCodec("Unknown compression codec: {}".format(codec_type))
+
+
+def get_codec_by_zip_compress_type(compress_type):
+    """
+    Find the codec that is applied by the zip archive for a specific compression method
+    :param int compress_type: The compression method of a zip member
+    :rtype: type[CompressionCodecBase]
+    """
+    for codec in __codecs_registry.values():
+        if not codec.pack_object_suffix() and codec.zip_compress_type() == compress_type:
+            return codec
+
+    raise UnknownCompressionCodec("Unknown zip compression method: {}".format(compress_type))
+
+
+def available_codecs():
+    """
+    Get the types of all codecs that can be used in the current execution context
+    :rtype: list[str]
+    """
+    return [
+        codec_type
+        for codec_type, codec in __codecs_registry.items()
+        if codec.is_available()
+    ]
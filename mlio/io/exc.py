@@ -25,3 +25,38 @@ class MLIOPackSlotWrongChecksum(RuntimeError):
     Exception raised if checksum is wrong in a slot
     """
     pass
+
+
+class MLIOPackSlotNotMappable(ValueError):
+    """
+    Exception raised if the data of a slot cannot be memory-mapped from the pack file
+    """
+    pass
+
+
+class MLIOPackReadOnlyError(ValueError):
+    """
+    Exception raised when trying to modify a pack that was opened in read-only mode
+    """
+    pass
+
+
+class MLIOPackBusyError(RuntimeError):
+    """
+    Exception raised when an operation cannot run while the pack is in use, e.g. compacting inside a transaction
+    """
+    pass
+
+
+class MLIOPackExternalObjectError(RuntimeError):
+    """
+    Exception raised if an object of a slot that is kept in a blob store cannot be accessed
+    """
+    pass
+
+
+class MLIORemoteReadError(IOError):
+    """
+    Exception raised if a range of a remote file cannot be read
+    """
+    pass
@@ -0,0 +1,174 @@
+import hashlib
+
+
+class UnknownHashAlgorithm(KeyError):
+    """
+    Exception raised when an unknown or unavailable hash algorithm was asked to be used.
+    """
+    pass
+
+
+class HashAlgorithmBase(object):
+    """
+    Base class for defining a hash algorithm that is used to address and verify pack objects.
+
+    Hashes of different algorithms are not interchangeable, so objects hashed with any algorithm other
+    than sha256 are stored in the pack under a name that is prefixed by the type of the algorithm.
+    """
+
+    def __init__(self):
+        """
+        Default constructor. It will fail if the algorithm is not available in the current execution context.
+        """
+        if not self.is_available():
+            raise UnknownHashAlgorithm("Hash algorithm: {} is not available in the current environment"
+                                       .format(self.algorithm_type()))
+
+    @classmethod
+    def algorithm_type(cls):
+        """
+        Get a unique id for the algorithm type
+        :rtype: str
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def is_available(cls):
+        """
+        Check if the algorithm can be used under the current execution context
+        :rtype: bool
+        """
+        return True
+
+    @classmethod
+    def pack_object_prefix(cls):
+        """
+        Prefix of the names of pack objects that are hashed with this algorithm
+        :rtype: str
+        """
+        return '{}-'.format(cls.algorithm_type())
+
+    def new(self):
+        """
+        Create a new hasher object, with the same interface as the ones of hashlib (update() and hexdigest())
+        """
+        raise NotImplementedError()
+
+    def hexdigest(self, data):
+        """
+        Calculate the hex digest of data in memory
+        :param bytes|memoryview data: The data to hash
+        :rtype: str
+        """
+        hasher = self.new()
+        hasher.update(data)
+        return hasher.hexdigest()
+
+
+class Sha256HashAlgorithm(HashAlgorithmBase):
+    """
+    SHA-256, the default algorithm and the only one that is known to packs of previous versions
+    """
+
+    @classmethod
+    def algorithm_type(cls):
+        return 'sha256'
+
+    @classmethod
+    def pack_object_prefix(cls):
+        return ''
+
+    def new(self):
+        return hashlib.sha256()
+
+
+class Blake2bHashAlgorithm(HashAlgorithmBase):
+    """
+    BLAKE2b with a 256-bit digest. It is usually faster than SHA-256 on 64-bit CPUs without SHA extensions.
+    """
+
+    @classmethod
+    def algorithm_type(cls):
+        return 'blake2b'
+
+    def new(self):
+        return hashlib.blake2b(digest_size=32)
+
+
+class Xxh3HashAlgorithm(HashAlgorithmBase):
+    """
+    XXH3 with a 128-bit digest. It is not a cryptographic hash, so it only protects against accidental corruption,
+    but it is much faster than any cryptographic one. It requires the optional package `xxhash`.
+    """
+
+    @classmethod
+    def algorithm_type(cls):
+        return 'xxh3-128'
+
+    @classmethod
+    def is_available(cls):
+        try:
+            import xxhash  # noqa: F401
+        except ImportError:
+            return False
+        return hasattr(xxhash, 'xxh3_128')
+
+    def new(self):
+        import xxhash
+
+        return xxhash.xxh3_128()
+
+
+class Blake3HashAlgorithm(HashAlgorithmBase):
+    """
+    BLAKE3 with a 256-bit digest. It requires the optional package `blake3`.
+    """
+
+    @classmethod
+    def algorithm_type(cls):
+        return 'blake3'
+
+    @classmethod
+    def is_available(cls):
+        try:
+            import blake3  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def new(self):
+        import blake3
+
+        return blake3.blake3()
+
+
+__hash_algorithms_registry = {
+    algorithm.algorithm_type(): algorithm
+    for algorithm in [Sha256HashAlgorithm, Blake2bHashAlgorithm, Xxh3HashAlgorithm, Blake3HashAlgorithm]
+}
+
+
+def get_hash_algorithm_by_type(algorithm_type):
+    """
+    Find a hash algorithm based on its type
+    :param str algorithm_type: The unique type of the algorithm as it was provided by
+    HashAlgorithmBase.algorithm_type()
+    :return: The algorithm class
+    :rtype: type[HashAlgorithmBase]
+    """
+    if algorithm_type in __hash_algorithms_registry:
+        return __hash_algorithms_registry[algorithm_type]
+
+    raise UnknownHashAlgorithm("Unknown hash algorithm: {}".format(algorithm_type))
+
+
+def available_hash_algorithms():
+    """
+    Get the types of all hash algorithms that can be used in the current execution context
+    :rtype: list[str]
+    """
+    return [
+        algorithm_type
+        for algorithm_type, algorithm in __hash_algorithms_registry.items()
+        if algorithm.is_available()
+    ]
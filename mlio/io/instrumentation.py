@@ -0,0 +1,299 @@
+import time
+import logging as _logging
+import threading
+from collections import namedtuple
+
+
+class PackEvent(namedtuple('PackEvent', ['operation', 'phase', 'slot_key', 'seconds', 'bytes'])):
+    """
+    A timed phase of an operation on a pack
+
+    - operation: 'dump', 'load', 'remove', 'update_manifest' or 'cleanup_dangling_objects'
+    - phase: 'total' for the whole operation, or one of its phases:
+        - dump: 'serialize' (excluding hashing), 'hash' and 'write' (including compression)
+        - load: 'dependencies', 'read' (including decompression), 'hash' and 'unserialize' (excluding reading and
+          hashing). Dependencies are checked ahead by load_many(), load_lazy() and aload(), so they are timed only
+          by load() and load_slice(). Memory-mapped loads have no read phase, as data are paged in on access.
+    - slot_key: The key of the slot, or None for operations on the whole pack
+    - seconds: The duration of the phase
+    - bytes: The number of processed bytes, or None if it is not applicable
+    """
+    __slots__ = ()
+
+
+class InstrumentationBase(object):
+    """
+    Base class for receiving the timing events of packs. Events can be emitted concurrently from multiple threads.
+
+    pck = Pack(fp, instrumentation=PackStats())
+    """
+
+    def on_event(self, event):
+        """
+        Handle an event
+        :param PackEvent event: The event
+        """
+        raise NotImplementedError()
+
+
+class PackStats(InstrumentationBase):
+    """
+    Aggregated statistics (count, total duration and bytes) of events per operation and phase
+    """
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def on_event(self, event):
+        key = (event.operation, event.phase)
+        with self._lock:
+            stats = self._stats.setdefault(key, {'count': 0, 'seconds': 0.0, 'bytes': 0})
+            stats['count'] += 1
+            stats['seconds'] += event.seconds
+            stats['bytes'] += event.bytes or 0
+
+    def get(self, operation, phase='total'):
+        """
+        Get the statistics of a phase
+        :param str operation: The operation
+        :param str phase: The phase of the operation
+        :return: A dictionary with count, seconds and bytes. All are zero if no event was received.
+        :rtype: dict
+        """
+        with self._lock:
+            return dict(self._stats.get((operation, phase), {'count': 0, 'seconds': 0.0, 'bytes': 0}))
+
+    def as_dict(self):
+        """
+        Get all statistics in a jsonable format
+        :return: The statistics mapped by operation and phase
+        :rtype: dict[str, dict[str, dict]]
+        """
+        result = {}
+        with self._lock:
+            for (operation, phase), stats in sorted(self._stats.items()):
+                result.setdefault(operation, {})[phase] = dict(stats)
+        return result
+
+    def reset(self):
+        """
+        Drop all statistics
+        """
+        with self._lock:
+            self._stats.clear()
+
+
+class LoggingInstrumentation(InstrumentationBase):
+    """
+    Adapter that logs each event in a standard logger
+    """
+
+    def __init__(self, logger=None, level=_logging.DEBUG):
+        """
+        Initialize the adapter
+        :param logging.Logger|None logger: The logger. If None, the logger of this module will be used.
+        :param int level: The level of the log records
+        """
+        self._logger = logger or _logging.getLogger(__name__)
+        self._level = level
+
+    def on_event(self, event):
+        if not self._logger.isEnabledFor(self._level):
+            return
+        self._logger.log(self._level, "Pack %s.%s%s took %.6fs%s", event.operation, event.phase,
+                         '' if event.slot_key is None else " of slot '{}'".format(event.slot_key),
+                         event.seconds, '' if event.bytes is None else " for {} bytes".format(event.bytes))
+
+
+class CallbackInstrumentation(InstrumentationBase):
+    """
+    Adapter that forwards each event to a function, e.g. to record it in a metrics client
+
+    pck = Pack(fp, instrumentation=CallbackInstrumentation(
+        lambda e: statsd.timing('mlio.{}.{}'.format(e.operation, e.phase), e.seconds * 1000)))
+    """
+
+    def __init__(self, callback):
+        """
+        Initialize the adapter
+        :param typing.Callable[[PackEvent], None] callback: The function to call on each event
+        """
+        self._callback = callback
+
+    def on_event(self, event):
+        self._callback(event)
+
+
+class CompositeInstrumentation(InstrumentationBase):
+    """
+    Forward events to multiple instrumentations
+    """
+
+    def __init__(self, *instrumentations):
+        """
+        Initialize the composite
+        :param InstrumentationBase instrumentations: The instrumentations to forward events to
+        """
+        self._instrumentations = list(instrumentations)
+
+    def on_event(self, event):
+        for instrumentation in self._instrumentations:
+            instrumentation.on_event(event)
+
+
+class PhaseMeter(object):
+    """
+    Accumulator of the duration and the bytes of a phase that is interleaved with others, e.g. reading data while
+    unserializing them
+    """
+    __slots__ = ('seconds', 'bytes')
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.bytes = 0
+
+
+class PhaseTimer(object):
+    """
+    Context manager that times a phase and emits its event on exit
+    """
+    __slots__ = ('_instrumentation', '_operation', '_phase', '_slot_key', '_excluded_meters', '_start',
+                 '_excluded_seconds', 'bytes')
+
+    def __init__(self, instrumentation, operation, phase, slot_key=None, excluded_meters=()):
+        """
+        Initialize the timer
+        :param InstrumentationBase instrumentation: The receiver of the event
+        :param str operation: The operation
+        :param str phase: The phase of the operation
+        :param str|None slot_key: The key of the slot
+        :param typing.Iterable[PhaseMeter|None] excluded_meters: Meters of interleaved phases, whose time while this
+        phase is timed is excluded from its duration
+        """
+        self._instrumentation = instrumentation
+        self._operation = operation
+        self._phase = phase
+        self._slot_key = slot_key
+        self._excluded_meters = [meter for meter in excluded_meters if meter is not None]
+        self.bytes = None
+
+    def __enter__(self):
+        self._excluded_seconds = sum(meter.seconds for meter in self._excluded_meters)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        seconds = time.perf_counter() - self._start
+        seconds -= sum(meter.seconds for meter in self._excluded_meters) - self._excluded_seconds
+        self._instrumentation.on_event(PackEvent(self._operation, self._phase, self._slot_key, max(seconds, 0.0),
+                                                 self.bytes))
+
+
+class _NullTimer(object):
+    """
+    Timer of disabled instrumentation, it does nothing
+    """
+    __slots__ = ()
+
+    bytes = property(lambda self: None, lambda self, value: None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class MeteredFileObject(object):
+    """
+    Read-only file-like wrapper that accumulates the time and the bytes of reads in a meter
+    """
+
+    def __init__(self, file, meter):
+        """
+        Initialize the wrapper
+        :param typing.IO[bytes] file: The file object to read data from
+        :param PhaseMeter meter: The meter to accumulate reads in
+        """
+        self._file = file
+        self._meter = meter
+
+    def _metered(self, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self._meter.seconds += time.perf_counter() - start
+        return result
+
+    def read(self, size=-1):
+        data = self._metered(self._file.read, size)
+        self._meter.bytes += len(data)
+        return data
+
+    def readinto(self, b):
+        from ._lib import readinto_file
+
+        n = self._metered(readinto_file, self._file, b)
+        self._meter.bytes += n
+        return n
+
+    def readline(self, size=-1):
+        line = self._metered(self._file.readline, size)
+        self._meter.bytes += len(line)
+        return line
+
+    def seek(self, offset, whence=0):
+        return self._metered(self._file.seek, offset, whence)
+
+    def __getattr__(self, name):
+        # Other methods (e.g. peek, tell) are not metered
+        return getattr(self._file, name)
+
+
+class MeteredHasher(object):
+    """
+    Wrapper of a hasher that accumulates the time and the bytes of hashing in a meter
+    """
+
+    def __init__(self, hasher, meter):
+        """
+        Initialize the wrapper
+        :param hasher: The hasher object, with the interface of hashlib
+        :param PhaseMeter meter: The meter to accumulate hashing in
+        """
+        self._hasher = hasher
+        self._meter = meter
+
+    def update(self, data):
+        start = time.perf_counter()
+        self._hasher.update(data)
+        self._meter.seconds += time.perf_counter() - start
+        self._meter.bytes += memoryview(data).nbytes
+
+    def hexdigest(self):
+        return self._hasher.hexdigest()
+
+
+def metered_file(file, meter):
+    """
+    Wrap a file object so that its reads are metered
+    :param typing.IO[bytes] file: The file object
+    :param PhaseMeter|None meter: The meter. If None the file object is returned as it is.
+    :rtype: typing.IO[bytes]
+    """
+    return file if meter is None else MeteredFileObject(file, meter)
+
+
+def metered_hasher_factory(hasher_factory, meter):
+    """
+    Wrap a factory of hashers so that their hashing is metered
+    :param typing.Callable hasher_factory: The factory of hashers
+    :param PhaseMeter|None meter: The meter. If None the factory is returned as it is.
+    :rtype: typing.Callable
+    """
+    if meter is None:
+        return hasher_factory
+    return lambda: MeteredHasher(hasher_factory(), meter)
@@ -0,0 +1,218 @@
+from collections import OrderedDict
+
+from .pack import Pack
+from .exc import SlotKeyError
+
+
+class LayeredPack(object):
+    """
+    A stack of packs that is accessed as a single one. A writable top pack holds the changes over one or more
+    read-only base packs, so that updating a few slots of a large pack needs to store (and ship) only the
+    changed slots.
+
+    Slots are looked up from the top pack to the bottom one. New slots are dumped in the top pack, while removing
+    a slot of a base pack is recorded as a "whiteout" in the manifest of the top pack, which hides it from all the
+    packs below. Base packs are never modified, so they can be opened with mode='r'. A top pack can become a base
+    pack of another layered pack later, its whiteouts are still respected.
+
+    with open('base', 'rb') as base_f, open('delta', 'w+b') as delta_f:
+        with LayeredPack(Pack(delta_f), [Pack(base_f, mode='r')]) as pck:
+            pck.remove('model-en')
+            pck.dump('model-en', retrained_model)
+    """
+
+    def __init__(self, top, bases):
+        """
+        Initialize a layered pack
+        :param Pack top: The pack that changes are written to. It can be read-only if no changes are needed.
+        :param typing.Iterable[Pack] bases: The base packs, from the top-most to the bottom-most one
+        """
+        self._top = top
+        self._layers = [top] + list(bases)
+
+    @property
+    def top(self):
+        """
+        The pack that changes are written to
+        :rtype: Pack
+        """
+        return self._top
+
+    @property
+    def layers(self):
+        """
+        All the packs of the stack, from the top to the bottom
+        :rtype: list[Pack]
+        """
+        return list(self._layers)
+
+    def __enter__(self):
+        """:rtype: LayeredPack"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Close all the packs of the stack
+        """
+        for layer in self._layers:
+            layer.close()
+
+    def _find_layer(self, slot_key):
+        """
+        Find the pack that holds the visible slot with a specific key
+        :param str slot_key: The key of the slot
+        :return: The pack of the slot or None if the slot does not exist or is removed
+        :rtype: Pack|None
+        """
+        for layer in self._layers:
+            if layer.has_slot(slot_key):
+                return layer
+            if slot_key in layer.manifest_info.whiteouts:
+                return None
+        return None
+
+    def _layer_of(self, slot_key):
+        """
+        Same as _find_layer() but raises an exception if the slot does not exist
+        :param str slot_key: The key of the slot
+        :rtype: Pack
+        """
+        layer = self._find_layer(slot_key)
+        if layer is None:
+            raise SlotKeyError("There is no slot with name {}".format(slot_key))
+        return layer
+
+    @property
+    def slots_info(self):
+        """
+        Get information about the visible slots of all layers
+        :rtype: dict[str, mlio.io.pack.PackManifestSlot]
+        """
+        slots = {}
+        for layer in reversed(self._layers):
+            for slot_key in layer.manifest_info.whiteouts:
+                slots.pop(slot_key, None)
+            slots.update(layer.slots_info)
+        return slots
+
+    def has_slot(self, slot_key):
+        """
+        Check if a slot exists in any layer and it is not removed
+        :param str slot_key: The key of the slot to check for
+        :rtype: bool
+        """
+        return self._find_layer(slot_key) is not None
+
+    def __contains__(self, item):
+        return self.has_slot(item)
+
+    def load(self, slot_key, **kwargs):
+        """
+        Load a serialized object from the layer that holds the slot. See Pack.load()
+        :param str slot_key: The key of the slot to load object from
+        :return: The unserialized object
+        """
+        return self._layer_of(slot_key).load(slot_key, **kwargs)
+
+    def load_slice(self, slot_key, index):
+        """
+        Load a part of the object of a slot. See Pack.load_slice()
+        :param str slot_key: The key of the slot to load object from
+        :param int|slice|tuple index: The index of the part, as it would be used with the [] operator
+        :return: The requested part of the object
+        """
+        return self._layer_of(slot_key).load_slice(slot_key, index)
+
+    def load_lazy(self, slot_key):
+        """
+        Get a proxy that loads the object of a slot the first time it is used. See Pack.load_lazy()
+        :param str slot_key: The key of the slot to load object from
+        :rtype: mlio.io.lazy.LazySlotProxy
+        """
+        return self._layer_of(slot_key).load_lazy(slot_key)
+
+    def load_many(self, slot_keys, workers=None):
+        """
+        Load the objects of multiple slots, concurrently in each layer. See Pack.load_many()
+        :param typing.Iterable[str] slot_keys: The keys of the slots to load
+        :param int|None workers: The number of concurrent workers of each layer
+        :return: The unserialized objects mapped by their slot key, in the order of the given keys
+        :rtype: dict[str, T]
+        """
+        slot_keys = list(slot_keys)
+        keys_by_layer = {}
+        for slot_key in slot_keys:
+            keys_by_layer.setdefault(id(self._layer_of(slot_key)), []).append(slot_key)
+
+        objects = {}
+        for layer in self._layers:
+            layer_keys = keys_by_layer.get(id(layer))
+            if layer_keys:
+                objects.update(layer.load_many(layer_keys, workers=workers))
+        return OrderedDict(
+            (slot_key, objects[slot_key])
+            for slot_key in slot_keys
+        )
+
+    def open_slot_buffer(self, slot_key, verify=None):
+        """
+        Get zero-copy access to the serialized data of a slot. See Pack.open_slot_buffer()
+        :param str slot_key: The key of the slot
+        :param bool|None verify: See Pack.open_slot_buffer()
+        :rtype: memoryview
+        """
+        return self._layer_of(slot_key).open_slot_buffer(slot_key, verify=verify)
+
+    def dump(self, slot_key, obj, **kwargs):
+        """
+        Dump an object in a new slot of the top pack. See Pack.dump()
+        :param str slot_key: The key of the slot
+        :param T obj: The object to be serialized and stored in the pack
+        """
+        if self.has_slot(slot_key):
+            raise SlotKeyError("Cannot overwrite slot with id: {}".format(slot_key))
+        self._top.dump(slot_key, obj, **kwargs)
+
+    def dump_many(self, objects, **kwargs):
+        """
+        Dump multiple objects in new slots of the top pack. See Pack.dump_many()
+        :param typing.Mapping[str, T] objects: The objects to be stored mapped by their slot key
+        """
+        for slot_key in objects:
+            if self.has_slot(slot_key):
+                raise SlotKeyError("Cannot overwrite slot with id: {}".format(slot_key))
+        self._top.dump_many(objects, **kwargs)
+
+    def remove(self, slot_key):
+        """
+        Remove a slot. Slots of the top pack are removed from it, while slots of the base packs are hidden by a
+        whiteout in the top pack.
+        :param str slot_key: The key of the slot to remove
+        """
+        layer = self._layer_of(slot_key)
+
+        with self._top.transaction():
+            if layer is self._top:
+                self._top.remove(slot_key)
+            if self.has_slot(slot_key):
+                self._top._add_whiteout(slot_key)
+
+    def transaction(self):
+        """
+        Group multiple changes in a transaction of the top pack. See Pack.transaction()
+        """
+        return self._top.transaction()
+
+    def flatten(self, target):
+        """
+        Materialize the visible slots of all layers in a single pack. The stored data of the slots are copied as
+        they are, without unserializing them.
+        :param typing.IO[bytes] target: The file object to write the flattened pack in. It is expected to be empty.
+        """
+        with Pack(target) as flattened:
+            with flattened.transaction():
+                for slot_key in sorted(self.slots_info):
+                    flattened._insert_slot_from(self._layer_of(slot_key), slot_key)
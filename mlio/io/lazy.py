@@ -0,0 +1,265 @@
+import operator
+import threading
+
+from .exc import SlotKeyError
+
+
+# Marker for proxies whose object has not been loaded yet
+_NOT_LOADED = object()
+
+
+def _forward_unary(func):
+    """
+    Create a proxy method that applies a unary operator on the proxied object
+    :param typing.Callable func: The operator
+    """
+    def forward(self):
+        return func(self._mlio_resolve())
+    return forward
+
+
+def _forward_binary(func):
+    """
+    Create a proxy method that applies a binary operator with the proxied object as left operand
+    :param typing.Callable func: The operator
+    """
+    def forward(self, other):
+        return func(self._mlio_resolve(), other)
+    return forward
+
+
+def _forward_reflected(func):
+    """
+    Create a proxy method that applies a binary operator with the proxied object as right operand
+    :param typing.Callable func: The operator
+    """
+    def forward(self, other):
+        return func(other, self._mlio_resolve())
+    return forward
+
+
+def _forward_inplace(func):
+    """
+    Create a proxy method that applies an in-place operator on the proxied object. Mutable objects are updated
+    in-place and the proxy is kept, otherwise the new object is returned.
+    :param typing.Callable func: The in-place operator
+    """
+    def forward(self, other):
+        obj = self._mlio_resolve()
+        result = func(obj, other)
+        return self if result is obj else result
+    return forward
+
+
+class LazySlotProxy(object):
+    """
+    Transparent proxy of an object that is stored in a slot of a pack. The object is loaded and verified the first
+    time it is accessed, and then every operation on the proxy is forwarded to it: attributes, comparisons, calls,
+    containers, arithmetic operators, numeric conversions, numpy's __array__ and context managers. Concurrent first
+    accesses from multiple threads will load the object only once.
+
+    Operations that bypass these protocols (e.g. type(proxy), "proxy is obj" or C functions that require an exact
+    type) see the proxy itself, use mlio.io.lazy.resolve() to get the actual object for them.
+
+    The proxy records the slot, and so the hash of its data, when it is created. The pack must remain open until
+    the object is loaded, and the data of the slot must not be removed in the meantime.
+    """
+
+    __slots__ = ('_mlio_pack', '_mlio_slot', '_mlio_lock', '_mlio_object')
+
+    def __init__(self, pack, slot):
+        """
+        Initialize the proxy
+        :param mlio.io.Pack pack: The pack to load the object from
+        :param mlio.io.pack.PackManifestSlot slot: The slot of the object
+        """
+        object.__setattr__(self, '_mlio_pack', pack)
+        object.__setattr__(self, '_mlio_slot', slot)
+        object.__setattr__(self, '_mlio_lock', threading.Lock())
+        object.__setattr__(self, '_mlio_object', _NOT_LOADED)
+
+    def _mlio_resolve(self):
+        """
+        Get the proxied object, loading it if it is needed
+        """
+        obj = object.__getattribute__(self, '_mlio_object')
+        if obj is not _NOT_LOADED:
+            return obj
+
+        with object.__getattribute__(self, '_mlio_lock'):
+            # Another thread could have loaded it while waiting for the lock
+            obj = object.__getattribute__(self, '_mlio_object')
+            if obj is _NOT_LOADED:
+                pack = object.__getattribute__(self, '_mlio_pack')
+                slot = object.__getattribute__(self, '_mlio_slot')
+                # Pack objects are content addressed, so objects that were moved (e.g. by compaction) are still valid
+                if not pack._has_pack_object(slot.pack_object, slot=slot):
+                    raise SlotKeyError("Cannot load slot: {} as its data were removed from the pack"
+                                       .format(slot.slot_key))
+                obj = pack._load_slot(slot)
+                object.__setattr__(self, '_mlio_object', obj)
+                # Pack is not needed anymore
+                object.__setattr__(self, '_mlio_pack', None)
+        return obj
+
+    @property
+    def __class__(self):
+        return type(self._mlio_resolve())
+
+    def __getattr__(self, name):
+        return getattr(self._mlio_resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._mlio_resolve(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._mlio_resolve(), name)
+
+    def __dir__(self):
+        return dir(self._mlio_resolve())
+
+    def __repr__(self):
+        if object.__getattribute__(self, '_mlio_object') is _NOT_LOADED:
+            return "<LazySlotProxy slot='{}' (not loaded)>".format(object.__getattribute__(self, '_mlio_slot').slot_key)
+        return repr(self._mlio_resolve())
+
+    def __str__(self):
+        return str(self._mlio_resolve())
+
+    def __bool__(self):
+        return bool(self._mlio_resolve())
+
+    def __hash__(self):
+        return hash(self._mlio_resolve())
+
+    def __eq__(self, other):
+        return self._mlio_resolve() == other
+
+    def __ne__(self, other):
+        return self._mlio_resolve() != other
+
+    def __lt__(self, other):
+        return self._mlio_resolve() < other
+
+    def __le__(self, other):
+        return self._mlio_resolve() <= other
+
+    def __gt__(self, other):
+        return self._mlio_resolve() > other
+
+    def __ge__(self, other):
+        return self._mlio_resolve() >= other
+
+    def __call__(self, *args, **kwargs):
+        return self._mlio_resolve()(*args, **kwargs)
+
+    def __len__(self):
+        return len(self._mlio_resolve())
+
+    def __iter__(self):
+        return iter(self._mlio_resolve())
+
+    def __contains__(self, item):
+        return item in self._mlio_resolve()
+
+    def __getitem__(self, key):
+        return self._mlio_resolve()[key]
+
+    def __setitem__(self, key, value):
+        self._mlio_resolve()[key] = value
+
+    def __delitem__(self, key):
+        del self._mlio_resolve()[key]
+
+    def __reversed__(self):
+        return reversed(self._mlio_resolve())
+
+    def __enter__(self):
+        return self._mlio_resolve().__enter__()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return self._mlio_resolve().__exit__(exc_type, exc_val, exc_tb)
+
+    def __array__(self, *args, **kwargs):
+        import numpy
+
+        return numpy.asarray(self._mlio_resolve(), *args, **kwargs)
+
+    def __round__(self, *args):
+        return round(self._mlio_resolve(), *args)
+
+    __int__ = _forward_unary(int)
+    __float__ = _forward_unary(float)
+    __complex__ = _forward_unary(complex)
+    __index__ = _forward_unary(operator.index)
+
+    __neg__ = _forward_unary(operator.neg)
+    __pos__ = _forward_unary(operator.pos)
+    __abs__ = _forward_unary(operator.abs)
+    __invert__ = _forward_unary(operator.invert)
+
+    __add__ = _forward_binary(operator.add)
+    __sub__ = _forward_binary(operator.sub)
+    __mul__ = _forward_binary(operator.mul)
+    __matmul__ = _forward_binary(operator.matmul)
+    __truediv__ = _forward_binary(operator.truediv)
+    __floordiv__ = _forward_binary(operator.floordiv)
+    __mod__ = _forward_binary(operator.mod)
+    __divmod__ = _forward_binary(divmod)
+    __pow__ = _forward_binary(operator.pow)
+    __lshift__ = _forward_binary(operator.lshift)
+    __rshift__ = _forward_binary(operator.rshift)
+    __and__ = _forward_binary(operator.and_)
+    __xor__ = _forward_binary(operator.xor)
+    __or__ = _forward_binary(operator.or_)
+
+    __radd__ = _forward_reflected(operator.add)
+    __rsub__ = _forward_reflected(operator.sub)
+    __rmul__ = _forward_reflected(operator.mul)
+    __rmatmul__ = _forward_reflected(operator.matmul)
+    __rtruediv__ = _forward_reflected(operator.truediv)
+    __rfloordiv__ = _forward_reflected(operator.floordiv)
+    __rmod__ = _forward_reflected(operator.mod)
+    __rdivmod__ = _forward_reflected(divmod)
+    __rpow__ = _forward_reflected(operator.pow)
+    __rlshift__ = _forward_reflected(operator.lshift)
+    __rrshift__ = _forward_reflected(operator.rshift)
+    __rand__ = _forward_reflected(operator.and_)
+    __rxor__ = _forward_reflected(operator.xor)
+    __ror__ = _forward_reflected(operator.or_)
+
+    __iadd__ = _forward_inplace(operator.iadd)
+    __isub__ = _forward_inplace(operator.isub)
+    __imul__ = _forward_inplace(operator.imul)
+    __imatmul__ = _forward_inplace(operator.imatmul)
+    __itruediv__ = _forward_inplace(operator.itruediv)
+    __ifloordiv__ = _forward_inplace(operator.ifloordiv)
+    __imod__ = _forward_inplace(operator.imod)
+    __ipow__ = _forward_inplace(operator.ipow)
+    __ilshift__ = _forward_inplace(operator.ilshift)
+    __irshift__ = _forward_inplace(operator.irshift)
+    __iand__ = _forward_inplace(operator.iand)
+    __ixor__ = _forward_inplace(operator.ixor)
+    __ior__ = _forward_inplace(operator.ior)
+
+
+def is_loaded(obj):
+    """
+    Check if a lazily loaded object has been loaded. Objects that are not lazy proxies are always loaded.
+    :param T obj: The object to check
+    :rtype: bool
+    """
+    if type(obj) is not LazySlotProxy:
+        return True
+    return object.__getattribute__(obj, '_mlio_object') is not _NOT_LOADED
+
+
+def resolve(obj):
+    """
+    Get the actual object behind a lazy proxy, loading it if it is needed
+    :param T obj: A lazy proxy or any other object, which will be returned as it is
+    :rtype: T
+    """
+    if type(obj) is not LazySlotProxy:
+        return obj
+    return obj._mlio_resolve()
@@ -1,12 +1,33 @@
+import os
 import json
+import asyncio
+import mmap
+import time
+import shutil
 import tempfile
 import sys
 import io as sys_io
 import warnings
-from zipfile import ZipFile
+import threading
+import weakref
+import itertools
+from collections import namedtuple, OrderedDict, Counter
+from contextlib import contextmanager
+from functools import partial
+from zipfile import ZipFile, ZipInfo, ZIP_STORED, ZIP64_LIMIT, BadZipFile
 from datetime import datetime, timedelta, timezone
 
-from .exc import MLIOPackWrongFormat, SlotKeyError, MLIODependenciesNotSatisfied, MLIOPackSlotWrongChecksum
+from .exc import (MLIOPackWrongFormat, SlotKeyError, MLIODependenciesNotSatisfied, MLIOPackSlotWrongChecksum,
+                  MLIOPackSlotNotMappable, MLIOPackReadOnlyError, MLIOPackExternalObjectError, MLIOPackBusyError)
+
+
+# Marker for objects that were not found in the cache
+_CACHE_MISS = object()
+
+# The attribute of ZipInfo that ZipFile compresses members with. There is no public way to set the level of members
+# opened for writing, and the attribute became public in python 3.13.
+_ZIP_INFO_COMPRESSLEVEL_ATTR = next(
+    (name for name in ('compress_level', '_compresslevel') if name in getattr(ZipInfo, '__slots__', ())), None)
 
 
 class PackManifestSlot(object):
@@ -14,15 +35,28 @@ class PackManifestSlot(object):
     Representation model for a slot of the pack's manifest
     """
 
-    def __init__(self, slot_key, serializer, serialized_sha256_hash, dependencies=None):
+    DEFAULT_COMPRESSION = 'stored'
+    DEFAULT_HASH_ALGORITHM = 'sha256'
+
+    def __init__(self, slot_key, serializer, serialized_sha256_hash, dependencies=None, compression=None,
+                 linked_objects=None, hash_algorithm=None, external=False):
         """
         Initialize a new slot
         :param str slot_key: The unique identifier of the slot in the pack
         :param mlio.io.serializers.base.SerializerBase serializer: The serializer object that can
         be used to unserialize slot
-        :param str serialized_sha256_hash: The hash of the serialized data
+        :param str serialized_sha256_hash: The hash of the serialized data. Despite its name, it is calculated
+        with the hash algorithm of the slot.
         :param typing.Iterable[mlio.io.context_dependencies.base.ContextDependencyBase] dependencies: A list of
         all context dependencies that this slot requires in order to un-serialize
+        :param str|None compression: The type of the compression codec of the serialized data. If None, data
+        are considered stored without compression.
+        :param typing.Iterable[str]|None linked_objects: The hashes of the objects that the serializer stored
+        separately from the serialized data. They are compressed with the same codec.
+        :param str|None hash_algorithm: The type of the hash algorithm of the serialized data and the linked
+        objects. If None, sha256 is considered.
+        :param bool external: If True the objects of the slot are kept in the blob store of the pack instead of
+        its archive
         """
         from .context_dependencies.base import ContextDependencyBase
 
@@ -40,6 +74,10 @@ class PackManifestSlot(object):
             for dep in dependencies
         }
         self.serialized_sha256_hash = serialized_sha256_hash
+        self.compression = compression or self.DEFAULT_COMPRESSION
+        self.linked_objects = list(linked_objects or [])
+        self.hash_algorithm = hash_algorithm or self.DEFAULT_HASH_ALGORITHM
+        self.external = bool(external)
 
     @property
     def dependencies(self):
@@ -64,7 +102,51 @@ class PackManifestSlot(object):
         The internal name of the data object in the pack
         :rtype: str
         """
-        return "{}.slot".format(self.serialized_sha256_hash)
+        return self.linked_pack_object(self.serialized_sha256_hash)
+
+    def linked_pack_object(self, data_hash):
+        """
+        Get the internal name of an object of this slot in the pack
+        :param str data_hash: The hash of the object data
+        :rtype: str
+        """
+        from .compression import get_codec_by_type
+        from .hashing import get_hash_algorithm_by_type
+
+        return "{}{}.slot{}".format(get_hash_algorithm_by_type(self.hash_algorithm).pack_object_prefix(),
+                                    data_hash,
+                                    get_codec_by_type(self.compression).pack_object_suffix())
+
+    @property
+    def pack_objects(self):
+        """
+        The internal names of all data objects of the slot in the pack, including the linked ones
+        :rtype: list[str]
+        """
+        return [self.pack_object] + [
+            self.linked_pack_object(data_hash)
+            for data_hash in self.linked_objects
+        ]
+
+    @property
+    def codec(self):
+        """
+        The compression codec of the serialized data
+        :rtype: mlio.io.compression.CompressionCodecBase
+        """
+        from .compression import get_codec_by_type
+
+        return get_codec_by_type(self.compression)()
+
+    @property
+    def hasher(self):
+        """
+        The hash algorithm of the serialized data
+        :rtype: mlio.io.hashing.HashAlgorithmBase
+        """
+        from .hashing import get_hash_algorithm_by_type
+
+        return get_hash_algorithm_by_type(self.hash_algorithm)()
 
     @classmethod
     def from_dict(cls, slot_key, data, manifest_dependencies):
@@ -77,9 +159,20 @@ class PackManifestSlot(object):
         :rtype: PackManifestSlot
         """
         from .serializers import get_serializer_by_type
+        from .compression import get_codec_by_type, UnknownCompressionCodec
+        from .hashing import get_hash_algorithm_by_type, UnknownHashAlgorithm
+
+        # Check hash algorithm. Hashes of other algorithms are recorded under a different field, so that
+        # older readers do not mistake them for sha256 ones.
+        hash_algorithm = data.get('hash_algorithm', cls.DEFAULT_HASH_ALGORITHM)
+        try:
+            get_hash_algorithm_by_type(hash_algorithm)
+        except UnknownHashAlgorithm as e:
+            raise MLIOPackWrongFormat("Cannot load slot: {} because {}".format(slot_key, e))
+        hash_field = 'serialized_sha256_hash' if hash_algorithm == cls.DEFAULT_HASH_ALGORITHM else 'serialized_hash'
 
         # Check mandatory fields
-        if 'serialized_sha256_hash' not in data:
+        if hash_field not in data:
             raise MLIOPackWrongFormat(
                 "Cannot load slot: {} because it is missing hash field".format(slot_key))
         if 'serializer' not in data:
@@ -95,27 +188,51 @@ class PackManifestSlot(object):
                 unknown_dependencies
             ))
 
+        # Check compression codec
+        compression = data.get('compression', cls.DEFAULT_COMPRESSION)
+        try:
+            get_codec_by_type(compression)
+        except UnknownCompressionCodec as e:
+            raise MLIOPackWrongFormat("Cannot load slot: {} because {}".format(slot_key, e))
+
         # Load slot
         return cls(
             slot_key=slot_key,
-            serialized_sha256_hash=data['serialized_sha256_hash'],
+            serialized_sha256_hash=data[hash_field],
             serializer=get_serializer_by_type(data['serializer'])(),
             dependencies=[
                 manifest_dependencies[dep_id]
                 for dep_id in dependencies_ids
-            ])
+            ],
+            compression=compression,
+            linked_objects=data.get('linked_objects'),
+            hash_algorithm=hash_algorithm,
+            external=data.get('external', False))
 
     def to_dict(self):
         """
         Convert instance to jsonable dictionary
         :rtype: dict
         """
-        return {
+        data = {
             'serialized_sha256_hash': self.serialized_sha256_hash,
             'serializer': self.serializer.serializer_type(),
             'dependencies': list(self.dependencies.keys())
         }
 
+        # Optional fields are only recorded when they differ from defaults, so that older readers
+        # can still parse manifests of plain slots
+        if self.compression != self.DEFAULT_COMPRESSION:
+            data['compression'] = self.compression
+        if self.linked_objects:
+            data['linked_objects'] = list(self.linked_objects)
+        if self.hash_algorithm != self.DEFAULT_HASH_ALGORITHM:
+            data['hash_algorithm'] = self.hash_algorithm
+            data['serialized_hash'] = data.pop('serialized_sha256_hash')
+        if self.external:
+            data['external'] = True
+        return data
+
 
 class PackManifest(object):
     """
@@ -125,7 +242,7 @@ class PackManifest(object):
     PROTOCOL_VERSION = 2
     MANIFEST_FILENAME = "manifest.json"
 
-    def __init__(self, dependencies=None, slots=None, created_at=None, updated_at=None):
+    def __init__(self, dependencies=None, slots=None, created_at=None, updated_at=None, whiteouts=None):
         """
         Initialize a new manifest instance
         :param typing.Iterable[mlio.io.context_dependencies.base.ContextDependencyBase]|None dependencies: The list
@@ -135,6 +252,8 @@ class PackManifest(object):
         current time
         :param datetime|None updated_at: The datetime this pack was updated. If None it will be set to
         current time
+        :param typing.Iterable[str]|None whiteouts: The keys of slots that are removed from the packs below this
+        one, when it is used as a layer of a mlio.io.layered.LayeredPack
         """
 
         if created_at is None:
@@ -158,6 +277,7 @@ class PackManifest(object):
                 slot.slot_key: slot
                 for slot in slots
             }
+        self._whiteouts = set(whiteouts or [])
 
     @property
     def dependencies(self):
@@ -179,6 +299,18 @@ class PackManifest(object):
         """ :rtype: dict[str, PackManifestSlot] """
         return self._slots
 
+    @property
+    def whiteouts(self):
+        """ :rtype: set[str] """
+        return self._whiteouts
+
+    def add_whiteout(self, slot_key):
+        """
+        Record that a slot of the packs below this one is removed
+        :param str slot_key: The key of the removed slot
+        """
+        self._whiteouts.add(slot_key)
+
     def insert_slot(self, slot):
         """
         Insert a new slot in the manifest. This function will also update Manifest's dependencies registry.
@@ -194,6 +326,8 @@ class PackManifest(object):
                 self._dependencies[dep_id] = dep
 
         self._slots[slot.slot_key] = slot
+        # A slot of this pack always shadows the ones below it
+        self._whiteouts.discard(slot.slot_key)
 
     def remove_slot(self, slot_key):
         """
@@ -324,7 +458,8 @@ class PackManifest(object):
             dependencies=list(dependencies.values()),
             slots=slots,
             created_at=created_at,
-            updated_at=updated_at
+            updated_at=updated_at,
+            whiteouts=data.get('whiteouts')
         )
 
     def _metadata_to_dict(self):
@@ -343,7 +478,7 @@ class PackManifest(object):
         Convert current PackManifest instance to a jsonable dictionary format.
         :rtype: dict
         """
-        return {
+        data = {
             'version': self.PROTOCOL_VERSION,
             'meta': self._metadata_to_dict(),
             'dependencies': {
@@ -355,6 +490,48 @@ class PackManifest(object):
                 for slot in self._slots.values()
             }
         }
+        if self._whiteouts:
+            data['whiteouts'] = sorted(self._whiteouts)
+        return data
+
+
+def _serialize_object(obj, hash_algorithm):
+    """
+    Serialize an object in memory with the most suitable serializer. It is used by workers of Pack.dump_many().
+    :param T obj: The object to serialize
+    :param str hash_algorithm: The type of the hash algorithm
+    :return: The serializer instance, the hash and the serialized data
+    :rtype: (mlio.io.serializers.base.SerializerBase, str, bytes)
+    """
+    from .serializers import find_suitable_serializer
+    from .hashing import get_hash_algorithm_by_type
+    from ._lib import HashingFileObject
+
+    hasher = get_hash_algorithm_by_type(hash_algorithm)()
+    serializer = find_suitable_serializer(obj)()
+    serializer.set_hash_algorithm(hasher)
+    buffer = sys_io.BytesIO()
+    hashing_fh = HashingFileObject(buffer, hasher=hasher.new)
+    serializer.dump(obj, hashing_fh)
+
+    return serializer, hashing_fh.hexdigest(), buffer.getvalue()
+
+
+class PackCompactionStats(namedtuple('PackCompactionStats',
+                                     ['entries_before', 'entries_after', 'bytes_before', 'bytes_after'])):
+    """
+    Statistics about the compaction of a pack
+    """
+
+    @property
+    def reclaimed_entries(self):
+        """:rtype: int"""
+        return self.entries_before - self.entries_after
+
+    @property
+    def reclaimed_bytes(self):
+        """:rtype: int"""
+        return self.bytes_before - self.bytes_after
 
 
 class Pack(object):
@@ -369,12 +546,48 @@ class Pack(object):
             print(pck.list_slots())
     """
 
-    def __init__(self, file_handler):
+    # The maximum size of serialized data that will be buffered in memory before spilling to a temporary file
+    SPOOL_MAX_SIZE = 32 * 1024 * 1024
+
+    # The size of blocks used when copying data in the pack
+    COPY_BLOCK_SIZE = 1024 * 1024
+
+    # The modes that a pack can be opened in
+    MODES = ('a', 'r')
+
+    def __init__(self, file_handler, compression=None, compresslevel=None, cache=None, mode='a',
+                 hash_algorithm=None, verification=None, blob_store=None, instrumentation=None):
         """
         Initialize a new or existing pack
         :param typing.FileIO[bytes] file_handler: A file-like object that will be stored the pack. The file
          is expected to be opened in binary mode
+        :param str|None compression: The default compression codec for dumped slots. See
+        mlio.io.compression.available_codecs() for supported values. If None, slots will be stored uncompressed.
+        :param int|None compresslevel: The default compression level for dumped slots. If None, the default
+        level of each codec will be used.
+        :param mlio.io.cache.ObjectCache|None cache: A cache of loaded objects. It can be shared between
+        multiple packs. If None, objects will be unserialized on every load.
+        :param str mode: 'a' to open a new or existing pack for reading and writing, or 'r' to open an existing
+        pack read-only. In read-only mode the file is never written, so it can be opened with mode 'rb' and
+        shared by many concurrent readers.
+        :param str|None hash_algorithm: The default hash algorithm for dumped slots. See
+        mlio.io.hashing.available_hash_algorithms() for supported values. If None, sha256 will be used.
+        :param mlio.io.verification.VerificationPolicy|str|None verification: The policy for verifying data of
+        loaded slots, or the name of one ('always', 'once-per-process', 'sampled' or 'never'). If None, data are
+        always verified.
+        :param mlio.io.blobstore.BlobStore|None blob_store: A store of objects shared by many packs. If given, the
+        objects of dumped slots are kept in the store instead of the archive of the pack. It is also needed to load
+        slots that were dumped this way.
+        :param mlio.io.instrumentation.InstrumentationBase|None instrumentation: A receiver of the timing events of
+        the operations on the pack, e.g. mlio.io.instrumentation.PackStats. If None, operations are not timed.
         """
+        from .compression import get_codec_by_type
+        from .hashing import get_hash_algorithm_by_type
+        from .verification import VerificationPolicy
+        from ._async import CoalescedCalls, ReadWriteLock
+
+        if mode not in self.MODES:
+            raise ValueError("Pack mode must be one of: {}".format(", ".join(self.MODES)))
 
         # Check type of file object
         if 'b' not in getattr(file_handler, 'mode', ''):
@@ -384,8 +597,34 @@ class Pack(object):
                 raise ValueError("The file object must be opened in binary mode")
 
         self._file_handler = file_handler
-        self._zip_fh = ZipFile(self._file_handler, 'a')
+        default_codec = get_codec_by_type(compression or PackManifestSlot.DEFAULT_COMPRESSION)()
+        self._compression = default_codec.codec_type()
+        self._compresslevel = compresslevel
+        default_hasher = get_hash_algorithm_by_type(hash_algorithm or PackManifestSlot.DEFAULT_HASH_ALGORITHM)()
+        self._hash_algorithm = default_hasher.algorithm_type()
+        self._cache = cache
+        self._verification = VerificationPolicy.from_value(verification)
+        self._blob_store = blob_store
+        self._instrumentation = instrumentation
+        self._mode = mode
+        try:
+            self._zip_fh = ZipFile(self._file_handler, mode)
+        except BadZipFile as e:
+            raise MLIOPackWrongFormat("Cannot open pack: {}".format(e))
+        self._zip_modified = False
+        self._mmap = None
+        self._mmap_lock = threading.Lock()
+        # Weak references to released maps whose buffers are still exported, and to objects of mmap_mode loads,
+        # that compaction in-place would invalidate. They are dropped as soon as their referents are collected.
+        self._mapped_refs = {}
+        self._mapped_refs_counter = itertools.count()
+        self._transaction_depth = 0
+        self._transaction_has_changes = False
+        self._coalesced_loads = CoalescedCalls()
+        # Jobs of adump() and aload() run in executors, loads must not read the archive while a dump writes it
+        self._async_lock = ReadWriteLock()
         self._manifest = self._load_or_create_manifest()
+        self._index_pack_objects()
 
     def _load_or_create_manifest(self):
         """
@@ -395,6 +634,8 @@ class Pack(object):
         if PackManifest.MANIFEST_FILENAME in self._zip_fh.namelist():
             manifest_data = self._zip_fh.read(PackManifest.MANIFEST_FILENAME).decode('utf-8')
             manifest = PackManifest.from_dict(json.loads(manifest_data))
+        elif self._mode == 'r':
+            raise MLIOPackWrongFormat("Cannot open pack as it has no manifest")
         else:
             manifest = PackManifest()
             self._update_manifest(manifest)
@@ -409,51 +650,117 @@ class Pack(object):
             manifest = self._manifest
         manifest.touch_updated_at()
 
-        manifest_json = json.dumps(manifest.to_dict())
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            self._zip_fh.writestr(PackManifest.MANIFEST_FILENAME, manifest_json)
+        with self._timer('update_manifest', 'total') as timer:
+            manifest_json = json.dumps(manifest.to_dict())
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                self._zip_fh.writestr(PackManifest.MANIFEST_FILENAME, manifest_json)
+            timer.bytes = len(manifest_json)
+        self._zip_modified = True
 
-    def _existing_pack_objects(self):
+    def _index_pack_objects(self):
         """
-        Get a list of existing stored objects in the pack.
+        Build the in-memory index of the pack objects, along with the reference counts of the slots on them.
+        This is the only place that scans all entries of the archive, the index is then updated on each write.
 
         Because ZipFile does not permit removing items, we consider zero sized objects as non-existing
-        :return: A list of existing pack objects
-        :rtype: set(str)
         """
-
         # ZipFile keeps duplicate entries but only the last one is effective
-        object_sizes = {}
+        self._pack_objects_index = {}
         for zip_entry in self._zip_fh.infolist():
             if zip_entry.filename == PackManifest.MANIFEST_FILENAME:
                 continue
-            object_sizes[zip_entry.filename] = zip_entry.file_size
+            if zip_entry.file_size:
+                self._pack_objects_index[zip_entry.filename] = zip_entry
+            else:
+                self._pack_objects_index.pop(zip_entry.filename, None)
 
+        self._count_pack_object_references()
+
+        # Objects left behind by interrupted writes will be removed on the next clean-up
+        self._dangling_candidates = set(self._pack_objects_index) - set(self._pack_object_references)
+
+    def _count_pack_object_references(self):
+        """
+        Count the references of the slots of the manifest on each pack object of the archive
+        """
+        self._pack_object_references = Counter(
+            pack_object
+            for slot in self.slots_info.values()
+            if not slot.external
+            for pack_object in slot.pack_objects
+        )
+
+    def _external_pack_objects(self):
+        """
+        Get the objects of the blob store that are referenced by the slots of the manifest
+        :rtype: set(str)
+        """
         return set(
-            object_name
-            for object_name, object_size in object_sizes.items()
-            if object_size
+            pack_object
+            for slot in self.slots_info.values()
+            if slot.external
+            for pack_object in slot.pack_objects
         )
 
+    def _existing_pack_objects(self):
+        """
+        Get a list of existing stored objects in the pack.
+        :return: A list of existing pack objects
+        :rtype: set(str)
+        """
+        return set(self._pack_objects_index)
+
+    def _referenced_pack_objects(self):
+        """
+        Get the pack objects that are referenced by the slots of the manifest
+        :rtype: set(str)
+        """
+        return set(self._pack_object_references)
+
+    def _add_pack_object_reference(self, pack_object):
+        """
+        Record a new reference of a slot on a pack object
+        :param str pack_object: The name of the pack object
+        """
+        self._pack_object_references[pack_object] += 1
+        self._dangling_candidates.discard(pack_object)
+
+    def _remove_pack_object_reference(self, pack_object):
+        """
+        Drop a reference of a slot on a pack object. Objects that are not referenced anymore will be removed
+        on the next clean-up.
+        :param str pack_object: The name of the pack object
+        """
+        self._pack_object_references[pack_object] -= 1
+        if self._pack_object_references[pack_object] <= 0:
+            del self._pack_object_references[pack_object]
+            self._dangling_candidates.add(pack_object)
+
     def _cleanup_dangling_pack_objects(self):
         """
         Find pack objects that are not referenced by any slot and remove them
         :return: The list of found dangling objects
         :rtype: set(str)
         """
+        with self._timer('cleanup_dangling_objects', 'total') as timer:
+            unreferenced_objects = set(
+                pack_object
+                for pack_object in self._dangling_candidates
+                if pack_object in self._pack_objects_index and pack_object not in self._pack_object_references
+            )
+            self._dangling_candidates = set()
 
-        referenced_objects = set(
-            slot.pack_object
-            for slot in self.slots_info.values()
-        )
-
-        unreferenced_objects = self._existing_pack_objects() - referenced_objects
-        for pack_object in unreferenced_objects:
-            # Zero contents of object from archive
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                self._zip_fh.writestr(pack_object, b'')
+            # Bytes of the archive that are released
+            timer.bytes = sum(self._pack_objects_index[pack_object].compress_size
+                              for pack_object in unreferenced_objects)
+            for pack_object in unreferenced_objects:
+                # Zero contents of object from archive
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    self._zip_fh.writestr(pack_object, b'')
+                del self._pack_objects_index[pack_object]
+                self._zip_modified = True
 
         return unreferenced_objects
 
@@ -465,11 +772,243 @@ class Pack(object):
         # Close zip
         self.close()
 
+    @property
+    def mode(self):
+        """
+        The mode that the pack was opened in
+        :rtype: str
+        """
+        return self._mode
+
+    @property
+    def blob_store(self):
+        """
+        The store of objects that are shared with other packs, if any
+        :rtype: mlio.io.blobstore.BlobStore|None
+        """
+        return self._blob_store
+
+    def _required_blob_store(self, slot_key):
+        """
+        Get the blob store of the pack, for a slot whose objects are kept there
+        :param str slot_key: The key of the slot
+        :rtype: mlio.io.blobstore.BlobStore
+        """
+        if self._blob_store is None:
+            raise MLIOPackExternalObjectError("Cannot access slot: {} as its objects are kept in a blob store but the "
+                                              "pack was opened without one".format(slot_key))
+        return self._blob_store
+
+    def _timer(self, operation, phase, slot_key=None, excluded_meters=()):
+        """
+        Get a context manager that times a phase of an operation. If instrumentation is disabled, a shared timer
+        that does nothing is returned.
+        :param str operation: The operation, see mlio.io.instrumentation.PackEvent
+        :param str phase: The phase of the operation
+        :param str|None slot_key: The key of the slot of the operation
+        :param typing.Iterable[mlio.io.instrumentation.PhaseMeter|None] excluded_meters: Meters of phases whose
+        time is excluded from the timed one
+        """
+        from .instrumentation import PhaseTimer, NULL_TIMER
+
+        if self._instrumentation is None:
+            return NULL_TIMER
+        return PhaseTimer(self._instrumentation, operation, phase, slot_key, excluded_meters)
+
+    def _new_meter(self):
+        """
+        Get a new meter for a phase that is interleaved with others
+        :return: The meter or None if instrumentation is disabled
+        :rtype: mlio.io.instrumentation.PhaseMeter|None
+        """
+        from .instrumentation import PhaseMeter
+
+        return None if self._instrumentation is None else PhaseMeter()
+
+    def _emit_meter(self, operation, phase, slot_key, meter):
+        """
+        Emit the event of a metered phase
+        :param str operation: The operation
+        :param str phase: The phase of the operation
+        :param str|None slot_key: The key of the slot of the operation
+        :param mlio.io.instrumentation.PhaseMeter|None meter: The meter of the phase, if None nothing is emitted
+        """
+        from .instrumentation import PackEvent
+
+        if meter is not None:
+            self._instrumentation.on_event(PackEvent(operation, phase, slot_key, meter.seconds, meter.bytes))
+
+    def _check_writable(self):
+        """
+        Ensure that the pack can be modified
+        """
+        if self._mode == 'r':
+            raise MLIOPackReadOnlyError("Cannot modify a pack that was opened in read-only mode")
+
+    @property
+    def closed(self):
+        """
+        Check if the pack handler is closed
+        :rtype: bool
+        """
+        return self._zip_fh.fp is None
+
     def close(self):
         """
         Close the pack handler. This will not close the file object
         """
         self._zip_fh.close()
+        self._release_mmap()
+
+    def _release_mmap(self):
+        """
+        Release the memory map of the pack file. If there are still exported buffers, the map will be
+        released when they are garbage collected.
+        """
+        if self._mmap is None:
+            return
+        try:
+            self._mmap.close()
+        except BufferError:
+            self._track_mapped(self._mmap)
+        self._mmap = None
+
+    def _track_mapped(self, obj):
+        """
+        Keep a weak reference to an object that is backed by a memory map of the pack file, until it is collected
+        :param obj: The object
+        :raises TypeError: If the object does not support weak references
+        """
+        key = next(self._mapped_refs_counter)
+        refs = self._mapped_refs
+        # The callback must not refer to the pack, so that tracked objects do not keep it alive
+        refs[key] = weakref.ref(obj, lambda ref: refs.pop(key, None))
+
+    def _has_mapped_data(self):
+        """
+        Check if there are still buffers or objects that are backed by memory maps of the pack file. The current
+        map is released in order to check for its exported buffers.
+        :rtype: bool
+        """
+        with self._mmap_lock:
+            self._release_mmap()
+            return any(ref() is not None for ref in list(self._mapped_refs.values()))
+
+    def _map_pack_object(self, pack_object):
+        """
+        Get a read-only memory view on the data of a pack object, directly from the memory-mapped pack file
+        :param str pack_object: The name of the pack object
+        :return: The view or None if the object is compressed or the pack file cannot be memory-mapped
+        :rtype: memoryview|None
+        """
+        with self._mmap_lock:
+            data_offset = self._locate_mapped_pack_object(pack_object)
+            if data_offset is None:
+                return None
+            return memoryview(self._mmap)[data_offset:data_offset + self._zip_fh.getinfo(pack_object).file_size]
+
+    def _map_slot_object(self, slot, pack_object):
+        """
+        Get a read-only memory view on the data of an object of a slot, from the pack file or the blob store
+        :param PackManifestSlot slot: The slot of the object
+        :param str pack_object: The name of the pack object
+        :return: The view or None if the object is compressed or cannot be memory-mapped
+        :rtype: memoryview|None
+        """
+        if slot.compression != PackManifestSlot.DEFAULT_COMPRESSION:
+            return None
+        if slot.external:
+            return self._required_blob_store(slot.slot_key).map_object(pack_object)
+        return self._map_pack_object(pack_object)
+
+    def _pack_object_size(self, slot, pack_object):
+        """
+        Get the size of the stored data of an object of a slot
+        :param PackManifestSlot slot: The slot of the object
+        :param str pack_object: The name of the pack object
+        :rtype: int
+        """
+        if slot.external:
+            return self._required_blob_store(slot.slot_key).object_size(pack_object)
+        return self._pack_objects_index[pack_object].file_size
+
+    def _pack_object_data_offset(self, pack_object):
+        """
+        Get the absolute offset of the data of a stored pack object in the pack file
+        :param str pack_object: The name of the pack object
+        :return: The offset or None if the object is compressed or the pack file cannot be memory-mapped
+        :rtype: int|None
+        """
+        with self._mmap_lock:
+            return self._locate_mapped_pack_object(pack_object)
+
+    def _locate_mapped_pack_object(self, pack_object):
+        """
+        Make sure that the data of a stored pack object are covered by the memory map of the pack file, and get
+        their offset. The mmap lock must be held by the caller.
+        :param str pack_object: The name of the pack object
+        :return: The offset or None if the object is compressed or the pack file cannot be memory-mapped
+        :rtype: int|None
+        """
+        from ._lib import zip_member_data_offset
+
+        zip_info = self._zip_fh.getinfo(pack_object)
+        if zip_info.compress_type != ZIP_STORED or zip_info.flag_bits & 0x1:
+            return None
+
+        try:
+            fileno = self._file_handler.fileno()
+        except (AttributeError, OSError, sys_io.UnsupportedOperation):
+            return None
+
+        # Local header precedes data and central directory follows them, so a map that covers the local
+        # header and the data of the member is enough. Buffered data must reach the file before mapping it.
+        for remap in (False, True):
+            if remap or self._mmap is None or len(self._mmap) < zip_info.header_offset + 30:
+                self._release_mmap()
+                if hasattr(self._file_handler, 'flush'):
+                    self._file_handler.flush()
+                try:
+                    self._mmap = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    return None
+
+            data_offset = zip_member_data_offset(self._mmap, zip_info)
+            if data_offset + zip_info.file_size <= len(self._mmap):
+                return data_offset
+        return None
+
+    @contextmanager
+    def _open_pack_object(self, pack_object, codec=None, zip_fh=None, slot=None):
+        """
+        Open a pack object for reading. Stored (uncompressed) objects are read directly from a memory map
+        of the pack file, while the rest are read through the zip decompressor.
+        :param str pack_object: The name of the pack object
+        :param mlio.io.compression.CompressionCodecBase|None codec: The codec of the object, needed for codecs
+        that are not applied by the zip archive
+        :param ZipFile|None zip_fh: The zip handler to read compressed objects from. If None the main
+        handler of the pack will be used.
+        :param PackManifestSlot|None slot: The slot of the object. Objects of external slots are read from the
+        blob store.
+        :rtype: typing.ContextManager[typing.IO[bytes]]
+        """
+        from ._lib import MemoryViewFileObject
+
+        if slot is not None and slot.external:
+            fp = self._required_blob_store(slot.slot_key).open_object(pack_object)
+        else:
+            view = self._map_pack_object(pack_object)
+            if view is not None:
+                fp = MemoryViewFileObject(view)
+            else:
+                fp = (zip_fh or self._zip_fh).open(pack_object, 'r')
+
+        with fp:
+            if codec is None:
+                yield fp
+            else:
+                with codec.open_decompressed(fp) as decompressed_fp:
+                    yield decompressed_fp
 
     @property
     def slots_info(self):
@@ -495,97 +1034,947 @@ class Pack(object):
         """
         return slot_key in self._manifest.slots
 
-    def dump(self, slot_key, obj):
+    def dump(self, slot_key, obj, compression=None, compresslevel=None, serializer=None, hash_algorithm=None,
+             external=None):
         """
         Dump an object in a pack slot
         :param str slot_key: The key of the slot
         :param T obj: The object to be serialized and stored in the pack
+        :param str|None compression: The compression codec of the slot. If None the default codec of the pack
+        will be used. If the same data are already stored in the pack, the existing object will be reused
+        with its own compression.
+        :param int|None compresslevel: The compression level. If None the default level of the pack will be used.
+        :param mlio.io.serializers.base.SerializerBase|None serializer: The serializer to use. It must be
+        registered so that the slot can be loaded. If None the most suitable serializer will be used. The slot
+        keeps a copy of it, so the same instance can be used for multiple dumps.
+        :param str|None hash_algorithm: The hash algorithm of the slot. If None the default algorithm of the pack
+        will be used.
+        :param bool|None external: If True the objects of the slot will be kept in the blob store of the pack. If
+        None, they will be kept there only if the pack has a blob store. Codecs of the zip archive cannot be applied
+        outside of it, so external slots with such a compression are stored uncompressed.
         """
         from .serializers import find_suitable_serializer
-        from ._lib import hash_file_object
+        from .hashing import get_hash_algorithm_by_type
+        from .instrumentation import metered_hasher_factory
+        from ._lib import HashingFileObject
 
+        self._check_writable()
         if self.has_slot(slot_key):
             raise SlotKeyError("Cannot overwrite slot with id: {}".format(slot_key))
 
-        # Find suitable serializer
-        serializer = find_suitable_serializer(obj)()
+        with self._timer('dump', 'total', slot_key):
+            # Find suitable serializer. Given instances are copied, so that the slot does not share them and the state
+            # of their previous dumps is not mixed with this one.
+            if serializer is None:
+                serializer = find_suitable_serializer(obj)()
+            else:
+                serializer = serializer.copy_for_dump()
+            hasher = get_hash_algorithm_by_type(hash_algorithm or self._hash_algorithm)()
+            serializer.set_hash_algorithm(hasher)
+
+            # Serialize in a spooled buffer while hashing on the fly. The name of the pack object depends on the
+            # hash, so data cannot be streamed in the pack before serialization has finished.
+            hash_meter = self._new_meter()
+            with tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE, mode='w+b') as spool_fh:
+                hashing_fh = HashingFileObject(spool_fh, hasher=metered_hasher_factory(hasher.new, hash_meter))
+                with self._timer('dump', 'serialize', slot_key, excluded_meters=(hash_meter,)) as timer:
+                    serializer.dump(obj, hashing_fh)
+                    timer.bytes = hashing_fh.size
+                self._emit_meter('dump', 'hash', slot_key, hash_meter)
+
+                spool_fh.seek(0, sys_io.SEEK_SET)
+                self._insert_serialized_slot(slot_key, serializer, hashing_fh.hexdigest(), spool_fh,
+                                             hashing_fh.size, compression, compresslevel, hasher.algorithm_type(),
+                                             external)
+
+    def dump_many(self, objects, workers=None, use_processes=True, compression=None, compresslevel=None,
+                  hash_algorithm=None, external=None):
+        """
+        Dump multiple objects in pack slots. Objects are serialized and hashed concurrently in a pool of workers,
+        while storing them in the pack happens in the order of the given mapping, in a single transaction.
+
+        When processes are used, objects must be picklable and custom serializers must be registered at
+        import time of their module so that workers can find them.
+        :param typing.Mapping[str, T] objects: The objects to be stored mapped by their slot key
+        :param int|None workers: The number of concurrent workers. If None or 1, objects will be dumped serially.
+        :param bool use_processes: If True a pool of processes will be used, otherwise a pool of threads
+        :param str|None compression: The compression codec of the slots. See Pack.dump()
+        :param int|None compresslevel: The compression level. See Pack.dump()
+        :param str|None hash_algorithm: The hash algorithm of the slots. See Pack.dump()
+        :param bool|None external: If the objects of the slots will be kept in the blob store. See Pack.dump()
+        """
+        import collections
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        self._check_writable()
+        for slot_key in objects:
+            if self.has_slot(slot_key):
+                raise SlotKeyError("Cannot overwrite slot with id: {}".format(slot_key))
+
+        with self.transaction():
+            if workers is None or workers <= 1:
+                for slot_key, obj in objects.items():
+                    self.dump(slot_key, obj, compression=compression, compresslevel=compresslevel,
+                              hash_algorithm=hash_algorithm, external=external)
+                return
+
+            hash_algorithm = hash_algorithm or self._hash_algorithm
+
+            executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+            with executor_class(max_workers=workers) as executor:
+                # Keep a bounded window of pending objects so that serialized data do not pile up in memory
+                pending = collections.deque()
+                for slot_key, obj in objects.items():
+                    pending.append((slot_key, executor.submit(_serialize_object, obj, hash_algorithm)))
+                    if len(pending) >= 2 * workers:
+                        self._insert_serialized_result(*pending.popleft(), compression, compresslevel,
+                                                       hash_algorithm, external)
+
+                while pending:
+                    self._insert_serialized_result(*pending.popleft(), compression, compresslevel, hash_algorithm,
+                                                   external)
+
+    async def adump(self, slot_key, obj, executor=None, **kwargs):
+        """
+        Coroutine version of dump(). Serialization, hashing and writing run in an executor so that the event loop
+        is not blocked. Dumps of the same pack run one at a time and never while a load of aload() reads it. Calls of
+        the synchronous API are not synchronized with them.
 
-        with tempfile.NamedTemporaryFile('w+b') as temp_fh:
+        If cancelled before the executor starts it, the slot is not dumped. Otherwise the dump is completed in the
+        background.
+        :param str slot_key: The key of the slot
+        :param T obj: The object to be serialized and stored in the pack
+        :param concurrent.futures.Executor|None executor: A thread pool executor to run the dump in. If None the
+        default executor of the event loop will be used.
+        :param kwargs: The rest of the arguments of Pack.dump()
+        """
+        self._check_writable()
+        if self.has_slot(slot_key):
+            raise SlotKeyError("Cannot overwrite slot with id: {}".format(slot_key))
 
-            # Serialize
-            serializer.dump(obj, temp_fh)
+        def locked_dump():
+            with self._async_lock.write():
+                self.dump(slot_key, obj, **kwargs)
 
-            # Calculate sha256
-            temp_fh.seek(0, sys_io.SEEK_SET)
-            sha256_hash = hash_file_object(temp_fh)
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(executor, locked_dump)
 
-            # Calculate slot metadata
-            slot = PackManifestSlot(
-                slot_key=slot_key,
-                serialized_sha256_hash=sha256_hash,
-                serializer=serializer,
-                dependencies=serializer.get_context_dependencies()
-            )
+    def _insert_serialized_result(self, slot_key, future, compression, compresslevel, hash_algorithm, external):
+        """
+        Insert a slot from the result of a worker that serialized its object
+        :param str slot_key: The key of the slot
+        :param concurrent.futures.Future future: The future of the _serialize_object() call
+        :param str|None compression: The compression codec of the slot
+        :param int|None compresslevel: The compression level
+        :param str hash_algorithm: The hash algorithm that the worker used
+        :param bool|None external: If the objects of the slot will be kept in the blob store
+        """
+        serializer, data_hash, payload = future.result()
+        self._insert_serialized_slot(slot_key, serializer, data_hash, sys_io.BytesIO(payload), len(payload),
+                                     compression, compresslevel, hash_algorithm, external)
+
+    def _insert_serialized_slot(self, slot_key, serializer, data_hash, fp, size, compression=None,
+                                compresslevel=None, hash_algorithm=None, external=None):
+        """
+        Insert a new slot with already serialized data
+        :param str slot_key: The key of the slot
+        :param mlio.io.serializers.base.SerializerBase serializer: The serializer that was used
+        :param str data_hash: The hash of the serialized data
+        :param typing.IO[bytes] fp: File object to read serialized data from
+        :param int size: The size of the serialized data
+        :param str|None compression: The compression codec of the slot. If None the default of the pack is used.
+        :param int|None compresslevel: The compression level. If None the default of the pack is used.
+        :param str|None hash_algorithm: The hash algorithm of the data. If None, sha256 is considered.
+        :param bool|None external: If True the objects will be kept in the blob store. If None, they will be kept
+        there only if the pack has a blob store.
+        """
+        from .compression import get_codec_by_type, get_codec_by_zip_compress_type
+        from ._lib import MemoryViewFileObject
+
+        codec = get_codec_by_type(compression or self._compression)()
+        if compresslevel is None:
+            compresslevel = self._compresslevel
+        if external is None:
+            external = self._blob_store is not None
+        if external:
+            blob_store = self._required_blob_store(slot_key)
+            if codec.zip_compress_type() != ZIP_STORED:
+                codec = get_codec_by_type(PackManifestSlot.DEFAULT_COMPRESSION)()
+
+        # Calculate slot metadata
+        slot = PackManifestSlot(
+            slot_key=slot_key,
+            serialized_sha256_hash=data_hash,
+            serializer=serializer,
+            dependencies=serializer.get_context_dependencies(),
+            compression=codec.codec_type(),
+            linked_objects=[
+                linked_object.data_hash
+                for linked_object in serializer.get_linked_objects()
+            ],
+            hash_algorithm=hash_algorithm,
+            external=external
+        )
+
+        if external:
+            with self._timer('dump', 'write', slot_key) as timer:
+                # Bytes that are actually written, stored objects are reused
+                written_size = 0
+
+                # Linked objects are stored first, so that the slot object is never found without them
+                for linked_object in serializer.get_linked_objects():
+                    if blob_store.put(slot.linked_pack_object(linked_object.data_hash),
+                                      MemoryViewFileObject(linked_object.data_provider()), codec, compresslevel):
+                        written_size += linked_object.size
+                if blob_store.put(slot.pack_object, fp, codec, compresslevel):
+                    written_size += size
+                timer.bytes = written_size
+            # Data providers of linked objects refer to the dumped object, which must not be kept alive by the slot
+            serializer.reset_linked_objects()
+
+            self._manifest.insert_slot(slot)
+            self._commit_changes(cleanup=False)
+            return
+
+        with self._timer('dump', 'write', slot_key) as timer:
+            # Bytes that are actually written, stored objects are reused
+            written_size = 0
+
+            # Linked objects are stored first, so that the slot object is never found without them
+            for linked_object in serializer.get_linked_objects():
+                pack_object = slot.linked_pack_object(linked_object.data_hash)
+                if pack_object not in self._pack_objects_index:
+                    self._write_pack_object(pack_object, MemoryViewFileObject(linked_object.data_provider()),
+                                            linked_object.size, codec, compresslevel)
+                    written_size += linked_object.size
 
             # Check if there is already a pack object (dedup)
-            if slot.pack_object not in self._existing_pack_objects():
+            if slot.pack_object not in self._pack_objects_index:
                 # Store pack object
-                temp_fh.seek(0, sys_io.SEEK_SET)
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
-                    self._zip_fh.write(temp_fh.name, arcname=slot.pack_object)
+                self._write_pack_object(slot.pack_object, fp, size, codec, compresslevel,
+                                        alignment=serializer.get_data_alignment())
+                written_size += size
+            elif not codec.pack_object_suffix():
+                # Codecs of the zip archive share the same pack object, record the one actually used
+                compress_type = self._pack_objects_index[slot.pack_object].compress_type
+                slot.compression = get_codec_by_zip_compress_type(compress_type).codec_type()
+            timer.bytes = written_size
+        # Data providers of linked objects refer to the dumped object, which must not be kept alive by the slot
+        serializer.reset_linked_objects()
+
+        # Update manifest
+        self._manifest.insert_slot(slot)
+        for pack_object in slot.pack_objects:
+            self._add_pack_object_reference(pack_object)
+        self._commit_changes(cleanup=False)
+
+    def _write_pack_object(self, pack_object, fp, size, codec, compresslevel=None, alignment=None):
+        """
+        Stream the contents of a file object in a new pack object
+        :param str pack_object: The name of the pack object
+        :param typing.IO[bytes] fp: The file object to read data from
+        :param int size: The total size of data that will be written
+        :param mlio.io.compression.CompressionCodecBase codec: The compression codec of the object
+        :param int|None compresslevel: The compression level, if None the default of the codec will be used
+        :param (int, int)|None alignment: The alignment in bytes and the offset in data that must be aligned in
+        the pack file. It is applied only on objects stored without compression.
+        """
+        zip_info = ZipInfo(pack_object, date_time=time.localtime(time.time())[:6])
+        zip_info.compress_type = codec.zip_compress_type()
+        # Declare size in advance so that ZipFile can decide on zip64 extensions
+        zip_info.file_size = size
+        if alignment is not None and codec.codec_type() == PackManifestSlot.DEFAULT_COMPRESSION:
+            self._align_zip_info(self._zip_fh, zip_info, *alignment)
+
+        if compresslevel is not None and zip_info.compress_type != ZIP_STORED:
+            if _ZIP_INFO_COMPRESSLEVEL_ATTR is None:
+                raise ValueError("Compression level of codec {} is not supported by zipfile of this python version"
+                                 .format(codec.codec_type()))
+            setattr(zip_info, _ZIP_INFO_COMPRESSLEVEL_ATTR, compresslevel)
 
-            # Update manifest
-            self._manifest.insert_slot(slot)
-            self._update_manifest()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            with self._zip_fh.open(zip_info, 'w') as zip_member_fh:
+                codec.copy_compressed(fp, zip_member_fh, compresslevel)
+        self._strip_alignment_padding(zip_info)
+        self._zip_modified = True
 
-    def load(self, slot_key):
+        # Sizes and offset of the member are filled in by ZipFile when it is closed
+        self._pack_objects_index[pack_object] = zip_info
+
+    def load(self, slot_key, drain=True, mmap_mode=None):
         """
-        Load a serialized object from a slot in the pack
+        Load a serialized object from a slot in the pack. Data are hashed while the serializer consumes them, so
+        that each slot is read and decompressed only once.
         :param str slot_key: The key of the slot to load object from
+        :param bool drain: If True, trailing data that were not consumed by the serializer will be read to
+        complete verification. Otherwise, slots with trailing data that the serializer did not consume will fail
+        verification.
+        :param str|None mmap_mode: If not None, the object will be backed by a memory map of the pack file
+        instead of being loaded in memory. This is supported only by some serializers (e.g. numpy arrays) for
+        slots stored without compression. Use 'r' for read-only or 'c' for copy-on-write objects. The pack cannot
+        be compacted in-place while such objects are still referenced.
         :return: The unserialized object
         """
-        from ._lib import hash_file_object
+        with self._timer('load', 'total', slot_key) as timer:
+            slot = self._loadable_slot(slot_key, timed=True)
+            if mmap_mode is not None:
+                return self._load_slot_mapped(slot, mmap_mode, timer=timer)
+            return self._load_slot(slot, drain=drain, timer=timer)
+
+    def _loadable_slot(self, slot_key, timed=False):
+        """
+        Get the slot with a specific key, after checking that it can be loaded in current execution context
+        :param str slot_key: The key of the slot
+        :param bool timed: If True, the check of dependencies will be timed as a phase of a load
+        :rtype: PackManifestSlot
+        """
+        from .instrumentation import NULL_TIMER
 
         if not self.has_slot(slot_key):
             raise SlotKeyError("There is no slot with name {}".format(slot_key))
         slot = self.slots_info[slot_key]
 
         # Test that dependencies are satisfied
-        unsatisfied_dep_ids = slot.find_unsatisfied_dependencies()
+        with self._timer('load', 'dependencies', slot_key) if timed else NULL_TIMER:
+            unsatisfied_dep_ids = slot.find_unsatisfied_dependencies()
 
         if unsatisfied_dep_ids:
             raise MLIODependenciesNotSatisfied(
                 "Cannot load because dependencies: {} are not satisfied "
                 .format(", ".join(unsatisfied_dep_ids)))
+        return slot
 
-        # Check file hash
-        with self._zip_fh.open(slot.pack_object, 'r') as fp:
-
-            sha256 = hash_file_object(fp)
-            if sha256 != slot.serialized_sha256_hash:
-                raise MLIOPackSlotWrongChecksum(
-                    "Cannot load slot: {} as the serialized data seems corrupted"
-                    .format(slot_key))
+    def _load_slot(self, slot, drain=True, zip_fh=None, index=None, timer=None):
+        """
+        Load the object of a slot verifying its data
+        :param PackManifestSlot slot: The slot to load
+        :param bool drain: See Pack.load()
+        :param ZipFile|None zip_fh: The zip handler to read compressed objects from. If None the main
+        handler of the pack will be used.
+        :param int|slice|tuple|None index: If not None, only this part of the object will be loaded
+        :param mlio.io.instrumentation.PhaseTimer|None timer: The timer of the whole load, that was opened by the
+        caller. If None, the load will be timed on its own.
+        :return: The unserialized object
+        """
+        if timer is not None:
+            return self._load_slot_data(slot, timer, drain=drain, zip_fh=zip_fh, index=index)
+        with self._timer('load', 'total', slot.slot_key) as timer:
+            return self._load_slot_data(slot, timer, drain=drain, zip_fh=zip_fh, index=index)
 
-        # Load object
-        with self._zip_fh.open(slot.pack_object, 'r') as fp:
+    def _load_slot_data(self, slot, timer, drain=True, zip_fh=None, index=None):
+        """
+        Read, verify and unserialize the data of a slot. See Pack._load_slot()
+        :param PackManifestSlot slot: The slot to load
+        :param mlio.io.instrumentation.PhaseTimer timer: The timer of the whole load, to report the loaded bytes
+        :param bool drain: See Pack.load()
+        :param ZipFile|None zip_fh: See Pack._load_slot()
+        :param int|slice|tuple|None index: See Pack._load_slot()
+        :return: The unserialized object
+        """
+        from .instrumentation import metered_file, metered_hasher_factory
+        from ._lib import VerifiedFileObject
+
+        use_cache = self._cache is not None and index is None
+        if use_cache:
+            cache_key = self._cache_key(slot)
+            obj = self._cache.get(cache_key, _CACHE_MISS)
+            if obj is not _CACHE_MISS:
+                return obj
+
+        if slot.linked_objects:
+            slot.serializer.set_linked_objects_reader(partial(self._read_linked_object, slot))
+
+        # Reading and hashing are interleaved with unserializing, they are metered separately
+        read_meter = self._new_meter()
+        hash_meter = self._new_meter()
+        unserialize_timer = self._timer('load', 'unserialize', slot.slot_key,
+                                        excluded_meters=(read_meter, hash_meter))
+
+        identity = self._verification_identity(slot, slot.pack_object, slot.serialized_sha256_hash)
+        if not self._verification.needs_verification(identity):
+            with self._open_pack_object(slot.pack_object, slot.codec, zip_fh=zip_fh, slot=slot) as fp:
+                with unserialize_timer:
+                    obj = self._unserialize_slot(slot, metered_file(fp, read_meter), index)
+            size = self._pack_object_size(slot, slot.pack_object)
+        else:
+            # Load object while verifying file hash in a single pass
+            with self._open_pack_object(slot.pack_object, slot.codec, zip_fh=zip_fh, slot=slot) as fp:
+                verified_fp = VerifiedFileObject(
+                    metered_file(fp, read_meter),
+                    expected_hash=slot.serialized_sha256_hash,
+                    hasher=metered_hasher_factory(slot.hasher.new, hash_meter),
+                    error_message="Cannot load slot: {} as the serialized data seems corrupted".format(
+                        slot.slot_key))
+                try:
+                    with unserialize_timer:
+                        obj = self._unserialize_slot(slot, verified_fp, index)
+                except Exception:
+                    # Corrupted data will usually break the serializer first, report it as checksum error
+                    verified_fp.verify(drain=True)
+                    raise
+
+                verified_fp.verify(drain=drain)
+            self._verification.mark_verified(identity)
+            size = verified_fp.tell()
+
+        self._emit_meter('load', 'read', slot.slot_key, read_meter)
+        self._emit_meter('load', 'hash', slot.slot_key, hash_meter)
+        timer.bytes = size
+
+        if use_cache:
+            self._cache.put(cache_key, obj, size=size)
+        return obj
+
+    @staticmethod
+    def _unserialize_slot(slot, fp, index=None):
+        """
+        Unserialize the object of a slot, or a part of it
+        :param PackManifestSlot slot: The slot
+        :param typing.IO[bytes] fp: File object to read serialized data from
+        :param int|slice|tuple|None index: If not None, only this part of the object will be loaded
+        :return: The unserialized object
+        """
+        if index is None:
             return slot.serializer.load(fp)
+        return slot.serializer.load_slice(fp, index)
+
+    def _verification_identity(self, slot, pack_object, data_hash):
+        """
+        Get the identity of a pack object for the memo of the verification policy
+        :param PackManifestSlot slot: The slot of the object
+        :param str pack_object: The name of the pack object
+        :param str data_hash: The hash of the object data
+        :return: The identity of the object or None if the policy does not use it or it cannot be identified
+        :rtype: tuple|None
+        """
+        from .verification import VerifiedObjectsMemo
+
+        if self._verification.policy != 'once-per-process':
+            return None
+        if slot.external:
+            return self._required_blob_store(slot.slot_key).object_identity(pack_object, slot.hash_algorithm,
+                                                                            data_hash)
+        if pack_object not in self._pack_objects_index:
+            return None
+        return VerifiedObjectsMemo.object_identity(self._file_handler,
+                                                   self._pack_objects_index[pack_object].header_offset,
+                                                   slot.hash_algorithm, data_hash)
+
+    def _read_linked_object(self, slot, data_hash):
+        """
+        Read and verify the data of an object linked to a slot. Objects stored without compression are not copied.
+        :param PackManifestSlot slot: The slot that the object is linked to
+        :param str data_hash: The hash of the object data
+        :rtype: bytes|memoryview
+        """
+        if data_hash not in slot.linked_objects:
+            raise MLIOPackWrongFormat("Object {} is not linked to slot: {}".format(data_hash, slot.slot_key))
+
+        pack_object = slot.linked_pack_object(data_hash)
+        data = self._map_slot_object(slot, pack_object)
+        if data is None:
+            with self._open_pack_object(pack_object, slot.codec, slot=slot) as fp:
+                data = fp.read()
+
+        identity = self._verification_identity(slot, pack_object, data_hash)
+        if self._verification.needs_verification(identity):
+            if slot.hasher.hexdigest(data) != data_hash:
+                raise MLIOPackSlotWrongChecksum("Cannot load slot: {} as the data of a linked object seem corrupted"
+                                                .format(slot.slot_key))
+            self._verification.mark_verified(identity)
+        return data
+
+    def load_slice(self, slot_key, index):
+        """
+        Load a part of the object of a slot. Only the data needed for this part are read and verified. This is
+        supported only by some serializers (e.g. mlio.io.serializers.arrays.ChunkedArraySerializer).
+        :param str slot_key: The key of the slot to load object from
+        :param int|slice|tuple index: The index of the part, as it would be used with the [] operator
+        :return: The requested part of the object
+        """
+        with self._timer('load', 'total', slot_key) as timer:
+            slot = self._loadable_slot(slot_key, timed=True)
+            if not slot.serializer.supports_slicing():
+                raise TypeError("Slot: {} does not support partial loading".format(slot_key))
+            return self._load_slot(slot, index=index, timer=timer)
+
+    @staticmethod
+    def _cache_key(slot):
+        """
+        Get the key of a slot in the object cache. The same data could be unserialized differently by another
+        serializer, so the serializer type is part of the key.
+        :param PackManifestSlot slot: The slot
+        :rtype: tuple
+        """
+        return slot.serializer.serializer_type(), slot.hash_algorithm, slot.serialized_sha256_hash
+
+    async def aload(self, slot_key, executor=None, drain=True, mmap_mode=None):
+        """
+        Coroutine version of load(). Reading, hashing and unserialization run in an executor so that the event loop
+        is not blocked. Loads run concurrently with each other, but never while a dump of adump() writes the pack.
+
+        Concurrent awaits for the same slot are coalesced in a single load and get the same object. Cancelling an
+        await does not affect the others, the load itself is cancelled only if all of them are cancelled before the
+        executor starts it.
+        :param str slot_key: The key of the slot to load object from
+        :param concurrent.futures.Executor|None executor: A thread pool executor to run the load in. If None the
+        default executor of the event loop will be used.
+        :param bool drain: See Pack.load()
+        :param str|None mmap_mode: See Pack.load()
+        :return: The unserialized object
+        """
+        def locked_load():
+            with self._async_lock.read():
+                return self.load(slot_key, drain=drain, mmap_mode=mmap_mode)
+
+        slot = self._loadable_slot(slot_key)
+        return await self._coalesced_loads.call((slot_key, self._cache_key(slot), drain, mmap_mode), executor,
+                                                locked_load)
+
+    def load_lazy(self, slot_key):
+        """
+        Get a proxy of the object of a slot that will be loaded and verified the first time it is used. The
+        pack must remain open until then.
+        :param str slot_key: The key of the slot to load object from
+        :return: A transparent proxy of the unserialized object
+        :rtype: mlio.io.lazy.LazySlotProxy
+        """
+        from .lazy import LazySlotProxy
+
+        return LazySlotProxy(self, self._loadable_slot(slot_key))
+
+    def _has_pack_object(self, pack_object, slot=None):
+        """
+        Check if a pack object is still available for reading
+        :param str pack_object: The name of the pack object
+        :param PackManifestSlot|None slot: The slot of the object. Objects of external slots are looked up in the
+        blob store.
+        :rtype: bool
+        """
+        if self.closed:
+            raise ValueError("Cannot read from a closed pack")
+        if slot is not None and slot.external:
+            return self._required_blob_store(slot.slot_key).has(pack_object)
+        return pack_object in self._pack_objects_index
+
+    def load_many(self, slot_keys, workers=None):
+        """
+        Load multiple slots concurrently. Each worker reads the pack through its own file handler so that
+        reading, decompression and hashing are not serialized on a shared file pointer.
+        :param typing.Iterable[str] slot_keys: The keys of the slots to load
+        :param int|None workers: The number of worker threads. If None it will be decided by the executor.
+        :return: The unserialized objects mapped by their slot key, in the order of the given keys
+        :rtype: dict[str, T]
+        """
+        slot_keys = list(slot_keys)
+        objects = dict(self.iter_load_many(slot_keys, workers=workers))
+        return OrderedDict(
+            (slot_key, objects[slot_key])
+            for slot_key in slot_keys
+        )
+
+    def iter_load_many(self, slot_keys, workers=None):
+        """
+        Same as load_many() but it will yield slots in the order they finish loading
+        :param typing.Iterable[str] slot_keys: The keys of the slots to load
+        :param int|None workers: The number of worker threads. If None it will be decided by the executor.
+        :return: A generator of (slot key, object) tuples
+        :rtype: typing.Iterator[(str, T)]
+        """
+        # Fail fast before starting any work
+        slots = [
+            self._loadable_slot(slot_key)
+            for slot_key in slot_keys
+        ]
+
+        # Workers parse the central directory on their own, so it must be up to date in the file
+        self._flush_central_directory()
+
+        return self._iter_load_slots(slots, workers)
+
+    def _iter_load_slots(self, slots, workers):
+        """
+        Load slots in a thread pool yielding them in the order they finish loading
+        :param list[PackManifestSlot] slots: The slots to load
+        :param int|None workers: The number of worker threads
+        :rtype: typing.Iterator[(str, T)]
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        local = threading.local()
+        worker_handlers = []
+        worker_handlers_lock = threading.Lock()
+
+        def load_slot(slot):
+            if not hasattr(local, 'zip_fh'):
+                reader_fh = self._open_independent_reader()
+                local.zip_fh = ZipFile(reader_fh, 'r') if reader_fh is not None else None
+                with worker_handlers_lock:
+                    worker_handlers.append((local.zip_fh, reader_fh))
+            return slot.slot_key, self._load_slot(slot, zip_fh=local.zip_fh)
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(load_slot, slot)
+                    for slot in slots
+                ]
+                try:
+                    for future in as_completed(futures):
+                        yield future.result()
+                finally:
+                    for future in futures:
+                        future.cancel()
+        finally:
+            for zip_fh, reader_fh in worker_handlers:
+                if zip_fh is not None:
+                    zip_fh.close()
+                    reader_fh.close()
+
+    def _flush_central_directory(self):
+        """
+        Write the central directory of the archive in the file, if there are pending modifications
+        """
+        if not self._zip_modified:
+            return
+        self._zip_fh.close()
+        self._zip_fh = ZipFile(self._file_handler, self._mode)
+        self._zip_modified = False
+
+    def _open_independent_reader(self):
+        """
+        Open a new read-only file handler on the pack file, with its own file position
+        :return: The file handler or None if this is not possible for the current file object
+        :rtype: typing.IO[bytes]|None
+        """
+        from ._lib import PositionalFileReader
+
+        if hasattr(self._file_handler, 'flush'):
+            self._file_handler.flush()
+
+        try:
+            fileno = self._file_handler.fileno()
+        except (AttributeError, OSError, sys_io.UnsupportedOperation):
+            fileno = None
+
+        if fileno is not None and PositionalFileReader.is_supported():
+            return sys_io.BufferedReader(PositionalFileReader(fileno))
+
+        name = getattr(self._file_handler, 'name', None)
+        if isinstance(name, str) and os.path.isfile(name):
+            return open(name, 'rb')
+        return None
+
+    def open_slot_buffer(self, slot_key, verify=None):
+        """
+        Get zero-copy access to the serialized data of a slot. The data are exposed as a read-only view on a
+        memory map of the pack file, so that the page cache is shared among all processes that map the same pack.
+
+        This is only possible for slots stored without compression in packs backed by a real file. The pack cannot
+        be compacted in-place while the view, or any buffer derived from it, is still referenced.
+        :param str slot_key: The key of the slot
+        :param bool|None verify: If True the hash of data will be verified before returning the view. If None,
+        the verification policy of the pack decides.
+        :rtype: memoryview
+        """
+        if not self.has_slot(slot_key):
+            raise SlotKeyError("There is no slot with name {}".format(slot_key))
+        return self._open_slot_buffer(self.slots_info[slot_key], verify=verify)
+
+    def _open_slot_buffer(self, slot, verify=None, timed=False):
+        """
+        Get zero-copy access to the serialized data of a slot. See Pack.open_slot_buffer()
+        :param PackManifestSlot slot: The slot
+        :param bool|None verify: See Pack.open_slot_buffer()
+        :param bool timed: If True, the verification will be timed as the hash phase of a load
+        :rtype: memoryview
+        """
+        from .instrumentation import NULL_TIMER
+
+        view = self._map_slot_object(slot, slot.pack_object)
+        if view is None:
+            raise MLIOPackSlotNotMappable("Cannot memory-map slot: {} as it is either compressed or the pack "
+                                          "file does not support memory mapping".format(slot.slot_key))
+
+        identity = self._verification_identity(slot, slot.pack_object, slot.serialized_sha256_hash)
+        if verify is None:
+            verify = self._verification.needs_verification(identity)
+        if verify:
+            with self._timer('load', 'hash', slot.slot_key) if timed else NULL_TIMER as hash_timer:
+                hash_timer.bytes = view.nbytes
+                if slot.hasher.hexdigest(view) != slot.serialized_sha256_hash:
+                    raise MLIOPackSlotWrongChecksum("Cannot load slot: {} as the serialized data seems corrupted"
+                                                    .format(slot.slot_key))
+            self._verification.mark_verified(identity)
+        return view
+
+    def _load_slot_mapped(self, slot, mmap_mode, timer=None):
+        """
+        Load the object of a slot as a memory map of the pack file. The data are verified before mapping them,
+        according to the verification policy of the pack. Data are not read but paged in on access, so there is
+        no read phase to time.
+        :param PackManifestSlot slot: The slot to load
+        :param str mmap_mode: The mode of the memory map, 'r' for read-only or 'c' for copy-on-write
+        :param mlio.io.instrumentation.PhaseTimer|None timer: The timer of the whole load, that was opened by the
+        caller
+        :return: The unserialized object, backed by the pack file
+        """
+        if mmap_mode not in ('r', 'c'):
+            raise ValueError("Memory map mode must be either 'r' or 'c', the pack file cannot be modified")
+        if not slot.serializer.supports_mmap():
+            raise MLIOPackSlotNotMappable("Cannot memory-map slot: {} as its serializer does not support it"
+                                          .format(slot.slot_key))
+
+        with self._open_slot_buffer(slot, timed=True):
+            data_offset = 0 if slot.external else self._pack_object_data_offset(slot.pack_object)
+
+        # Serializer gets its own file handler so that the position of the pack file is not affected
+        if slot.external:
+            fh = self._required_blob_store(slot.slot_key).open_object(slot.pack_object)
+        else:
+            fh = open(os.dup(self._file_handler.fileno()), 'rb')
+        size = self._pack_object_size(slot, slot.pack_object)
+        with fh, self._timer('load', 'unserialize', slot.slot_key):
+            obj = slot.serializer.load_mapped(
+                fh,
+                offset=data_offset,
+                size=size,
+                mmap_mode=mmap_mode)
+        if timer is not None:
+            timer.bytes = size
+
+        if not slot.external:
+            with self._mmap_lock:
+                try:
+                    self._track_mapped(obj)
+                except TypeError:
+                    # Objects that cannot be tracked are only protected by the documented restriction
+                    pass
+        return obj
 
     def remove(self, slot_key):
         """
         Remove a serialized object from a slot
         :param str slot_key: The key of the slot to remove
         """
+        self._check_writable()
         if not self.has_slot(slot_key):
             raise SlotKeyError("There is no slot with name {}".format(slot_key))
 
-        # Delete meta data from manifest file
-        self._manifest.remove_slot(slot_key)
+        with self._timer('remove', 'total', slot_key):
+            # Delete meta data from manifest file and remove dangling objects. Objects of the blob store are only
+            # removed by its garbage collection.
+            slot = self.slots_info[slot_key]
+            pack_objects = [] if slot.external else slot.pack_objects
+            self._manifest.remove_slot(slot_key)
+            for pack_object in pack_objects:
+                self._remove_pack_object_reference(pack_object)
+            self._commit_changes(cleanup=True)
+
+    def _add_whiteout(self, slot_key):
+        """
+        Record in the manifest that a slot of the packs below this one is removed. See mlio.io.layered.LayeredPack
+        :param str slot_key: The key of the removed slot
+        """
+        self._check_writable()
+        self._manifest.add_whiteout(slot_key)
+        self._commit_changes(cleanup=False)
+
+    def _insert_slot_from(self, source, slot_key):
+        """
+        Insert a slot of another pack, copying its stored objects as they are without unserializing them
+        :param Pack source: The pack to copy slot from
+        :param str slot_key: The key of the slot
+        """
+        self._check_writable()
+        if self.has_slot(slot_key):
+            raise SlotKeyError("Cannot overwrite slot with id: {}".format(slot_key))
+        source_slot = source.slots_info[slot_key]
+
+        # Objects of external slots stay in the blob store
+        for pack_object in ([] if source_slot.external else source_slot.pack_objects):
+            if pack_object not in self._pack_objects_index:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    self._copy_zip_member(source._zip_fh, self._zip_fh, pack_object)
+                self._pack_objects_index[pack_object] = self._zip_fh.getinfo(pack_object)
+                self._zip_modified = True
+
+        slot = PackManifestSlot.from_dict(slot_key, source_slot.to_dict(), source_slot.dependencies)
+        self._manifest.insert_slot(slot)
+        for pack_object in ([] if slot.external else slot.pack_objects):
+            self._add_pack_object_reference(pack_object)
+        self._commit_changes(cleanup=False)
+
+    def _commit_changes(self, cleanup):
+        """
+        Persist the changes of the manifest in the pack. Inside a transaction, changes are deferred until it is
+        committed.
+        :param bool cleanup: If True dangling pack objects will also be removed
+        """
+        if self._transaction_depth:
+            self._transaction_has_changes = True
+            return
+
         self._update_manifest()
+        if cleanup:
+            self._cleanup_dangling_pack_objects()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group multiple dump and remove operations so that the manifest is written, and dangling objects are
+        cleaned-up, only once when the transaction is committed. If an exception is raised, all changes
+        of the manifest are rolled back and objects stored in the meantime are removed.
+
+        Nested transactions are merged with the outermost one.
+
+        with Pack(fp) as pck:
+            with pck.transaction():
+                for key, obj in objects.items():
+                    pck.dump(key, obj)
+        """
+        self._check_writable()
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if not self._transaction_depth and self._transaction_has_changes:
+                self._transaction_has_changes = False
+                self._manifest = self._load_or_create_manifest()
+                self._count_pack_object_references()
+                # Any object could have been stored during the transaction
+                self._dangling_candidates = set(self._pack_objects_index)
+                self._cleanup_dangling_pack_objects()
+            raise
+        else:
+            self._transaction_depth -= 1
+            if not self._transaction_depth and self._transaction_has_changes:
+                self._transaction_has_changes = False
+                self._commit_changes(cleanup=True)
+
+    def compact(self, target=None):
+        """
+        Rewrite the pack keeping only the objects that are referenced by slots and the latest manifest. Removed
+        objects (zero-sized tombstones) and previous copies of the manifest are dropped, reclaiming their space.
+
+        The compacted archive is fully built in a temporary file before the pack file is overwritten. For an
+        atomic replacement, a target file object can be given instead. In that case the pack file is left
+        untouched and the target can then be moved over the original one with os.replace().
+
+        Compaction in-place is not permitted while memory views returned by open_slot_buffer(), objects loaded with
+        mmap_mode or other objects that share memory with the pack file (e.g. out-of-band pickle buffers) are
+        still referenced, as the file is rewritten under them. Compaction is not permitted inside a transaction
+        either, as it would persist changes that can still be rolled back.
+        :param typing.IO[bytes]|None target: An empty file object to write the compacted pack in. If None the pack
+        file will be compacted in-place.
+        :return: Statistics of the compaction
+        :rtype: PackCompactionStats
+        """
+        if target is None:
+            self._check_writable()
+        if self._transaction_depth:
+            raise MLIOPackBusyError("Cannot compact a pack inside a transaction")
+        if target is None and self._has_mapped_data():
+            raise MLIOPackBusyError("Cannot compact in-place a pack while data of its memory map are still in use")
+        if target is None and hasattr(self._file_handler, 'writable') and not self._file_handler.writable():
+            raise ValueError("Cannot compact in-place a pack whose file object is not writable")
+
+        manifest_json = json.dumps(self._manifest.to_dict())
+        live_objects = self._referenced_pack_objects()
+
+        # Finalize the current archive and release any map before its contents change
+        self._zip_fh.close()
+        self._release_mmap()
+
+        compacted_fh = target if target is not None else tempfile.TemporaryFile('w+b')
+        try:
+            bytes_before = self._file_handler.seek(0, sys_io.SEEK_END)
+            compacted_start = compacted_fh.tell()
+
+            with ZipFile(self._file_handler, 'r') as source_zip, ZipFile(compacted_fh, 'w') as target_zip:
+                entries_before = len(source_zip.infolist())
+
+                for pack_object in sorted(live_objects):
+                    self._copy_zip_member(source_zip, target_zip, pack_object)
+                target_zip.writestr(PackManifest.MANIFEST_FILENAME, manifest_json)
+
+                entries_after = len(target_zip.infolist())
+
+            bytes_after = compacted_fh.seek(0, sys_io.SEEK_END) - compacted_start
+
+            if target is None:
+                # Overwrite pack file with the compacted archive
+                compacted_fh.seek(0, sys_io.SEEK_SET)
+                self._file_handler.seek(0, sys_io.SEEK_SET)
+                shutil.copyfileobj(compacted_fh, self._file_handler, self.COPY_BLOCK_SIZE)
+                self._file_handler.truncate()
+                self._file_handler.flush()
+        finally:
+            if target is None:
+                compacted_fh.close()
+            self._zip_fh = ZipFile(self._file_handler, self._mode)
+            self._zip_modified = False
+            self._index_pack_objects()
+
+        return PackCompactionStats(
+            entries_before=entries_before,
+            entries_after=entries_after,
+            bytes_before=bytes_before,
+            bytes_after=bytes_after
+        )
+
+    def _copy_zip_member(self, source_zip, target_zip, name):
+        """
+        Copy a member between two zip archives keeping its compression type
+        :param ZipFile source_zip: The archive to read member from
+        :param ZipFile target_zip: The archive to write member in
+        :param str name: The name of the member
+        """
+        from ._lib import zip_member_alignment, read_zip_member_data_offset
+
+        source_info = source_zip.getinfo(name)
+
+        target_info = ZipInfo(name, date_time=source_info.date_time)
+        target_info.compress_type = source_info.compress_type
+        target_info.file_size = source_info.file_size
+
+        alignment = zip_member_alignment(source_info)
+        if alignment is not None:
+            # Keep the same position of data relative to the alignment boundaries
+            source_data_offset = read_zip_member_data_offset(source_zip.fp, source_info)
+            self._align_zip_info(target_zip, target_info, alignment, -source_data_offset % alignment)
+
+        with source_zip.open(source_info, 'r') as source_fh, target_zip.open(target_info, 'w') as target_fh:
+            shutil.copyfileobj(source_fh, target_fh, self.COPY_BLOCK_SIZE)
+        self._strip_alignment_padding(target_info)
+
+    @staticmethod
+    def _align_zip_info(zip_fh, zip_info, alignment, data_offset):
+        """
+        Pad the local header of a new zip member so that an offset of its data will be aligned when it is written
+        :param ZipFile zip_fh: The zip archive that the member will be written in
+        :param ZipInfo zip_info: The info object of the new member
+        :param int alignment: The alignment in bytes
+        :param int data_offset: The offset in data that must be aligned
+        """
+        from ._lib import zip_alignment_extra
+
+        zip64 = zip_info.file_size * 1.05 > ZIP64_LIMIT
+        zip_info.extra = zip_alignment_extra(zip_fh.start_dir, zip_info, alignment, data_offset, zip64=zip64)
+
+    @staticmethod
+    def _strip_alignment_padding(zip_info):
+        """
+        Drop the padding of a zip member that has been written, so that it is not repeated in the central
+        directory. The local header is already written, the requested alignment is kept for compaction.
+        :param ZipInfo zip_info: The info object of the written member
+        """
+        from ._lib import strip_zip_alignment_padding
 
-        # Remove dangling objects
-        self._cleanup_dangling_pack_objects()
+        zip_info.extra = strip_zip_alignment_padding(zip_info.extra)
 
     def __contains__(self, item):
         return self.has_slot(item)
@@ -0,0 +1,264 @@
+import os
+import re
+import io as sys_io
+import threading
+from collections import OrderedDict
+
+from .exc import MLIORemoteReadError
+
+
+class RangeReaderBase(object):
+    """
+    Base class for implementing a backend that reads byte ranges of a remote file
+    """
+
+    def size(self):
+        """
+        Get the total size of the remote file
+        :rtype: int
+        """
+        raise NotImplementedError()
+
+    def read_range(self, offset, length):
+        """
+        Read a byte range of the remote file
+        :param int offset: The offset of the first byte
+        :param int length: The number of bytes to read. The range is always inside the file.
+        :rtype: bytes
+        """
+        raise NotImplementedError()
+
+    @property
+    def name(self):
+        """
+        A name that identifies the remote file
+        :rtype: str
+        """
+        raise NotImplementedError()
+
+
+class LocalFileRangeReader(RangeReaderBase):
+    """
+    Stand-in backend that reads ranges of a local file, e.g. for testing code that reads remote packs
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the reader
+        :param str path: The path of the local file
+        """
+        self._path = path
+
+    def size(self):
+        return os.path.getsize(self._path)
+
+    def read_range(self, offset, length):
+        with open(self._path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+        if len(data) != length:
+            raise MLIORemoteReadError("Short read of range {}-{} of {}"
+                                      .format(offset, offset + length - 1, self._path))
+        return data
+
+    @property
+    def name(self):
+        # Not a plain path, so that readers of packs do not open the file directly
+        return 'file://{}'.format(os.path.abspath(self._path))
+
+
+class HTTPRangeReader(RangeReaderBase):
+    """
+    Backend that reads ranges of a file served over HTTP(S) with range requests. The server must support the
+    "Range" header. If it provides an ETag, the file is expected to stay the same while it is read.
+    """
+
+    _CONTENT_RANGE_RE = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+
+    def __init__(self, url, headers=None, timeout=60):
+        """
+        Initialize the reader
+        :param str url: The url of the file
+        :param dict[str, str]|None headers: Extra headers of all requests (e.g. for authorization)
+        :param int|float timeout: The timeout of each request in seconds
+        """
+        self._url = url
+        self._headers = dict(headers or {})
+        self._timeout = timeout
+        self._size = None
+        self._etag = None
+
+    def _request_range(self, offset, length):
+        """
+        Send a range request
+        :param int offset: The offset of the first byte
+        :param int length: The number of bytes to read
+        :return: The total size of the file and the data of the range
+        :rtype: (int, bytes)
+        """
+        from urllib.request import Request, urlopen
+        from urllib.error import HTTPError
+
+        headers = dict(self._headers)
+        headers['Range'] = 'bytes={}-{}'.format(offset, offset + length - 1)
+        if self._etag is not None:
+            headers['If-Match'] = self._etag
+
+        try:
+            with urlopen(Request(self._url, headers=headers), timeout=self._timeout) as response:
+                if response.status != 206:
+                    raise MLIORemoteReadError("Server of {} does not support range requests".format(self._url))
+                content_range = self._CONTENT_RANGE_RE.match(response.headers.get('Content-Range', ''))
+                if content_range is None or content_range.group(3) == '*':
+                    raise MLIORemoteReadError("Invalid Content-Range of response from {}".format(self._url))
+                if self._etag is None:
+                    self._etag = response.headers.get('ETag')
+                data = response.read()
+        except HTTPError as e:
+            if e.code == 412:
+                raise MLIORemoteReadError("File {} was modified while reading it".format(self._url))
+            raise MLIORemoteReadError("Cannot read range of {}: {}".format(self._url, e))
+
+        if int(content_range.group(1)) != offset or len(data) != length:
+            raise MLIORemoteReadError("Server of {} returned a different range than requested".format(self._url))
+        return int(content_range.group(3)), data
+
+    def size(self):
+        if self._size is None:
+            self._size, _ = self._request_range(0, 1)
+        return self._size
+
+    def read_range(self, offset, length):
+        return self._request_range(offset, length)[1]
+
+    @property
+    def name(self):
+        return self._url
+
+
+class RemoteFileObject(sys_io.RawIOBase):
+    """
+    Read-only seekable file object on top of a range reader. Data are fetched lazily in fixed size blocks that are
+    kept in an LRU cache, so that a pack opened in read-only mode fetches only its central directory, its manifest
+    and the data of the loaded slots.
+
+    When blocks are read sequentially, the following blocks are fetched in the same request (read-ahead), so that
+    large slots are transferred in few requests.
+
+    with Pack(RemoteFileObject(HTTPRangeReader('https://models.example.com/big.pack')), mode='r') as pck:
+        model = pck.load('model-en')
+    """
+
+    def __init__(self, reader, block_size=256 * 1024, cache_blocks=64, read_ahead=4):
+        """
+        Initialize the file object
+        :param RangeReaderBase reader: The backend to read ranges of the file from
+        :param int block_size: The size of the fetched blocks
+        :param int cache_blocks: The maximum number of blocks kept in memory
+        :param int read_ahead: The maximum number of extra blocks fetched on sequential reads
+        """
+        super(RemoteFileObject, self).__init__()
+        if block_size <= 0 or cache_blocks <= 0 or read_ahead < 0:
+            raise ValueError("Block size and cache blocks must be positive and read-ahead not negative")
+
+        self._reader = reader
+        self.block_size = block_size
+        self.cache_blocks = cache_blocks
+        self.read_ahead = read_ahead
+        self._size = reader.size()
+        self._position = 0
+        self._blocks = OrderedDict()
+        self._last_read_end = None
+        self._lock = threading.Lock()
+
+        # Statistics of transfer
+        self.requests = 0
+        self.bytes_fetched = 0
+
+    @property
+    def name(self):
+        """:rtype: str"""
+        return self._reader.name
+
+    @property
+    def mode(self):
+        """:rtype: str"""
+        return 'rb'
+
+    def _fetch_blocks(self, first_block, last_block, sequential):
+        """
+        Make sure that a range of blocks are cached. Missing blocks are fetched in a single request. The lock must
+        be held by the caller.
+        :param int first_block: The index of the first block
+        :param int last_block: The index of the last block (inclusive)
+        :param bool sequential: If the read continues the previous one, so that blocks are read ahead
+        """
+        missing = [index for index in range(first_block, last_block + 1) if index not in self._blocks]
+        if missing:
+            fetch_first, fetch_last = missing[0], missing[-1]
+            if sequential:
+                total_blocks = (self._size + self.block_size - 1) // self.block_size
+                fetch_last = min(fetch_last + self.read_ahead, total_blocks - 1)
+
+            offset = fetch_first * self.block_size
+            length = min((fetch_last + 1) * self.block_size, self._size) - offset
+            data = self._reader.read_range(offset, length)
+            self.requests += 1
+            self.bytes_fetched += len(data)
+
+            for index in range(fetch_first, fetch_last + 1):
+                start = (index - fetch_first) * self.block_size
+                # Blocks that are already cached are replaced by identical data
+                self._blocks[index] = data[start:start + self.block_size]
+
+        for index in range(first_block, last_block + 1):
+            self._blocks.move_to_end(index)
+        while len(self._blocks) > max(self.cache_blocks, last_block - first_block + 1):
+            self._blocks.popitem(last=False)
+
+    def readinto(self, b):
+        with self._lock:
+            view = memoryview(b).cast('B')
+            end = min(self._position + len(view), self._size)
+            if end <= self._position:
+                return 0
+
+            first_block = self._position // self.block_size
+            last_block = (end - 1) // self.block_size
+            self._fetch_blocks(first_block, last_block, sequential=self._position == self._last_read_end)
+
+            written = 0
+            for index in range(first_block, last_block + 1):
+                block = self._blocks[index]
+                block_offset = index * self.block_size
+                start = max(self._position, block_offset) - block_offset
+                stop = min(end, block_offset + len(block)) - block_offset
+                view[written:written + stop - start] = block[start:stop]
+                written += stop - start
+
+            self._position = self._last_read_end = end
+            return written
+
+    def seek(self, offset, whence=sys_io.SEEK_SET):
+        if whence == sys_io.SEEK_SET:
+            position = offset
+        elif whence == sys_io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == sys_io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError("Invalid whence ({!r})".format(whence))
+
+        if position < 0:
+            raise ValueError("Negative seek position {}".format(position))
+        self._position = position
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
@@ -1,9 +1,12 @@
 from ._registry import get_serializer_by_type, find_suitable_serializer, register_serializer
-from . import generic, gensim
+from . import generic, gensim, arrays
 
 # Register serializer by importance (Last more important)
 register_serializer(generic.DefaultSerializer)
 register_serializer(generic.GenericMLModelsSerializer)
+register_serializer(generic.OutOfBandPickleSerializer)
+register_serializer(arrays.NumpyArraySerializer)
+register_serializer(arrays.ChunkedArraySerializer)
 register_serializer(gensim.GensimWord2VecModelsSerializer)
 
 
@@ -1,7 +1,11 @@
+import weakref
 from collections import OrderedDict
 
 __serializers_registry = OrderedDict()
 
+# The candidate serializers for each type of objects, in order of importance
+__candidates_by_type = weakref.WeakKeyDictionary()
+
 
 class UnknownObjectType(KeyError):
     """
@@ -17,6 +21,26 @@ class UnknownSerializer(KeyError):
     pass
 
 
+def _find_candidate_serializers(obj_type):
+    """
+    Find the serializers that may accept objects of a type, based on the types that they declare
+    :param type obj_type: The type of the objects
+    :return: The candidate serializers in order of importance
+    :rtype: tuple[mlio.io.serializers.implementations.SerializerBase]
+    """
+    type_names = {
+        '{}.{}'.format(base_type.__module__, base_type.__qualname__)
+        for base_type in obj_type.__mro__
+    }
+
+    candidates = []
+    for serializer in __serializers_registry.values():
+        serializable_types = serializer.serializable_types()
+        if serializable_types is None or type_names.intersection(serializable_types):
+            candidates.append(serializer)
+    return tuple(candidates)
+
+
 def find_suitable_serializer(obj):
     """
     Find serializer that is suitable for this operation
@@ -24,12 +48,17 @@ def find_suitable_serializer(obj):
     :return: The first suitable serializer for this type of object
     :rtype: mlio.io.serializers.implementations.SerializerBase
     """
+    obj_type = type(obj)
+    try:
+        candidates = __candidates_by_type[obj_type]
+    except KeyError:
+        candidates = __candidates_by_type[obj_type] = _find_candidate_serializers(obj_type)
 
-    for serializer in __serializers_registry.values():
+    for serializer in candidates:
         if serializer.can_serialize(obj):
             return serializer
 
-    raise UnknownObjectType("Cannot find a suitalble serializer for object of type {}".format(type(object)))
+    raise UnknownObjectType("Cannot find a suitalble serializer for object of type {}".format(obj_type))
 
 
 def get_serializer_by_type(serializer_type):
@@ -55,5 +84,6 @@ def register_serializer(serializer):
     global __serializers_registry
     __serializers_registry[serializer.serializer_type()] = serializer
     __serializers_registry.move_to_end(serializer.serializer_type(), last=False)
+    __candidates_by_type.clear()
 
     return serializer
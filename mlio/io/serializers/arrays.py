@@ -0,0 +1,340 @@
+import json
+import mmap
+import operator
+import itertools
+from functools import partial
+
+from .base import EmulateStringOperationsMixIn, SerializerBase, get_object_root_module
+
+
+class NumpyArraySerializer(EmulateStringOperationsMixIn, SerializerBase):
+    """
+    Serializer for numpy arrays of plain data types, stored in the .npy format. The data of arrays that span at
+    least a page are aligned to page boundaries in the pack, so that slots stored without compression can be loaded
+    as numpy.memmap directly from the pack file.
+
+    The .npy format is stable across numpy versions, so no dependency on the exact version is added.
+    """
+
+    # Alignment of the array data in the pack file
+    DATA_ALIGNMENT = mmap.PAGESIZE
+
+    def __init__(self):
+        super(NumpyArraySerializer, self).__init__()
+        self._data_alignment = None
+
+    @classmethod
+    def serializer_type(cls):
+        return 'numpy-ndarray'
+
+    @classmethod
+    def serializable_types(cls):
+        return 'numpy.ndarray',
+
+    @classmethod
+    def can_serialize(cls, obj):
+        if get_object_root_module(obj) != 'numpy':
+            return False
+
+        import numpy
+
+        # Subclasses like matrix or masked arrays carry more than the data, object arrays need pickle
+        return type(obj) in (numpy.ndarray, numpy.memmap) and not obj.dtype.hasobject
+
+    @classmethod
+    def supports_mmap(cls):
+        return True
+
+    def dump(self, obj, fh):
+        from numpy.lib import format as npy_format
+
+        start = fh.tell()
+        npy_format.write_array(fh, obj, allow_pickle=False)
+        header_size = fh.tell() - start - obj.nbytes
+
+        # Padding would outweigh the data of small arrays, which are mapped unaligned
+        self._data_alignment = (self.DATA_ALIGNMENT, header_size) if obj.nbytes >= self.DATA_ALIGNMENT else None
+
+    def reset_dump_state(self):
+        super(NumpyArraySerializer, self).reset_dump_state()
+        self._data_alignment = None
+
+    def load(self, fh):
+        from numpy.lib import format as npy_format
+
+        return npy_format.read_array(fh, allow_pickle=False)
+
+    def load_mapped(self, fh, offset, size, mmap_mode='r'):
+        import numpy
+        from numpy.lib import format as npy_format
+
+        fh.seek(offset)
+        version = npy_format.read_magic(fh)
+        header_readers = {
+            (1, 0): npy_format.read_array_header_1_0,
+            (2, 0): npy_format.read_array_header_2_0,
+        }
+        if version not in header_readers:
+            raise ValueError("Cannot memory-map arrays of .npy format version {}.{}".format(*version))
+        shape, fortran_order, dtype = header_readers[version](fh)
+
+        if not dtype.itemsize or 0 in shape:
+            # Empty files cannot be memory-mapped
+            return numpy.empty(shape, dtype=dtype, order='F' if fortran_order else 'C')
+
+        return numpy.memmap(fh, dtype=dtype, mode=mmap_mode, offset=fh.tell(), shape=shape,
+                            order='F' if fortran_order else 'C')
+
+    def get_data_alignment(self):
+        return self._data_alignment
+
+
+def _chunk_buffer(array, region):
+    """
+    Get the data of a chunk of an array, in C order
+    :param numpy.ndarray array: The whole array
+    :param tuple[slice] region: The region of the chunk
+    :rtype: memoryview
+    """
+    import numpy
+
+    return memoryview(numpy.ascontiguousarray(array[region])).cast('B')
+
+
+class ChunkedArraySerializer(SerializerBase):
+    """
+    Serializer for numpy arrays that splits them in chunks of fixed shape. Each chunk is stored as a separate pack
+    object with its own hash, so that parts of the array can be loaded with Pack.load_slice() by reading and
+    verifying only the chunks that overlap with the requested part. The serialized format of the slot is a
+    JSON header with the layout of the array and the hashes of its chunks.
+
+    This serializer is never selected automatically, it must be given explicitly to Pack.dump():
+
+    pck.dump('embeddings', embeddings, serializer=ChunkedArraySerializer(chunk_shape=(10000, None)))
+    """
+
+    # Version of the layout of the header
+    FORMAT_VERSION = 1
+
+    # The approximate size of chunks when no chunk shape is given
+    DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+    def __init__(self, chunk_shape=None):
+        """
+        Initialize the serializer
+        :param tuple[int|None]|int|None chunk_shape: The shape of the chunks. None on an axis means that chunks
+        will span the whole axis, and missing trailing axes are treated the same way. An integer is the same
+        as chunking only on the first axis. If None, arrays will be split on the first axis in chunks of about
+        DEFAULT_CHUNK_SIZE bytes.
+        """
+        super(ChunkedArraySerializer, self).__init__()
+        self.chunk_shape = chunk_shape
+
+    @classmethod
+    def serializer_type(cls):
+        return 'numpy-chunked-ndarray'
+
+    @classmethod
+    def serializable_types(cls):
+        return ()
+
+    @classmethod
+    def can_serialize(cls, obj):
+        # Chunking is a storage decision, so it is only used when asked explicitly
+        return False
+
+    @classmethod
+    def supports_slicing(cls):
+        return True
+
+    def _resolve_chunk_shape(self, array):
+        """
+        Get the actual chunk shape for an array
+        :param numpy.ndarray array: The array to be chunked
+        :rtype: tuple[int]
+        """
+        chunk_shape = self.chunk_shape
+        if chunk_shape is None and array.ndim:
+            row_size = max(array.itemsize * (array.size // array.shape[0] if array.shape[0] else 0), 1)
+            chunk_shape = (max(self.DEFAULT_CHUNK_SIZE // row_size, 1),)
+        elif chunk_shape is None:
+            chunk_shape = ()
+        elif isinstance(chunk_shape, int):
+            chunk_shape = (chunk_shape,)
+        chunk_shape = tuple(chunk_shape)
+
+        if len(chunk_shape) > array.ndim:
+            raise ValueError("Chunk shape {} has more dimensions than the array".format(chunk_shape))
+        chunk_shape = chunk_shape + (None,) * (array.ndim - len(chunk_shape))
+
+        resolved = []
+        for chunk_size, axis_size in zip(chunk_shape, array.shape):
+            if chunk_size is None:
+                chunk_size = axis_size
+            elif chunk_size <= 0:
+                raise ValueError("Chunk sizes must be positive, got {}".format(chunk_shape))
+            resolved.append(max(min(chunk_size, axis_size), 1))
+        return tuple(resolved)
+
+    @staticmethod
+    def _chunk_grid(shape, chunk_shape):
+        """
+        Get the number of chunks on each axis
+        :param tuple[int] shape: The shape of the array
+        :param tuple[int] chunk_shape: The shape of the chunks
+        :rtype: tuple[int]
+        """
+        return tuple(
+            -(-axis_size // chunk_size)
+            for axis_size, chunk_size in zip(shape, chunk_shape)
+        )
+
+    @staticmethod
+    def _chunk_region(coordinates, shape, chunk_shape):
+        """
+        Get the region of the array that is covered by a chunk
+        :param tuple[int] coordinates: The coordinates of the chunk in the grid of chunks
+        :param tuple[int] shape: The shape of the array
+        :param tuple[int] chunk_shape: The shape of the chunks
+        :rtype: tuple[slice]
+        """
+        return tuple(
+            slice(coordinate * chunk_size, min((coordinate + 1) * chunk_size, axis_size))
+            for coordinate, chunk_size, axis_size in zip(coordinates, chunk_shape, shape)
+        )
+
+    def dump(self, obj, fh):
+
+        if not NumpyArraySerializer.can_serialize(obj) or obj.dtype.fields is not None:
+            raise TypeError("Only numpy arrays of plain data types can be chunked, got {}".format(type(obj)))
+
+        chunk_shape = self._resolve_chunk_shape(obj)
+        chunks = []
+        for coordinates in itertools.product(*map(range, self._chunk_grid(obj.shape, chunk_shape))):
+            region = self._chunk_region(coordinates, obj.shape, chunk_shape)
+            chunk_data = _chunk_buffer(obj, region)
+            chunk_hash = self._hash_data(chunk_data)
+            chunks.append(chunk_hash)
+            # Chunks are copied again when they are stored, instead of keeping all of them in memory
+            self._add_linked_object(chunk_hash, chunk_data.nbytes, partial(_chunk_buffer, obj, region))
+
+        header = {
+            'format_version': self.FORMAT_VERSION,
+            'shape': list(obj.shape),
+            'dtype': obj.dtype.str,
+            'chunk_shape': list(chunk_shape),
+            'chunks': chunks
+        }
+        fh.write(json.dumps(header).encode('utf-8'))
+
+    def _load_header(self, fh):
+        """
+        Read the header of a chunked array
+        :param typing.IO[bytes] fh: File-like object
+        :return: The shape, the data type and the shape of the chunks of the array and a mapping of chunk
+        coordinates to their hashes
+        :rtype: (tuple[int], numpy.dtype, tuple[int], dict[tuple[int], str])
+        """
+        import numpy
+
+        header = json.loads(fh.read().decode('utf-8'))
+        if header.get('format_version') != self.FORMAT_VERSION:
+            raise ValueError("Unsupported format version of chunked array: {}".format(header.get('format_version')))
+
+        shape = tuple(header['shape'])
+        chunk_shape = tuple(header['chunk_shape'])
+        chunks = dict(zip(itertools.product(*map(range, self._chunk_grid(shape, chunk_shape))), header['chunks']))
+        return shape, numpy.dtype(header['dtype']), chunk_shape, chunks
+
+    def _load_chunk(self, chunk_hash, region, dtype):
+        """
+        Load the data of a chunk as an array
+        :param str chunk_hash: The hash of the chunk
+        :param tuple[slice] region: The region of the array that is covered by the chunk
+        :param numpy.dtype dtype: The data type of the array
+        :rtype: numpy.ndarray
+        """
+        import numpy
+
+        chunk_shape = tuple(axis_slice.stop - axis_slice.start for axis_slice in region)
+        return numpy.frombuffer(self._read_linked_object(chunk_hash), dtype=dtype).reshape(chunk_shape)
+
+    def load(self, fh):
+        import numpy
+
+        shape, dtype, chunk_shape, chunks = self._load_header(fh)
+        array = numpy.empty(shape, dtype=dtype)
+        for coordinates, chunk_hash in chunks.items():
+            region = self._chunk_region(coordinates, shape, chunk_shape)
+            array[region] = self._load_chunk(chunk_hash, region, dtype)
+        return array
+
+    def load_slice(self, fh, index):
+        import numpy
+
+        shape, dtype, chunk_shape, chunks = self._load_header(fh)
+        bounds, relative_index = _normalize_array_index(index, shape)
+
+        # Assemble the bounding box of the requested part from the chunks that overlap with it
+        bounding_box = numpy.empty(tuple(stop - start for start, stop in bounds), dtype=dtype)
+        overlapping_coordinates = [
+            range(start // chunk_size, -(-stop // chunk_size)) if stop > start else range(0)
+            for (start, stop), chunk_size in zip(bounds, chunk_shape)
+        ]
+        for coordinates in itertools.product(*overlapping_coordinates):
+            region = self._chunk_region(coordinates, shape, chunk_shape)
+            overlap = tuple(
+                (max(start, axis_slice.start), min(stop, axis_slice.stop))
+                for (start, stop), axis_slice in zip(bounds, region)
+            )
+            chunk = self._load_chunk(chunks[coordinates], region, dtype)
+            bounding_box[tuple(slice(lo - start, hi - start) for (lo, hi), (start, _) in zip(overlap, bounds))] = \
+                chunk[tuple(slice(lo - axis_slice.start, hi - axis_slice.start)
+                            for (lo, hi), axis_slice in zip(overlap, region))]
+
+        return bounding_box[relative_index]
+
+
+def _normalize_array_index(index, shape):
+    """
+    Convert a basic numpy index (integers and slices) to the bounding box of the indexed part and the index
+    relative to this bounding box.
+    :param int|slice|tuple index: The index
+    :param tuple[int] shape: The shape of the indexed array
+    :return: The (start, stop) of the bounding box on each axis and the relative index
+    :rtype: (list[(int, int)], tuple)
+    """
+
+    if not isinstance(index, tuple):
+        index = (index,)
+    if len(index) > len(shape):
+        raise IndexError("Too many indices for array of {} dimensions".format(len(shape)))
+    index = index + (slice(None),) * (len(shape) - len(index))
+
+    bounds = []
+    relative_index = []
+    for axis_index, axis_size in zip(index, shape):
+        if isinstance(axis_index, slice):
+            start, stop, step = axis_index.indices(axis_size)
+            selected = range(start, stop, step)
+            if not selected:
+                bounds.append((0, 0))
+                relative_index.append(slice(0, 0))
+                continue
+            low, high = min(selected[0], selected[-1]), max(selected[0], selected[-1]) + 1
+            bounds.append((low, high))
+            relative_stop = selected[-1] - low + (1 if step > 0 else -1)
+            relative_index.append(slice(selected[0] - low, relative_stop if relative_stop >= 0 else None, step))
+        else:
+            try:
+                position = operator.index(axis_index)
+            except TypeError:
+                raise IndexError("Only integers and slices are supported for partial loading, got {!r}"
+                                 .format(axis_index))
+            if not -axis_size <= position < axis_size:
+                raise IndexError("Index {} is out of bounds for axis with size {}".format(position, axis_size))
+            position %= axis_size
+            bounds.append((position, position + 1))
+            relative_index.append(0)
+
+    return bounds, tuple(relative_index)
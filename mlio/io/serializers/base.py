@@ -1,4 +1,6 @@
 import io as sys_io
+import copy
+from collections import namedtuple
 from tempfile import TemporaryFile
 
 from ..context_dependencies.module_version import ModuleVersionContextDependency, get_installed_module_version
@@ -14,6 +16,18 @@ def get_object_root_module(obj):
     return type(obj).__module__.split('.')[0]
 
 
+class LinkedObject(namedtuple('LinkedObject', ['data_hash', 'size', 'data_provider'])):
+    """
+    Data that a serializer needs to store in the pack as a separate object, next to the serialized format
+    of the slot. Linked objects are content addressed by their hash (with the hash algorithm of the slot),
+    so they are deduplicated like slot objects.
+
+    The data provider is a callable without arguments that returns the data as a bytes-like object. This way
+    data are materialized only when they are written in the pack.
+    """
+    pass
+
+
 class SerializerBase(object):
     """
     Base class for defining a serializer
@@ -24,6 +38,9 @@ class SerializerBase(object):
         Default constructor
         """
         self._context_dependencies = []
+        self._linked_objects = []
+        self._linked_objects_reader = None
+        self._hash_algorithm = None
 
     def get_context_dependencies(self):
         """
@@ -38,6 +55,81 @@ class SerializerBase(object):
         """
         self._context_dependencies = []
 
+    def get_linked_objects(self):
+        """
+        Get the list with all objects that were linked at serialization stage
+        :rtype: list[LinkedObject]
+        """
+        return self._linked_objects
+
+    def reset_linked_objects(self):
+        """
+        Reset the list of linked objects, releasing the data that their providers refer to
+        """
+        self._linked_objects = []
+
+    def reset_dump_state(self):
+        """
+        Reset the state that is gathered at serialization stage, so that it does not leak in the next dump
+        """
+        self.reset_context_dependencies()
+        self.reset_linked_objects()
+
+    def copy_for_dump(self):
+        """
+        Get a copy of the serializer, with the same configuration but without the state of previous dumps
+        :rtype: SerializerBase
+        """
+        serializer = copy.copy(self)
+        serializer.reset_dump_state()
+        return serializer
+
+    def _add_linked_object(self, data_hash, size, data_provider):
+        """
+        Link an object that must be stored separately in the pack
+        :param str data_hash: The hash of the data, as it was calculated by _hash_data()
+        :param int size: The size of the data in bytes
+        :param () -> bytes|memoryview data_provider: Callable that returns the data
+        """
+        self._linked_objects.append(LinkedObject(data_hash, size, data_provider))
+
+    def set_hash_algorithm(self, hash_algorithm):
+        """
+        Set the hash algorithm that will be used to hash linked objects at serialization stage
+        :param mlio.io.hashing.HashAlgorithmBase hash_algorithm: The hash algorithm of the slot
+        """
+        self._hash_algorithm = hash_algorithm
+
+    def _hash_data(self, data):
+        """
+        Calculate the hash of data of a linked object. If no hash algorithm was set, sha256 is used.
+        :param bytes|memoryview data: The data to hash
+        :rtype: str
+        """
+        if self._hash_algorithm is None:
+            from ..hashing import Sha256HashAlgorithm
+
+            self._hash_algorithm = Sha256HashAlgorithm()
+        return self._hash_algorithm.hexdigest(data)
+
+    def set_linked_objects_reader(self, reader):
+        """
+        Set the function that will be used to read linked objects at unserialization stage
+        :param (str) -> bytes|memoryview reader: Callable that returns the verified data of a linked
+        object given its hash
+        """
+        self._linked_objects_reader = reader
+
+    def _read_linked_object(self, data_hash):
+        """
+        Read the data of a linked object
+        :param str data_hash: The hash of the data
+        :rtype: bytes|memoryview
+        """
+        if self._linked_objects_reader is None:
+            raise RuntimeError("Linked objects can only be read when loading from a pack")
+        return self._linked_objects_reader(data_hash)
+
     def _add_module_version_dependency(self, module_name, version_spec=None):
         """
         Add context dependency for a specific module version
@@ -77,6 +169,18 @@ class SerializerBase(object):
         """
         raise NotImplementedError()
 
+    @classmethod
+    def serializable_types(cls):
+        """
+        Declare the types of objects that this serializer may accept, so that it can be skipped without calling
+        can_serialize() for objects of any other type. Types are given by their fully qualified name (e.g.
+        'numpy.ndarray'), so that their modules do not need to be imported, and subclasses of them are matched too.
+        can_serialize() is still called for objects of the declared types.
+        :return: The qualified names of the types or None if the serializer may accept objects of any type
+        :rtype: tuple[str]|None
+        """
+        return None
+
     def load(self, fh):
         """
         Load an object from a serialized format in the filesystem
@@ -94,6 +198,53 @@ class SerializerBase(object):
         """
         raise NotImplementedError()
 
+    @classmethod
+    def supports_mmap(cls):
+        """
+        Check if this serializer can load objects directly from a memory map of the pack file
+        :rtype: bool
+        """
+        return False
+
+    def load_mapped(self, fh, offset, size, mmap_mode='r'):
+        """
+        Load an object as a memory map of its serialized format in a file, without reading it in memory
+        :param typing.IO[bytes] fh: A file object of the whole file, opened in binary mode
+        :param int offset: The offset in the file where the serialized format starts
+        :param int size: The size of the serialized format
+        :param str mmap_mode: The mode of the memory map
+        :return: The recovered object
+        :rtype: T
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def supports_slicing(cls):
+        """
+        Check if this serializer can load a part of an object without loading all of it
+        :rtype: bool
+        """
+        return False
+
+    def load_slice(self, fh, index):
+        """
+        Load a part of an object from a serialized format in the filesystem
+        :param typing.IO fh: File-like object
+        :param int|slice|tuple index: The index of the part, as it would be used with the [] operator
+        :return: The recovered part of the object
+        """
+        raise NotImplementedError()
+
+    def get_data_alignment(self):
+        """
+        Get the alignment that the serialized format needs in the pack file, so that it can be memory-mapped
+        efficiently. It is only known after the object has been dumped.
+        :return: A tuple with the alignment in bytes and the offset in the serialized format that must be
+        aligned, or None if there is no such need
+        :rtype: (int, int)|None
+        """
+        return None
+
     def loads(self, payload):
         """
         Same as load() but it will read the serialized format from a bytes
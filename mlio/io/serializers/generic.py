@@ -28,11 +28,109 @@ class DefaultSerializer(EmulateStringOperationsMixIn, SerializerBase):
             f.seek(0, sys_io.SEEK_SET)
             return self.load(f)
 
+    @classmethod
+    def serializable_types(cls):
+        return 'builtins.object',
+
     @classmethod
     def can_serialize(cls, obj):
         return True
 
 
+class OutOfBandPickleSerializer(EmulateStringOperationsMixIn, SerializerBase):
+    """
+    Serializer based on pickle protocol 5 that stores large buffers (e.g. the data of numpy arrays) out-of-band,
+    as separate pack objects with their own hash. Buffers are written in the pack without copying them in the
+    pickle stream, identical buffers are deduplicated, and at loading stage buffers of slots stored without
+    compression are given to the objects as read-only memory views of the pack file, without copying them.
+
+    The serialized format of the slot is a pickle of the list of buffer hashes followed by the pickle stream
+    of the object. Objects loaded this way may hold read-only data, as they share the memory of the pack, and
+    the pack cannot be compacted in-place while they are still referenced.
+
+    This serializer is never selected automatically, it must be given explicitly to Pack.dump():
+
+    pck.dump('pipeline', pipeline, serializer=OutOfBandPickleSerializer())
+    """
+
+    # Buffers smaller than this are kept in the pickle stream
+    DEFAULT_MIN_BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, min_buffer_size=None):
+        """
+        Initialize the serializer
+        :param int|None min_buffer_size: The minimum size in bytes of buffers that will be stored out-of-band.
+        If None, DEFAULT_MIN_BUFFER_SIZE is used.
+        """
+        super(OutOfBandPickleSerializer, self).__init__()
+        self.min_buffer_size = self.DEFAULT_MIN_BUFFER_SIZE if min_buffer_size is None else min_buffer_size
+
+    @classmethod
+    def serializer_type(cls):
+        return 'pickle-out-of-band'
+
+    @classmethod
+    def is_supported(cls):
+        """
+        Check if out-of-band buffers are supported by the pickle module of the running python
+        :rtype: bool
+        """
+        return pickle.HIGHEST_PROTOCOL >= 5
+
+    @classmethod
+    def serializable_types(cls):
+        return ()
+
+    @classmethod
+    def can_serialize(cls, obj):
+        # Loaded objects may share read-only memory with the pack, so it is only used when asked explicitly
+        return False
+
+    def _buffer_callback(self, buffer_hashes, linked_hashes, buffer):
+        """
+        Decide how a pickle buffer will be stored
+        :param list[str] buffer_hashes: The hashes of the out-of-band buffers in order of appearance
+        :param set[str] linked_hashes: The hashes of the buffers that are already linked
+        :param pickle.PickleBuffer buffer: The buffer
+        :return: True if the buffer must be serialized in-band
+        :rtype: bool
+        """
+        try:
+            data = buffer.raw()
+        except BufferError:
+            # Non-contiguous buffers cannot be stored as is
+            return True
+        if data.nbytes < self.min_buffer_size:
+            return True
+
+        data_hash = self._hash_data(data)
+        buffer_hashes.append(data_hash)
+        if data_hash not in linked_hashes:
+            linked_hashes.add(data_hash)
+            self._add_linked_object(data_hash, data.nbytes, lambda: data)
+        return False
+
+    def dump(self, obj, fh):
+        if not self.is_supported():
+            raise RuntimeError("Out-of-band buffers need pickle protocol 5 (python >= 3.8)")
+
+        buffer_hashes = []
+        linked_hashes = set()
+        # Only the in-band part is kept in memory, large buffers are not copied
+        payload = pickle.dumps(obj, protocol=5,
+                               buffer_callback=lambda buffer: self._buffer_callback(buffer_hashes, linked_hashes,
+                                                                                    buffer))
+        pickle.dump(buffer_hashes, fh, protocol=5)
+        fh.write(payload)
+
+    def load(self, fh):
+        buffer_hashes = pickle.load(fh)
+        return pickle.load(fh, buffers=(
+            self._read_linked_object(data_hash)
+            for data_hash in buffer_hashes
+        ))
+
+
 class GenericMLModelsSerializer(EmulateStringOperationsMixIn, SerializerBase):
     """
     Generic ML serializer that will accept sklearn, numpy and xgboost objects of any type.
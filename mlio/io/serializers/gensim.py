@@ -89,6 +89,10 @@ class GensimWord2VecModelsSerializer(SerializerBase):
         from gensim.models import Word2Vec
         return isinstance(obj, Word2Vec)
 
+    @classmethod
+    def serializable_types(cls):
+        return 'gensim.models.word2vec.Word2Vec',
+
     @classmethod
     def can_serialize(cls, obj):
         # First check the root module before import Word2Vec type. This permits to use this function
@@ -0,0 +1,234 @@
+import os
+import json
+import random
+import tempfile
+import threading
+import warnings
+from collections import OrderedDict
+
+
+class VerifiedObjectsMemo(object):
+    """
+    A thread-safe, bounded memo of pack objects that have already been verified. Objects are identified by the
+    identity of the pack file (device, inode, size and modification time), the offset of the object in the file
+    and its hash, so that any change of the file invalidates them.
+    """
+
+    def __init__(self, max_entries=65536):
+        """
+        Initialize a new memo
+        :param int|None max_entries: The maximum number of remembered objects. The least recently verified ones
+        are forgotten first. If None the number is not limited.
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def object_identity(file_handler, offset, hash_algorithm, data_hash):
+        """
+        Get the identity of an object of a pack file
+        :param typing.IO[bytes] file_handler: The file object of the pack
+        :param int offset: The offset of the object in the file
+        :param str hash_algorithm: The type of the hash algorithm of the object
+        :param str data_hash: The hash of the object data
+        :return: The identity of the object or None if the file object is not backed by a real file
+        :rtype: tuple|None
+        """
+        try:
+            file_stat = os.fstat(file_handler.fileno())
+        except (AttributeError, OSError, ValueError):
+            return None
+        return (file_stat.st_dev, file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns, offset,
+                hash_algorithm, data_hash)
+
+    def __contains__(self, identity):
+        with self._lock:
+            if identity not in self._entries:
+                return False
+            self._entries.move_to_end(identity)
+            return True
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, identity):
+        """
+        Remember an object that passed verification
+        :param tuple identity: The identity of the object as returned by object_identity()
+        """
+        with self._lock:
+            self._entries[identity] = True
+            self._entries.move_to_end(identity)
+            while self.max_entries is not None and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Forget all verified objects
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+class PersistentVerifiedObjectsMemo(VerifiedObjectsMemo):
+    """
+    A memo of verified objects that is also stored in a sidecar file, so that verification results survive process
+    restarts and are shared by all processes that use the same file. Entries are appended to the file as JSON lines
+    and the file is compacted atomically when it grows too much. Entries of modified pack files never match again,
+    as the identity of objects includes the size and the modification time of the file.
+
+    The sidecar file is trusted: anyone who can write it can make corrupted data pass as verified. It must be
+    stored in a location that is writable only by the users of the packs.
+
+    memo = PersistentVerifiedObjectsMemo('/var/cache/myservice/mlio-verified.jsonl')
+    pck = Pack(fp, mode='r', verification=VerificationPolicy('once-per-process', memo=memo))
+    """
+
+    # The minimum number of lines before the sidecar file is compacted
+    COMPACTION_MIN_LINES = 1024
+
+    def __init__(self, path, max_entries=65536):
+        """
+        Initialize a memo from a sidecar file
+        :param str path: The path of the sidecar file. It is created if it does not exist.
+        :param int|None max_entries: See VerifiedObjectsMemo
+        """
+        super(PersistentVerifiedObjectsMemo, self).__init__(max_entries=max_entries)
+        self.path = path
+        self._file_lock = threading.Lock()
+        self._lines = 0
+        self._load()
+
+    def _load(self):
+        """
+        Load the entries of the sidecar file
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._lines += 1
+                    try:
+                        identity = json.loads(line)
+                    except ValueError:
+                        # Partial line of an interrupted write
+                        continue
+                    if isinstance(identity, list) and len(identity) == 7:
+                        super(PersistentVerifiedObjectsMemo, self).add(tuple(identity))
+        except FileNotFoundError:
+            pass
+
+    def add(self, identity):
+        if identity in self:
+            return
+        super(PersistentVerifiedObjectsMemo, self).add(identity)
+
+        with self._file_lock:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                # Small appends are atomic, so concurrent processes do not mix their lines
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(list(identity)) + '\n')
+                self._lines += 1
+                if self._lines > 2 * max(len(self), self.COMPACTION_MIN_LINES):
+                    self._compact()
+            except OSError as e:
+                warnings.warn("Cannot update verification sidecar file {}: {}".format(self.path, e))
+
+    def _compact(self):
+        """
+        Rewrite the sidecar file with the entries of the memo only. The file is replaced atomically.
+        """
+        with self._lock:
+            lines = [json.dumps(list(identity)) + '\n' for identity in self._entries]
+
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix='.tmp')
+        try:
+            with open(fd, 'w', encoding='utf-8') as f:
+                f.writelines(lines)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self._lines = len(lines)
+
+    def clear(self):
+        super(PersistentVerifiedObjectsMemo, self).clear()
+        with self._file_lock:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self._lines = 0
+
+
+# The memo that is shared by all packs of the process
+_process_memo = VerifiedObjectsMemo()
+
+
+class VerificationPolicy(object):
+    """
+    Policy that decides if the data of pack objects are verified against their hash when they are loaded.
+
+    - 'always': Data are verified on every load. This is the default.
+    - 'once-per-process': Data are verified the first time they are loaded and the result is remembered for as
+      long as the pack file is not modified. Objects of file-like objects that are not real files are always
+      verified. With a PersistentVerifiedObjectsMemo, results are remembered across processes too.
+    - 'sampled': Only a random fraction of loads is verified.
+    - 'never': Data are never verified. Corrupted data will only be detected if they break the serializer.
+
+    pck = Pack(fp, mode='r', verification='once-per-process')
+    """
+
+    POLICIES = ('always', 'once-per-process', 'sampled', 'never')
+
+    def __init__(self, policy='always', sample_rate=0.1, memo=None):
+        """
+        Initialize a new policy
+        :param str policy: One of the POLICIES
+        :param float sample_rate: The fraction of loads that are verified by the 'sampled' policy
+        :param VerifiedObjectsMemo|None memo: The memo of verified objects of the 'once-per-process' policy. If
+        None, a memo that is shared by the whole process will be used.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError("Verification policy must be one of: {}".format(", ".join(self.POLICIES)))
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("Sample rate must be between 0 and 1")
+
+        self.policy = policy
+        self.sample_rate = sample_rate
+        self.memo = _process_memo if memo is None else memo
+
+    @classmethod
+    def from_value(cls, value):
+        """
+        Get a policy from a user given value
+        :param VerificationPolicy|str|None value: A policy object or the name of a policy. If None, the default
+        policy is used.
+        :rtype: VerificationPolicy
+        """
+        if isinstance(value, VerificationPolicy):
+            return value
+        return cls(value or 'always')
+
+    def needs_verification(self, identity):
+        """
+        Check if an object must be verified
+        :param tuple|None identity: The identity of the object as returned by VerifiedObjectsMemo.object_identity()
+        :rtype: bool
+        """
+        if self.policy == 'always':
+            return True
+        if self.policy == 'never':
+            return False
+        if self.policy == 'sampled':
+            return random.random() < self.sample_rate
+        return identity is None or identity not in self.memo
+
+    def mark_verified(self, identity):
+        """
+        Record that an object passed verification
+        :param tuple|None identity: The identity of the object as returned by VerifiedObjectsMemo.object_identity()
+        """
+        if self.policy == 'once-per-process' and identity is not None:
+            self.memo.add(identity)
@@ -42,6 +42,10 @@ setup(name='mlio',
       test_suite='nose.collector',
       extras_require={
           'test': test_requirements,
+          'zstd': ['zstandard'],
+          'lz4': ['lz4'],
+          'xxhash': ['xxhash'],
+          'blake3': ['blake3'],
       },
       packages=[
           'mlio',
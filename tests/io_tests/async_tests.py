@@ -0,0 +1,210 @@
+import os
+import unittest
+from unittest import mock
+import asyncio
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import mlio.io
+from mlio.io import Pack
+from mlio.io.cache import ObjectCache
+from mlio.io.exc import SlotKeyError
+
+from tests.io_tests.generic import ObjectFixturesMixIn
+
+
+class AsyncPackTestCase(ObjectFixturesMixIn, unittest.TestCase):
+
+    def setUp(self):
+        super(AsyncPackTestCase, self).setUp()
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.tf = tempfile.TemporaryFile('w+b')
+        self.gate = threading.Event()
+
+    def tearDown(self):
+        self.gate.set()
+        self.executor.shutdown()
+        self.loop.close()
+        self.tf.close()
+
+    def _block_executor(self):
+        # The single worker of the executor is kept busy until the gate opens
+        self.executor.submit(self.gate.wait)
+
+    def test_adump_aload(self):
+
+        async def scenario(pck):
+            await pck.adump('slot1', self.obj1k, executor=self.executor)
+            await pck.adump('slot2', self.obj2k, compression='deflate')
+            with self.assertRaises(SlotKeyError):
+                await pck.adump('slot1', self.obj2k)
+            return await pck.aload('slot1', executor=self.executor), await pck.aload('slot2')
+
+        with Pack(self.tf) as pck:
+            obj1k, obj2k = self.loop.run_until_complete(scenario(pck))
+            self.assertEqualObj1k(obj1k)
+            self.assertEqualObj2k(obj2k)
+            self.assertEqual(pck.slots_info['slot2'].compression, 'deflate')
+
+            with self.assertRaises(SlotKeyError):
+                self.loop.run_until_complete(pck.aload('unknown'))
+
+    def test_aload_coalesced(self):
+
+        async def scenario(pck):
+            self._block_executor()
+            tasks = [self.loop.create_task(pck.aload('slot1', executor=self.executor)) for _ in range(3)]
+            await asyncio.sleep(0)
+            self.assertEqual(len(pck._coalesced_loads), 1)
+            self.gate.set()
+            return await asyncio.gather(*tasks)
+
+        with Pack(self.tf) as pck:
+            pck.dump('slot1', self.obj1k)
+            with mock.patch.object(pck, 'load', wraps=pck.load) as mocked_load:
+                objects = self.loop.run_until_complete(scenario(pck))
+
+            self.assertEqual(mocked_load.call_count, 1)
+            self.assertEqualObj1k(objects[0])
+            self.assertIs(objects[0], objects[2])
+            self.assertEqual(len(pck._coalesced_loads), 0)
+
+    def test_aload_cancel(self):
+
+        async def scenario(pck):
+            self._block_executor()
+            cancelled_task = self.loop.create_task(pck.aload('slot1', executor=self.executor))
+            task = self.loop.create_task(pck.aload('slot1', executor=self.executor))
+            await asyncio.sleep(0)
+
+            # Other awaiters are not affected
+            cancelled_task.cancel()
+            await asyncio.sleep(0)
+            self.gate.set()
+            obj = await task
+            self.assertTrue(cancelled_task.cancelled())
+
+            # Load is cancelled when all awaiters are cancelled before it starts
+            self.gate.clear()
+            self._block_executor()
+            cancelled_task = self.loop.create_task(pck.aload('slot1', executor=self.executor))
+            await asyncio.sleep(0)
+            cancelled_task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await cancelled_task
+            self.gate.set()
+            return obj
+
+        with Pack(self.tf) as pck:
+            pck.dump('slot1', self.obj1k)
+            with mock.patch.object(pck, 'load', wraps=pck.load) as mocked_load:
+                self.assertEqualObj1k(self.loop.run_until_complete(scenario(pck)))
+                self.executor.shutdown()
+
+            self.assertEqual(mocked_load.call_count, 1)
+            self.assertEqual(len(pck._coalesced_loads), 0)
+
+    def test_adump_aload_mixed(self):
+        big_data = os.urandom(4 * 1024 * 1024)
+
+        async def scenario(pck):
+            tasks = []
+            for index in range(10):
+                tasks.append(self.loop.create_task(
+                    pck.adump('slot-{}'.format(index), big_data + bytes([index]), executor=executor)))
+                for _ in range(4):
+                    tasks.append(self.loop.create_task(pck.aload('slot1', executor=executor)))
+                    await asyncio.sleep(0.001)
+            return await asyncio.gather(*tasks)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            with Pack(self.tf) as pck:
+                # Compressed slots are read through the zip archive
+                pck.dump('slot1', self.obj1k, compression='deflate')
+                results = self.loop.run_until_complete(scenario(pck))
+
+                loaded = [result for result in results if result is not None]
+                self.assertEqual(len(loaded), 40)
+                for obj in loaded:
+                    self.assertEqualObj1k(obj)
+                self.assertEqual(len(pck.slots_info), 11)
+
+    def test_compat_adump_aload(self):
+
+        async def scenario(fp):
+            await mlio.io.adump(self.obj1k, fp, executor=self.executor)
+            self._block_executor()
+            tasks = [
+                self.loop.create_task(mlio.io.aload(fp, executor=self.executor)),
+                self.loop.create_task(mlio.io.aload(fp, executor=self.executor))
+            ]
+            await asyncio.sleep(0)
+            self.gate.set()
+            return await asyncio.gather(*tasks)
+
+        with tempfile.NamedTemporaryFile('w+b') as fp:
+            with mock.patch('mlio.io.compat.load', wraps=mlio.io.compat.load) as mocked_load:
+                objects = self.loop.run_until_complete(scenario(fp))
+
+            self.assertEqual(mocked_load.call_count, 1)
+            self.assertEqualObj1k(objects[0])
+            self.assertIs(objects[0], objects[1])
+
+    def test_compat_aload_options_not_coalesced(self):
+
+        async def scenario(fp):
+            self._block_executor()
+            tasks = [
+                self.loop.create_task(mlio.io.aload(fp, verification='never', executor=self.executor)),
+                self.loop.create_task(mlio.io.aload(fp, verification='always', executor=self.executor)),
+                self.loop.create_task(mlio.io.aload(fp, verification='always', executor=self.executor)),
+                self.loop.create_task(mlio.io.aload(fp, cache=ObjectCache(), executor=self.executor))
+            ]
+            await asyncio.sleep(0)
+            self.gate.set()
+            return await asyncio.gather(*tasks)
+
+        with tempfile.NamedTemporaryFile('w+b') as fp:
+            mlio.io.dump(self.obj1k, fp)
+            with mock.patch('mlio.io.compat.load', wraps=mlio.io.compat.load) as mocked_load:
+                objects = self.loop.run_until_complete(scenario(fp))
+
+            self.assertEqual(mocked_load.call_count, 3)
+            self.assertListEqual([call[1]['verification'] for call in mocked_load.call_args_list],
+                                 ['never', 'always', None])
+            self.assertIsNot(objects[0], objects[1])
+            self.assertIs(objects[1], objects[2])
+
+    def test_compat_aload_different_slots(self):
+
+        async def scenario(fp, executor):
+            return await asyncio.gather(*[
+                mlio.io.aload(fp, 'slot{}'.format(i), executor=executor)
+                for i in range(20)
+            ])
+
+        with tempfile.NamedTemporaryFile('w+b') as fp, ThreadPoolExecutor(max_workers=8) as executor:
+            for i in range(20):
+                mlio.io.dump({'slot': i, 'data': self.obj1k}, fp, slot_key='slot{}'.format(i))
+
+            # Loads of different slots share the position of the file object
+            for _ in range(10):
+                objects = self.loop.run_until_complete(scenario(fp, executor))
+                self.assertListEqual([obj['slot'] for obj in objects], list(range(20)))
+
+            async def mixed():
+                return await asyncio.gather(
+                    mlio.io.adump(self.obj2k, fp, slot_key='other', executor=executor),
+                    *[mlio.io.aload(fp, 'slot{}'.format(i), executor=executor) for i in range(20)])
+
+            objects = self.loop.run_until_complete(mixed())
+            self.assertListEqual([obj['slot'] for obj in objects[1:]], list(range(20)))
+            self.assertEqualObj2k(mlio.io.load(fp, 'other'))
+            # Locks of file objects are not kept once their jobs are done
+            self.assertEqual(len(mlio.io.compat._file_object_locks), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
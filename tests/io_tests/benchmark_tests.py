@@ -0,0 +1,63 @@
+import unittest
+import os
+import json
+from tempfile import TemporaryDirectory
+
+from mlio.io.benchmark import parse_size, compare_results, main
+
+
+class BenchmarkTestCase(unittest.TestCase):
+
+    def test_parse_size(self):
+        self.assertEqual(parse_size('100'), 100)
+        self.assertEqual(parse_size('4kb'), 4096)
+        self.assertEqual(parse_size('1GB'), 1024 ** 3)
+
+        with self.assertRaises(ValueError):
+            parse_size('1TB')
+        with self.assertRaises(ValueError):
+            parse_size('MB')
+
+    def test_compare_results(self):
+        baseline = {'results': [
+            {'name': 'load', 'params': {'object_size': 1}, 'seconds': 1.0},
+            {'name': 'dump', 'params': {'object_size': 1}, 'seconds': 1.0},
+        ]}
+        results = {'results': [
+            {'name': 'load', 'params': {'object_size': 1}, 'seconds': 1.05},
+            {'name': 'dump', 'params': {'object_size': 1}, 'seconds': 1.5},
+            {'name': 'open', 'params': {'slot_count': 1}, 'seconds': 1.0},
+        ]}
+
+        comparisons = compare_results(results, baseline, threshold=0.1)
+        self.assertListEqual([(c['name'], c['regressed']) for c in comparisons], [('load', False), ('dump', True)])
+        self.assertAlmostEqual(comparisons[1]['ratio'], 1.5)
+
+    def test_main(self):
+
+        with TemporaryDirectory() as tmp_dir:
+            output_path = os.path.join(tmp_dir, 'results.json')
+            args = ['--slot-counts', '1,10', '--object-sizes', '1KB', '--serializers', 'default,numpy-ndarray',
+                    '--repeat', '1', '--directory', tmp_dir, '--output', output_path]
+            self.assertEqual(main(args), 0)
+
+            with open(output_path, 'r') as f:
+                results = json.load(f)
+            self.assertEqual(results['version'], 1)
+            self.assertListEqual(
+                sorted(set(result['name'] for result in results['results'])),
+                ['dump', 'dump_transaction', 'hash_file_object', 'load', 'open', 'update_manifest'])
+            for result in results['results']:
+                self.assertGreaterEqual(result['seconds'], 0)
+                self.assertGreater(result['peak_memory_bytes'], 0)
+            self.assertListEqual(sorted(os.listdir(tmp_dir)), ['results.json'])
+
+            # Compared with itself nothing has regressed beyond a generous threshold
+            self.assertEqual(main(args[:-2] + ['--output', output_path + '.new', '--baseline', output_path,
+                                               '--threshold', '1000']), 0)
+            with open(output_path + '.new', 'r') as f:
+                self.assertEqual(len(json.load(f)['comparison']), len(results['results']))
+
+
+if __name__ == '__main__':
+    unittest.main()
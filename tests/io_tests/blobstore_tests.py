@@ -0,0 +1,170 @@
+import unittest
+import os
+import zipfile
+import tempfile
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from mlio.io import Pack
+from mlio.io.blobstore import BlobStore
+from mlio.io.compression import CompressionCodecBase, available_codecs
+from mlio.io.exc import MLIOPackExternalObjectError, MLIOPackSlotWrongChecksum
+from mlio.io.serializers.arrays import NumpyArraySerializer, ChunkedArraySerializer
+from mlio.io.verification import VerificationPolicy, VerifiedObjectsMemo
+from mlio.resources.repositories import LocalDirectoryRepository
+from mlio.resources.exceptions import RepositoryReadOnlyError
+
+from tests.io_tests.generic import ObjectFixturesMixIn
+
+
+class BlobStoreTestCase(ObjectFixturesMixIn, unittest.TestCase):
+
+    def setUp(self):
+        super(BlobStoreTestCase, self).setUp()
+        self.tmp_dir = TemporaryDirectory()
+        self.store = BlobStore(LocalDirectoryRepository('blobs', self.tmp_dir.name, writable=True))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _archive_names(self, fh):
+        with zipfile.ZipFile(fh) as zip_fh:
+            return set(zip_fh.namelist())
+
+    def test_put_open(self):
+        import io as sys_io
+
+        self.assertTrue(self.store.put('ahash.slot', sys_io.BytesIO(b'data'), CompressionCodecBase()))
+        self.assertFalse(self.store.put('ahash.slot', sys_io.BytesIO(b'other'), CompressionCodecBase()))
+        self.assertTrue(self.store.has('ahash.slot'))
+        self.assertEqual(self.store.object_size('ahash.slot'), 4)
+        with self.store.open_object('ahash.slot') as f:
+            self.assertEqual(f.read(), b'data')
+        self.assertEqual(bytes(self.store.map_object('ahash.slot')), b'data')
+        self.assertListEqual(list(self.store.iter_objects()), ['ahash.slot'])
+
+        with self.assertRaises(MLIOPackExternalObjectError):
+            self.store.open_object('unknown.slot')
+        with self.assertRaises(ValueError):
+            self.store.has('../escape.slot')
+
+    def test_shared_objects(self):
+
+        with tempfile.TemporaryFile('w+b') as tf1, tempfile.TemporaryFile('w+b') as tf2:
+            with Pack(tf1, blob_store=self.store) as pck:
+                pck.dump('slot1', self.obj1k)
+                pck.dump('slot2', self.obj2k, external=False)
+                self.assertTrue(pck.slots_info['slot1'].external)
+                self.assertFalse(pck.slots_info['slot2'].external)
+                obj1k_object = pck.slots_info['slot1'].pack_object
+                obj2k_object = pck.slots_info['slot2'].pack_object
+
+            with Pack(tf2, blob_store=self.store) as pck:
+                pck.dump('other', self.obj1k)
+
+            # Identical objects are stored once, outside of the archives
+            self.assertListEqual(list(self.store.iter_objects()), [obj1k_object])
+            self.assertNotIn(obj1k_object, self._archive_names(tf1))
+            self.assertIn(obj2k_object, self._archive_names(tf1))
+
+            with Pack(tf1, mode='r', blob_store=self.store) as pck:
+                self.assertEqualObj1k(pck.load('slot1'))
+                self.assertEqualObj2k(pck.load('slot2'))
+                self.assertEqualObj1k(pck.load_lazy('slot1'))
+                self.assertEqual(len(pck.load_many(['slot1', 'slot2'], workers=2)), 2)
+
+            # Slots of the archive are still loaded without a store
+            with Pack(tf2, mode='r') as pck:
+                with self.assertRaises(MLIOPackExternalObjectError):
+                    pck.load('other')
+            with Pack(tf1, mode='r') as pck:
+                self.assertEqualObj2k(pck.load('slot2'))
+
+    def test_compression(self):
+
+        with tempfile.TemporaryFile('w+b') as tf:
+            with Pack(tf, blob_store=self.store, compression='deflate') as pck:
+                pck.dump('slot1', self.obj1k)
+                # Zip codecs are not applied outside of the archive
+                self.assertEqual(pck.slots_info['slot1'].compression, 'stored')
+
+                if 'zstd' in available_codecs():
+                    pck.dump('slot2', self.obj2k, compression='zstd')
+                    self.assertTrue(pck.slots_info['slot2'].pack_object.endswith('.slot.zst'))
+                    self.assertTrue(self.store.has(pck.slots_info['slot2'].pack_object))
+                    self.assertEqualObj2k(pck.load('slot2'))
+
+    def test_arrays(self):
+        array = np.arange(1000 * 37, dtype='float64').reshape(1000, 37)
+
+        with tempfile.TemporaryFile('w+b') as tf:
+            with Pack(tf, blob_store=self.store) as pck:
+                pck.dump('array', array, serializer=NumpyArraySerializer())
+                pck.dump('chunked', array, serializer=ChunkedArraySerializer(chunk_shape=300))
+                self.assertEqual(len(list(self.store.iter_objects())), 6)
+
+                mapped = pck.load('array', mmap_mode='r')
+                self.assertIsInstance(mapped, np.memmap)
+                np.testing.assert_array_equal(mapped, array)
+                np.testing.assert_array_equal(pck.load_slice('chunked', slice(290, 310)), array[290:310])
+                self.assertEqual(len(pck.open_slot_buffer('array')), self.store.object_size(
+                    pck.slots_info['array'].pack_object))
+
+    def test_corrupted_object(self):
+
+        with tempfile.TemporaryFile('w+b') as tf:
+            with Pack(tf, blob_store=self.store) as pck:
+                pck.dump('array', np.arange(100, dtype='uint8'), serializer=NumpyArraySerializer())
+                path = os.path.join(self.tmp_dir.name, BlobStore.OBJECTS_DIRECTORY,
+                                    pck.slots_info['array'].pack_object)
+
+            with open(path, 'r+b') as f:
+                f.seek(-1, os.SEEK_END)
+                f.write(b'\xff')
+
+            memo = VerifiedObjectsMemo()
+            with Pack(tf, blob_store=self.store, verification=VerificationPolicy('once-per-process', memo=memo)) \
+                    as pck:
+                with self.assertRaises(MLIOPackSlotWrongChecksum):
+                    pck.load('array')
+                self.assertEqual(len(memo), 0)
+
+    def test_collect_garbage(self):
+
+        with tempfile.TemporaryFile('w+b') as tf1, tempfile.TemporaryFile('w+b') as tf2:
+            with Pack(tf1, blob_store=self.store) as pck1, Pack(tf2, blob_store=self.store) as pck2:
+                pck1.dump('slot1', self.obj1k)
+                pck1.dump('slot2', self.obj2k)
+                pck2.dump('slot1', self.obj1k)
+                obj1k_object = pck2.slots_info['slot1'].pack_object
+
+                # Removing slots never removes objects of the store
+                pck1.remove('slot1')
+                pck1.remove('slot2')
+                self.assertEqual(len(list(self.store.iter_objects())), 2)
+
+                # Recent objects are spared
+                stats = self.store.collect_garbage([pck1, pck2])
+                self.assertEqual(stats.reclaimed_objects, 0)
+
+                stats = self.store.collect_garbage([pck1, pck2], grace_period=0)
+                self.assertEqual(stats.objects_before, 2)
+                self.assertEqual(stats.objects_after, 1)
+                self.assertGreater(stats.reclaimed_bytes, 0)
+                self.assertListEqual(list(self.store.iter_objects()), [obj1k_object])
+                self.assertEqualObj1k(pck2.load('slot1'))
+
+    def test_read_only_repository(self):
+        store = BlobStore(LocalDirectoryRepository('blobs', self.tmp_dir.name))
+
+        with tempfile.TemporaryFile('w+b') as tf:
+            with Pack(tf, blob_store=store) as pck:
+                with self.assertRaises(RepositoryReadOnlyError):
+                    pck.dump('slot1', self.obj1k)
+                with self.assertRaises(RepositoryReadOnlyError):
+                    store.collect_garbage([pck])
+
+
+if __name__ == '__main__':
+    unittest.main()
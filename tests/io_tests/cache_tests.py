@@ -0,0 +1,103 @@
+import gc
+import unittest
+import tempfile
+from unittest import mock
+
+from mlio.io import Pack, ObjectCache, load, dump
+
+from tests.io_tests.generic import ObjectFixturesMixIn, GenericObject
+
+
+class ObjectCacheTestCase(unittest.TestCase):
+
+    def test_get_put(self):
+        cache = ObjectCache()
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('a', 5), 5)
+        self.assertTrue(cache.put('a', 1))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIn('a', cache)
+
+        info = cache.info()
+        self.assertEqual((info.hits, info.misses, info.entries), (1, 2, 1))
+        self.assertAlmostEqual(info.hit_ratio, 1 / 3)
+
+    def test_max_entries(self):
+        cache = ObjectCache(max_entries=2)
+
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+
+        # Least recently used is evicted
+        self.assertNotIn('b', cache)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.info().evictions, 1)
+
+    def test_max_bytes(self):
+        cache = ObjectCache(max_bytes=100)
+
+        cache.put('a', 1, size=60)
+        cache.put('b', 2, size=30)
+        self.assertFalse(cache.put('c', 3, size=101))
+        cache.put('d', 4, size=20)
+
+        self.assertListEqual(sorted(cache._entries), ['b', 'd'])
+        self.assertEqual(cache.info().size_bytes, 50)
+
+        cache.invalidate('b')
+        self.assertEqual(cache.info().size_bytes, 20)
+        cache.clear()
+        self.assertEqual(cache.info().size_bytes, 0)
+
+    def test_weak(self):
+        cache = ObjectCache(weak=True)
+
+        obj = GenericObject(10)
+        self.assertTrue(cache.put('a', obj, size=10))
+        self.assertIs(cache.get('a'), obj)
+
+        # Objects that cannot be weakly referenced are not cached
+        self.assertFalse(cache.put('b', [1, 2]))
+
+        del obj
+        gc.collect()
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.info().size_bytes, 0)
+
+
+class PackCacheTestCase(ObjectFixturesMixIn, unittest.TestCase):
+
+    def test_load_cached(self):
+        cache = ObjectCache()
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf, cache=cache) as pck:
+                pck.dump('slot1', self.obj1k)
+                pck.dump('slot1-2', self.obj1k)
+
+                recovered = pck.load('slot1')
+                self.assertEqualObj1k(recovered)
+
+                # Slots of the same object share the cache entry
+                with mock.patch.object(Pack, '_open_pack_object') as mocked_open:
+                    self.assertIs(pck.load('slot1-2'), recovered)
+                    mocked_open.assert_not_called()
+
+            # Cache can be shared between packs
+            with Pack(tf, cache=cache) as pck:
+                self.assertIs(pck.load('slot1'), recovered)
+
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertGreater(cache.info().size_bytes, 0)
+
+    def test_compat_load_cached(self):
+        cache = ObjectCache()
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            dump(self.obj2k, tf)
+            recovered = load(tf, cache=cache)
+            self.assertEqualObj2k(recovered)
+            self.assertIs(load(tf, cache=cache), recovered)
@@ -0,0 +1,106 @@
+import unittest
+from unittest import mock
+import tempfile
+import zipfile
+
+from mlio.io import Pack
+from mlio.io.compression import (get_codec_by_type, get_codec_by_zip_compress_type, available_codecs,
+                                 UnknownCompressionCodec, DeflateCodec)
+from mlio.io.exc import MLIOPackSlotNotMappable
+
+from tests.io_tests.generic import ObjectFixturesMixIn
+
+
+class CompressionCodecsTestCase(unittest.TestCase):
+
+    def test_get_codec_by_type(self):
+        self.assertIs(get_codec_by_type('deflate'), DeflateCodec)
+
+        with self.assertRaises(UnknownCompressionCodec):
+            get_codec_by_type('unknown')
+
+    def test_get_codec_by_zip_compress_type(self):
+        self.assertEqual(get_codec_by_zip_compress_type(zipfile.ZIP_STORED).codec_type(), 'stored')
+        self.assertEqual(get_codec_by_zip_compress_type(zipfile.ZIP_LZMA).codec_type(), 'lzma')
+
+    def test_available_codecs(self):
+        self.assertTrue({'stored', 'deflate', 'bzip2', 'lzma'}.issubset(available_codecs()))
+
+
+class PackCompressionTestCase(ObjectFixturesMixIn, unittest.TestCase):
+
+    def test_dump_load_all_codecs(self):
+
+        for codec_type in available_codecs():
+            with self.subTest(codec=codec_type):
+                with tempfile.TemporaryFile("w+b") as tf:
+                    with Pack(tf) as pck:
+                        pck.dump('slot1', self.obj1k, compression=codec_type, compresslevel=1)
+                        pck.dump('slot2', self.obj2k, compression=codec_type)
+                        self.assertEqual(pck.slots_info['slot1'].compression, codec_type)
+
+                    with Pack(tf) as pck:
+                        self.assertEqual(pck.slots_info['slot2'].compression, codec_type)
+                        self.assertEqualObj1k(pck.load('slot1'))
+                        self.assertEqualObj2k(pck.load('slot2'))
+
+    def test_compressed_is_smaller(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                pck.dump('deflated', self.obj2k, compression='deflate', compresslevel=9)
+
+                info = pck._zip_fh.getinfo(pck.slots_info['deflated'].pack_object)
+                self.assertEqual(info.compress_type, zipfile.ZIP_DEFLATED)
+                self.assertLess(info.compress_size, info.file_size)
+
+    def test_compresslevel(self):
+        data = bytes(range(256)) * 4096
+
+        compress_sizes = []
+        for compresslevel in (1, 9):
+            with tempfile.TemporaryFile("w+b") as tf:
+                with Pack(tf) as pck:
+                    pck.dump('slot', data, compression='deflate', compresslevel=compresslevel)
+                    compress_sizes.append(pck._zip_fh.getinfo(pck.slots_info['slot'].pack_object).compress_size)
+        self.assertLess(compress_sizes[1], compress_sizes[0])
+
+        # Levels are never silently ignored
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                with mock.patch('mlio.io.pack._ZIP_INFO_COMPRESSLEVEL_ATTR', None):
+                    with self.assertRaises(ValueError):
+                        pck.dump('slot1', self.obj1k, compression='deflate', compresslevel=1)
+                    pck.dump('slot1', self.obj1k, compression='deflate')
+
+    def test_pack_default_compression(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf, compression='bzip2') as pck:
+                pck.dump('slot1', self.obj1k)
+                pck.dump('slot2', self.obj2k, compression='stored')
+
+                self.assertEqual(pck.slots_info['slot1'].compression, 'bzip2')
+                self.assertEqual(pck.slots_info['slot1'].to_dict()['compression'], 'bzip2')
+                self.assertEqual(pck.slots_info['slot2'].compression, 'stored')
+                self.assertNotIn('compression', pck.slots_info['slot2'].to_dict())
+
+            with self.assertRaises(UnknownCompressionCodec):
+                Pack(tf, compression='unknown')
+
+    def test_dedup_records_actual_compression(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k, compression='deflate')
+                pck.dump('slot2', self.obj1k, compression='stored')
+
+                self.assertEqual(pck.slots_info['slot2'].compression, 'deflate')
+                self.assertEqual(len(pck._existing_pack_objects()), 1)
+
+                with self.assertRaises(MLIOPackSlotNotMappable):
+                    pck.open_slot_buffer('slot2')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import tempfile
+import hashlib
+
+import numpy as np
+
+from mlio.io import Pack
+from mlio.io.hashing import (get_hash_algorithm_by_type, available_hash_algorithms, UnknownHashAlgorithm,
+                             Blake2bHashAlgorithm)
+from mlio.io.serializers.arrays import ChunkedArraySerializer
+
+from tests.io_tests.generic import ObjectFixturesMixIn
+
+
+class HashAlgorithmsTestCase(unittest.TestCase):
+
+    def test_get_hash_algorithm_by_type(self):
+        self.assertIs(get_hash_algorithm_by_type('blake2b'), Blake2bHashAlgorithm)
+
+        with self.assertRaises(UnknownHashAlgorithm):
+            get_hash_algorithm_by_type('unknown')
+
+    def test_available_hash_algorithms(self):
+        self.assertTrue({'sha256', 'blake2b'}.issubset(available_hash_algorithms()))
+
+    def test_hexdigest(self):
+        self.assertEqual(get_hash_algorithm_by_type('sha256')().hexdigest(b'data'),
+                         hashlib.sha256(b'data').hexdigest())
+        self.assertEqual(get_hash_algorithm_by_type('sha256').pack_object_prefix(), '')
+        self.assertEqual(Blake2bHashAlgorithm.pack_object_prefix(), 'blake2b-')
+
+
+class PackHashingTestCase(ObjectFixturesMixIn, unittest.TestCase):
+
+    def test_dump_load_all_algorithms(self):
+
+        for algorithm_type in available_hash_algorithms():
+            with self.subTest(algorithm=algorithm_type):
+                with tempfile.TemporaryFile("w+b") as tf:
+                    with Pack(tf) as pck:
+                        pck.dump('slot1', self.obj1k, hash_algorithm=algorithm_type)
+                        pck.dump('slot2', self.obj2k, hash_algorithm=algorithm_type, compression='deflate')
+                        self.assertEqual(pck.slots_info['slot1'].hash_algorithm, algorithm_type)
+
+                    with Pack(tf) as pck:
+                        self.assertEqual(pck.slots_info['slot2'].hash_algorithm, algorithm_type)
+                        self.assertEqualObj1k(pck.load('slot1'))
+                        self.assertEqualObj2k(pck.load('slot2'))
+
+    def test_pack_default_hash_algorithm(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf, hash_algorithm='blake2b') as pck:
+                pck.dump('slot1', self.obj1k)
+                pck.dump('slot2', self.obj1k, hash_algorithm='sha256')
+                pck.dump_many({'slot3': self.obj2k}, workers=2, use_processes=False)
+
+                slot1 = pck.slots_info['slot1']
+                self.assertEqual(slot1.to_dict()['hash_algorithm'], 'blake2b')
+                self.assertNotIn('serialized_sha256_hash', slot1.to_dict())
+                self.assertEqual(slot1.pack_object, 'blake2b-{}.slot'.format(slot1.serialized_sha256_hash))
+                self.assertEqual(pck.slots_info['slot3'].hash_algorithm, 'blake2b')
+
+                # Plain sha256 slots are recorded as before and are never deduplicated with other algorithms
+                slot2 = pck.slots_info['slot2']
+                self.assertNotIn('hash_algorithm', slot2.to_dict())
+                self.assertEqual(slot2.pack_object, '{}.slot'.format(slot2.serialized_sha256_hash))
+                self.assertEqual(len(pck._existing_pack_objects()), 3)
+
+            with self.assertRaises(UnknownHashAlgorithm):
+                Pack(tf, hash_algorithm='unknown')
+
+    def test_linked_objects(self):
+        array = np.arange(1000, dtype='int64').reshape(100, 10)
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf, hash_algorithm='blake2b') as pck:
+                pck.dump('chunked', array, serializer=ChunkedArraySerializer(chunk_shape=25))
+                for pack_object in pck.slots_info['chunked'].pack_objects:
+                    self.assertTrue(pack_object.startswith('blake2b-'))
+                np.testing.assert_array_equal(pck.load_slice('chunked', slice(20, 30)), array[20:30])
+
+
+if __name__ == '__main__':
+    unittest.main()
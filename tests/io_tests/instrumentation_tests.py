@@ -0,0 +1,170 @@
+import unittest
+import asyncio
+import logging
+import tempfile
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from mlio.io import Pack
+from mlio.io.blobstore import BlobStore
+from mlio.io.cache import ObjectCache
+from mlio.io.instrumentation import (PackStats, LoggingInstrumentation, CallbackInstrumentation,
+                                     CompositeInstrumentation, NULL_TIMER)
+from mlio.resources.repositories import LocalDirectoryRepository
+
+from tests.io_tests.generic import ObjectFixturesMixIn
+
+
+class PackInstrumentationTestCase(ObjectFixturesMixIn, unittest.TestCase):
+
+    def setUp(self):
+        super(PackInstrumentationTestCase, self).setUp()
+        self.tf = tempfile.TemporaryFile('w+b')
+
+    def tearDown(self):
+        self.tf.close()
+
+    def test_disabled(self):
+        with Pack(self.tf) as pck:
+            self.assertIs(pck._timer('dump', 'total'), NULL_TIMER)
+            self.assertIsNone(pck._new_meter())
+            pck.dump('slot1', self.obj1k)
+            self.assertEqualObj1k(pck.load('slot1'))
+            pck.remove('slot1')
+
+    def test_phases(self):
+        stats = PackStats()
+        with Pack(self.tf, instrumentation=stats) as pck:
+            pck.dump('slot1', self.obj1k)
+            size = pck._pack_object_size(pck.slots_info['slot1'], pck.slots_info['slot1'].pack_object)
+
+            self.assertEqual(stats.get('dump')['count'], 1)
+            self.assertEqual(stats.get('dump', 'serialize')['bytes'], size)
+            self.assertEqual(stats.get('dump', 'hash')['bytes'], size)
+            self.assertEqual(stats.get('dump', 'write')['bytes'], size)
+            self.assertEqual(stats.get('update_manifest')['count'], 2)
+            self.assertGreater(stats.get('update_manifest')['bytes'], 0)
+
+            # Deduplicated objects are not written again
+            pck.dump('slot2', self.obj1k)
+            self.assertEqual(stats.get('dump', 'write')['count'], 2)
+            self.assertEqual(stats.get('dump', 'write')['bytes'], size)
+
+            self.assertEqualObj1k(pck.load('slot1'))
+            self.assertEqual(stats.get('load')['count'], 1)
+            self.assertEqual(stats.get('load')['bytes'], size)
+            self.assertEqual(stats.get('load', 'dependencies')['count'], 1)
+            self.assertEqual(stats.get('load', 'read')['bytes'], size)
+            self.assertEqual(stats.get('load', 'hash')['bytes'], size)
+            self.assertEqual(stats.get('load', 'unserialize')['count'], 1)
+            self.assertLessEqual(stats.get('load', 'unserialize')['seconds'], stats.get('load')['seconds'])
+            # Dependencies are checked within the load
+            self.assertLessEqual(stats.get('load', 'dependencies')['seconds'], stats.get('load')['seconds'])
+
+            pck.remove('slot1')
+            self.assertEqual(stats.get('cleanup_dangling_objects')['bytes'], 0)
+            pck.remove('slot2')
+            self.assertEqual(stats.get('remove')['count'], 2)
+            self.assertEqual(stats.get('cleanup_dangling_objects')['count'], 2)
+            self.assertEqual(stats.get('cleanup_dangling_objects')['bytes'], size)
+
+        as_dict = stats.as_dict()
+        self.assertListEqual(sorted(as_dict),
+                             ['cleanup_dangling_objects', 'dump', 'load', 'remove', 'update_manifest'])
+        self.assertListEqual(sorted(as_dict['load']), ['dependencies', 'hash', 'read', 'total', 'unserialize'])
+
+        stats.reset()
+        self.assertDictEqual(stats.as_dict(), {})
+
+    def test_load_cached_and_many(self):
+        events = []
+        with Pack(self.tf, cache=ObjectCache(), instrumentation=CallbackInstrumentation(events.append)) as pck:
+            pck.dump('slot1', self.obj1k)
+            del events[:]
+
+            pck.load('slot1')
+            pck.load('slot1')
+            loads = [event for event in events if event.operation == 'load' and event.phase == 'total']
+            self.assertEqual(len(loads), 2)
+            self.assertEqual(loads[0].slot_key, 'slot1')
+            self.assertIsNotNone(loads[0].bytes)
+            # Loads served by the cache do not read data
+            self.assertIsNone(loads[1].bytes)
+
+            del events[:]
+            list(pck.load_many(['slot1'], workers=2))
+            self.assertIn(('load', 'total'), [(event.operation, event.phase) for event in events])
+
+    def test_external_write(self):
+        stats = PackStats()
+        with TemporaryDirectory() as tmp_dir:
+            store = BlobStore(LocalDirectoryRepository('blobs', tmp_dir, writable=True))
+            with Pack(self.tf, blob_store=store, instrumentation=stats) as pck:
+                pck.dump('slot1', self.obj1k)
+                size = pck._pack_object_size(pck.slots_info['slot1'], pck.slots_info['slot1'].pack_object)
+                self.assertTrue(pck.slots_info['slot1'].external)
+                self.assertEqual(stats.get('dump', 'write')['bytes'], size)
+
+                # Objects that are already in the blob store are not written again
+                pck.dump('slot2', self.obj1k)
+                self.assertEqual(stats.get('dump', 'write')['count'], 2)
+                self.assertEqual(stats.get('dump', 'write')['bytes'], size)
+
+    def test_load_mapped(self):
+        events = []
+        array = np.arange(1000, dtype='int32')
+        with Pack(self.tf, instrumentation=CallbackInstrumentation(events.append)) as pck:
+            pck.dump('array', array)
+            size = pck._pack_object_size(pck.slots_info['array'], pck.slots_info['array'].pack_object)
+            del events[:]
+
+            mapped = pck.load('array', mmap_mode='r')
+            np.testing.assert_array_equal(mapped, array)
+            del mapped
+
+        phases = dict((event.phase, event) for event in events)
+        self.assertListEqual([event.phase for event in events], ['dependencies', 'hash', 'unserialize', 'total'])
+        self.assertEqual(phases['total'].bytes, size)
+        self.assertEqual(phases['hash'].bytes, size)
+
+    def test_load_deferred(self):
+        events = []
+        with Pack(self.tf, instrumentation=CallbackInstrumentation(events.append)) as pck:
+            pck.dump('slot1', self.obj1k)
+            del events[:]
+
+            # Nothing is loaded until the proxy is used
+            proxy = pck.load_lazy('slot1')
+            self.assertListEqual(events, [])
+            self.assertEqualObj1k(proxy)
+            self.assertListEqual(sorted(event.phase for event in events), ['hash', 'read', 'total', 'unserialize'])
+
+            del events[:]
+            loop = asyncio.new_event_loop()
+            try:
+                self.assertEqualObj1k(loop.run_until_complete(pck.aload('slot1')))
+            finally:
+                loop.close()
+            self.assertListEqual(sorted(event.phase for event in events),
+                                 ['dependencies', 'hash', 'read', 'total', 'unserialize'])
+
+    def test_adapters(self):
+        stats = PackStats()
+        events = []
+        logger = logging.getLogger('mlio.tests.instrumentation')
+        instrumentation = CompositeInstrumentation(stats, CallbackInstrumentation(events.append),
+                                                   LoggingInstrumentation(logger, level=logging.INFO))
+
+        with self.assertLogs(logger, level='INFO') as logs:
+            with Pack(self.tf, instrumentation=instrumentation) as pck:
+                pck.dump('slot1', self.obj1k)
+
+        self.assertEqual(len(events), sum(phase['count'] for phases in stats.as_dict().values()
+                                          for phase in phases.values()))
+        self.assertEqual(len(logs.output), len(events))
+        self.assertTrue(any("Pack dump.total of slot 'slot1' took" in line for line in logs.output))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import tempfile
+import zipfile
+import json
+
+import numpy as np
+
+from mlio.io import Pack
+from mlio.io.layered import LayeredPack
+from mlio.io.exc import SlotKeyError, MLIOPackReadOnlyError
+from mlio.io.serializers.arrays import ChunkedArraySerializer
+
+from tests.io_tests.generic import ObjectFixturesMixIn
+
+
+class LayeredPackTestCase(ObjectFixturesMixIn, unittest.TestCase):
+
+    def setUp(self):
+        super(LayeredPackTestCase, self).setUp()
+        self.array = np.arange(1000, dtype='int32').reshape(100, 10)
+        self.base_fh = tempfile.TemporaryFile('w+b')
+        with Pack(self.base_fh) as pck:
+            pck.dump('slot1', self.obj1k)
+            pck.dump('slot2', self.obj2k)
+            pck.dump('chunked', self.array, serializer=ChunkedArraySerializer(chunk_shape=30))
+        self.base_fh.seek(0)
+        self.base_size = self.base_fh.seek(0, 2)
+        self.delta_fh = tempfile.TemporaryFile('w+b')
+
+    def tearDown(self):
+        self.base_fh.close()
+        self.delta_fh.close()
+
+    def _layered_pack(self):
+        return LayeredPack(Pack(self.delta_fh), [Pack(self.base_fh, mode='r')])
+
+    def test_fall_through(self):
+
+        with self._layered_pack() as pck:
+            self.assertTrue(pck.has_slot('slot1'))
+            self.assertIn('chunked', pck)
+            self.assertNotIn('unknown', pck)
+            self.assertListEqual(sorted(pck.slots_info), ['chunked', 'slot1', 'slot2'])
+
+            self.assertEqualObj1k(pck.load('slot1'))
+            np.testing.assert_array_equal(pck.load_slice('chunked', slice(25, 35)), self.array[25:35])
+            self.assertEqualObj2k(pck.load_lazy('slot2'))
+
+            pck.dump('slot3', self.obj1k)
+            objects = pck.load_many(['slot3', 'slot1', 'slot2'], workers=2)
+            self.assertListEqual(list(objects), ['slot3', 'slot1', 'slot2'])
+            self.assertEqualObj1k(objects['slot3'])
+            self.assertEqualObj1k(objects['slot1'])
+            self.assertEqualObj2k(objects['slot2'])
+            with self.assertRaises(SlotKeyError):
+                pck.dump('slot1', self.obj2k)
+            with self.assertRaises(SlotKeyError):
+                pck.load('unknown')
+
+        # Base pack is never modified
+        self.assertEqual(self.base_fh.seek(0, 2), self.base_size)
+        with Pack(self.delta_fh) as delta:
+            self.assertListEqual(list(delta.slots_info), ['slot3'])
+
+    def test_remove_and_replace(self):
+
+        with self._layered_pack() as pck:
+            pck.remove('slot1')
+            self.assertNotIn('slot1', pck)
+            self.assertNotIn('slot1', pck.slots_info)
+            with self.assertRaises(SlotKeyError):
+                pck.load('slot1')
+
+            # Replaced slot shadows the base one
+            pck.dump('slot1', self.obj2k)
+            self.assertEqualObj2k(pck.load('slot1'))
+            self.assertEqual(pck.slots_info['slot1'].serialized_sha256_hash,
+                             pck.layers[1].slots_info['slot2'].serialized_sha256_hash)
+
+            # Removing it from the top pack keeps it hidden in the base pack
+            pck.remove('slot1')
+            self.assertNotIn('slot1', pck)
+
+            with pck.transaction():
+                pck.remove('slot2')
+                pck.dump('slot4', self.obj1k)
+
+        with zipfile.ZipFile(self.delta_fh) as zip_fh:
+            manifest = json.loads(zip_fh.read('manifest.json').decode('utf-8'))
+        self.assertListEqual(manifest['whiteouts'], ['slot1', 'slot2'])
+
+        # Whiteouts are respected when the delta becomes a base of another layer
+        with tempfile.TemporaryFile('w+b') as top_fh:
+            with LayeredPack(Pack(top_fh), [Pack(self.delta_fh, mode='r'), Pack(self.base_fh, mode='r')]) as pck:
+                self.assertListEqual(sorted(pck.slots_info), ['chunked', 'slot4'])
+
+    def test_read_only_top(self):
+
+        with Pack(self.delta_fh):
+            pass
+        with LayeredPack(Pack(self.delta_fh, mode='r'), [Pack(self.base_fh, mode='r')]) as pck:
+            self.assertEqualObj1k(pck.load('slot1'))
+            with self.assertRaises(MLIOPackReadOnlyError):
+                pck.remove('slot1')
+
+    def test_flatten(self):
+
+        with self._layered_pack() as pck:
+            pck.remove('slot2')
+            pck.dump('slot3', self.obj2k, compression='deflate')
+
+            with tempfile.TemporaryFile('w+b') as flat_fh:
+                pck.flatten(flat_fh)
+
+                with Pack(flat_fh, mode='r') as flattened:
+                    self.assertListEqual(sorted(flattened.slots_info), ['chunked', 'slot1', 'slot3'])
+                    self.assertEqualObj1k(flattened.load('slot1'))
+                    self.assertEqualObj2k(flattened.load('slot3'))
+                    self.assertEqual(flattened.slots_info['slot3'].compression, 'deflate')
+                    np.testing.assert_array_equal(flattened.load('chunked'), self.array)
+                    self.assertEqual(flattened.manifest_info.whiteouts, set())
+                    self.assertSetEqual(flattened._existing_pack_objects(), flattened._referenced_pack_objects())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import tempfile
+import threading
+from unittest import mock
+
+import numpy as np
+
+from mlio.io import Pack
+from mlio.io.exc import SlotKeyError
+from mlio.io.lazy import LazySlotProxy, is_loaded, resolve
+
+from tests.io_tests.generic import ObjectFixturesMixIn, GenericObject
+
+
+class ContextObject(object):
+
+    def __init__(self):
+        self.exited = False
+
+    def __enter__(self):
+        return 'entered'
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.exited = True
+        return True
+
+
+class LazySlotProxyTestCase(ObjectFixturesMixIn, unittest.TestCase):
+
+    def test_load_lazy(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k)
+                pck.dump('slot2', {'a': 1})
+
+                with mock.patch.object(Pack, '_load_slot', wraps=pck._load_slot) as mocked_load:
+                    proxy = pck.load_lazy('slot1')
+                    self.assertIs(type(proxy), LazySlotProxy)
+                    self.assertFalse(is_loaded(proxy))
+                    self.assertIn('not loaded', repr(proxy))
+                    mocked_load.assert_not_called()
+
+                    # First access loads the object
+                    self.assertDictEqual(proxy.data, self.obj1k.data)
+                    self.assertTrue(is_loaded(proxy))
+                    self.assertIsInstance(proxy, GenericObject)
+                    self.assertEqualObj1k(resolve(proxy))
+                    mocked_load.assert_called_once()
+
+                dict_proxy = pck.load_lazy('slot2')
+                self.assertEqual(dict_proxy['a'], 1)
+                self.assertIn('a', dict_proxy)
+                self.assertEqual(len(dict_proxy), 1)
+                self.assertEqual(dict_proxy, {'a': 1})
+
+                with self.assertRaises(SlotKeyError):
+                    pck.load_lazy('unknown')
+
+    def test_load_lazy_operators(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                pck.dump('int', 7)
+                pck.dump('array', np.arange(5))
+                pck.dump('list', [1, 2])
+                pck.dump('context', ContextObject())
+
+                int_proxy = pck.load_lazy('int')
+                self.assertIsInstance(int_proxy, int)
+                self.assertEqual(int_proxy + 1, 8)
+                self.assertEqual(1 + int_proxy, 8)
+                self.assertEqual(10 - int_proxy, 3)
+                self.assertEqual(2 ** int_proxy, 128)
+                self.assertEqual(divmod(int_proxy, 2), (3, 1))
+                self.assertEqual(-int_proxy, -7)
+                self.assertEqual(~int_proxy, -8)
+                self.assertEqual(int(int_proxy), 7)
+                self.assertEqual(float(int_proxy), 7.0)
+                self.assertEqual(round(int_proxy), 7)
+                self.assertListEqual(list(range(int_proxy))[-1:], [6])
+                self.assertEqual([0, 1, 2, 3, 4, 5, 6, 7][int_proxy], 7)
+
+                # Immutable objects are replaced, not updated
+                number = int_proxy
+                number += 1
+                self.assertEqual(number, 8)
+                self.assertEqual(int_proxy, 7)
+
+                array_proxy = pck.load_lazy('array')
+                np.testing.assert_array_equal(array_proxy * 2, np.arange(5) * 2)
+                np.testing.assert_array_equal(2 * array_proxy, np.arange(5) * 2)
+                np.testing.assert_array_equal(np.asarray(array_proxy), np.arange(5))
+                self.assertEqual(array_proxy @ array_proxy, 30)
+
+                list_proxy = pck.load_lazy('list')
+                same_proxy = list_proxy
+                same_proxy += [3]
+                self.assertIs(same_proxy, list_proxy)
+                self.assertListEqual(resolve(list_proxy), [1, 2, 3])
+                self.assertListEqual(list(reversed(list_proxy)), [3, 2, 1])
+
+                context_proxy = pck.load_lazy('context')
+                with context_proxy as value:
+                    self.assertEqual(value, 'entered')
+                    raise ValueError("suppressed by the proxied object")
+                self.assertTrue(context_proxy.exited)
+
+    def test_load_lazy_single_flight(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj2k)
+                proxy = pck.load_lazy('slot1')
+
+                with mock.patch.object(Pack, '_load_slot', wraps=pck._load_slot) as mocked_load:
+                    threads = [
+                        threading.Thread(target=lambda: proxy.data)
+                        for _ in range(8)
+                    ]
+                    for thread in threads:
+                        thread.start()
+                    for thread in threads:
+                        thread.join()
+
+                    mocked_load.assert_called_once()
+                self.assertEqualObj2k(resolve(proxy))
+
+    def test_load_lazy_removed_or_closed(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k)
+                pck.dump('slot2', self.obj2k)
+                removed_proxy = pck.load_lazy('slot1')
+                closed_proxy = pck.load_lazy('slot2')
+                pck.remove('slot1')
+
+                with self.assertRaises(SlotKeyError):
+                    resolve(removed_proxy)
+
+            with self.assertRaises(ValueError):
+                resolve(closed_proxy)
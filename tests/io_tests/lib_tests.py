@@ -1,6 +1,13 @@
+import io as sys_io
 import unittest
+from unittest import mock
 
-from mlio.io._lib import file_as_blockiter, hash_file_object
+from zipfile import ZipFile, ZipInfo
+
+from mlio.io._lib import (file_as_blockiter, hash_file_object, VerifiedFileObject, MemoryViewFileObject,
+                          HashingFileObject, zip_member_data_offset, read_zip_member_data_offset,
+                          zip_alignment_extra, zip_member_alignment, strip_zip_alignment_padding)
+from mlio.io.exc import MLIOPackSlotWrongChecksum
 from tests import fixtures
 
 
@@ -57,6 +64,149 @@ class LibTestCase(unittest.TestCase):
 
         self.assertEqual(self.random1k_sha256, hexhash)
 
+        # File objects without readinto() and blocks that do not divide the size
+        with open(self.random1kdump_filepath, 'r+b') as f:
+            reader = mock.Mock(spec=['read'], read=f.read)
+            self.assertEqual(self.random1k_sha256, hash_file_object(reader, block_size=100))
+
+    def test_verified_file_object_read(self):
+
+        with open(self.random1kdump_filepath, 'r+b') as f:
+            vf = VerifiedFileObject(f, self.random1k_sha256)
+            data = bytearray()
+            for chunk in file_as_blockiter(vf, block_size=100):
+                data += chunk
+
+            self.assertTrue(vf.is_verified)
+            vf.verify()
+
+        self.assertEqual(data, self.random1k_dump)
+
+    def test_verified_file_object_seek_hashes_once(self):
+
+        with open(self.random1kdump_filepath, 'r+b') as f:
+            vf = VerifiedFileObject(f, self.random1k_sha256)
+            self.assertEqual(vf.read(10), self.random1k_dump[:10])
+            self.assertEqual(vf.seek(0), 0)
+            self.assertEqual(vf.read(20), self.random1k_dump[:20])
+            self.assertEqual(vf.seek(500), 500)
+            buf = bytearray(10)
+            self.assertEqual(vf.readinto(buf), 10)
+            self.assertEqual(bytes(buf), self.random1k_dump[500:510])
+            self.assertEqual(vf.tell(), 510)
+            self.assertFalse(vf.is_verified)
+
+            # Drain trailing data
+            vf.verify(drain=True)
+            self.assertTrue(vf.is_verified)
+
+    def test_verified_file_object_no_drain(self):
+
+        with open(self.random1kdump_filepath, 'r+b') as f:
+            vf = VerifiedFileObject(f, self.random1k_sha256)
+            vf.read(10)
+            with self.assertRaises(MLIOPackSlotWrongChecksum):
+                vf.verify(drain=False)
+
+        # Consumers that stop exactly at the end of data do not need to read till EOF
+        with open(self.random1kdump_filepath, 'r+b') as f:
+            vf = VerifiedFileObject(f, self.random1k_sha256)
+            self.assertEqual(vf.read(len(self.random1k_dump)), self.random1k_dump)
+            self.assertFalse(vf.is_verified)
+            vf.verify(drain=False)
+            self.assertTrue(vf.is_verified)
+
+    def test_verified_file_object_wrong_hash(self):
+
+        vf = VerifiedFileObject(sys_io.BytesIO(self.random1k_dump), 'wrong')
+        vf.read(100)
+
+        with self.assertRaises(MLIOPackSlotWrongChecksum):
+            vf.read()
+
+        with self.assertRaises(MLIOPackSlotWrongChecksum):
+            vf.verify()
+
+    def test_hashing_file_object(self):
+
+        target = sys_io.BytesIO()
+        hashing_fh = HashingFileObject(target)
+        for chunk in file_as_blockiter(sys_io.BytesIO(self.random1k_dump), block_size=100):
+            hashing_fh.write(memoryview(chunk))
+
+        self.assertEqual(hashing_fh.size, len(self.random1k_dump))
+        self.assertEqual(hashing_fh.tell(), len(self.random1k_dump))
+        self.assertEqual(hashing_fh.hexdigest(), self.random1k_sha256)
+        self.assertEqual(target.getvalue(), self.random1k_dump)
+
+    def test_memory_view_file_object(self):
+
+        fp = MemoryViewFileObject(b'first line\nsecond line\nend')
+        self.assertEqual(fp.peek(1), b'f')
+        self.assertEqual(fp.readline(), b'first line\n')
+        self.assertEqual(fp.read(6), b'second')
+        buf = bytearray(5)
+        self.assertEqual(fp.readinto(buf), 5)
+        self.assertEqual(bytes(buf), b' line')
+        self.assertEqual(fp.readline(), b'\n')
+        self.assertEqual(fp.read(), b'end')
+        self.assertEqual(fp.read(), b'')
+        self.assertEqual(fp.readline(), b'')
+
+        fp.seek(-3, sys_io.SEEK_END)
+        self.assertEqual(fp.tell(), 23)
+        self.assertEqual(fp.read(), b'end')
+        self.assertTrue(fp.getbuffer().readonly)
+
+    def test_zip_member_data_offset(self):
+
+        buffer = sys_io.BytesIO()
+        with ZipFile(buffer, 'w') as zf:
+            zf.writestr('first', b'data of first')
+            zf.writestr('second', self.random1k_dump)
+
+        contents = buffer.getvalue()
+        with ZipFile(buffer, 'r') as zf:
+            for name in ['first', 'second']:
+                info = zf.getinfo(name)
+                offset = zip_member_data_offset(contents, info)
+                self.assertEqual(contents[offset:offset + info.file_size], zf.read(name))
+
+    def test_zip_alignment_extra(self):
+
+        buffer = sys_io.BytesIO()
+        with ZipFile(buffer, 'w') as zf:
+            zf.writestr('first', b'data of first')
+            for name, alignment, data_offset in [('second', 4096, 0), ('third', 64, 10), ('4th', 8, 0)]:
+                zip_info = ZipInfo(name)
+                zip_info.extra = zip_alignment_extra(zf.start_dir, zip_info, alignment, data_offset)
+                zf.writestr(zip_info, self.random1k_dump)
+
+        contents = buffer.getvalue()
+        with ZipFile(buffer, 'r') as zf:
+            self.assertIsNone(zip_member_alignment(zf.getinfo('first')))
+            for name, alignment, data_offset in [('second', 4096, 0), ('third', 64, 10), ('4th', 8, 0)]:
+                info = zf.getinfo(name)
+                offset = zip_member_data_offset(contents, info)
+                self.assertEqual((offset + data_offset) % alignment, 0)
+                self.assertEqual(read_zip_member_data_offset(buffer, info), offset)
+                self.assertEqual(zip_member_alignment(info), alignment)
+                self.assertEqual(zf.read(name), self.random1k_dump)
+
+    def test_strip_zip_alignment_padding(self):
+
+        zip_info = ZipInfo('member')
+        zip_info.extra = b'\x01\x02\x02\x00ab'
+        zip_info.extra = zip_alignment_extra(1000, zip_info, 4096)
+        self.assertGreater(len(zip_info.extra), 100)
+
+        stripped = strip_zip_alignment_padding(zip_info.extra)
+        self.assertEqual(stripped[:6], b'\x01\x02\x02\x00ab')
+        self.assertEqual(len(stripped), 12)
+        zip_info.extra = stripped
+        self.assertEqual(zip_member_alignment(zip_info), 4096)
+        self.assertEqual(strip_zip_alignment_padding(stripped), stripped)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -92,6 +92,83 @@ class PackManifestSlotTestCase(unittest.TestCase):
         self.assertEqual(slot.pack_object, 'ahash.slot')
         self.assertEqual(slot.serialized_sha256_hash, 'ahash')
 
+    def test_to_from_dict_with_compression(self):
+        ser = GenericMLModelsSerializer()
+
+        slot = PackManifestSlot(
+            slot_key='nice slot',
+            serialized_sha256_hash='ahash',
+            serializer=ser,
+            compression='deflate'
+        )
+        data = slot.to_dict()
+        self.assertEqual(data['compression'], 'deflate')
+
+        slot = PackManifestSlot.from_dict('nice slot', data, manifest_dependencies={})
+        self.assertEqual(slot.compression, 'deflate')
+        self.assertEqual(slot.pack_object, 'ahash.slot')
+
+        with self.assertRaises(MLIOPackWrongFormat):
+            PackManifestSlot.from_dict('nice slot', dict(data, compression='unknown'), manifest_dependencies={})
+
+    def test_to_from_dict_with_linked_objects(self):
+        ser = GenericMLModelsSerializer()
+
+        slot = PackManifestSlot(
+            slot_key='nice slot',
+            serialized_sha256_hash='ahash',
+            serializer=ser,
+            compression='zstd',
+            linked_objects=['bhash', 'chash']
+        )
+        data = slot.to_dict()
+        self.assertEqual(data['linked_objects'], ['bhash', 'chash'])
+
+        slot = PackManifestSlot.from_dict('nice slot', data, manifest_dependencies={})
+        self.assertEqual(slot.linked_objects, ['bhash', 'chash'])
+        self.assertEqual(slot.pack_objects, ['ahash.slot.zst', 'bhash.slot.zst', 'chash.slot.zst'])
+
+        # Not recorded when there are no linked objects
+        slot.linked_objects = []
+        self.assertNotIn('linked_objects', slot.to_dict())
+
+    def test_to_from_dict_with_hash_algorithm(self):
+        ser = GenericMLModelsSerializer()
+
+        slot = PackManifestSlot(
+            slot_key='nice slot',
+            serialized_sha256_hash='ahash',
+            serializer=ser,
+            hash_algorithm='blake2b',
+            linked_objects=['bhash']
+        )
+        data = slot.to_dict()
+        self.assertEqual(data['hash_algorithm'], 'blake2b')
+        self.assertEqual(data['serialized_hash'], 'ahash')
+        self.assertNotIn('serialized_sha256_hash', data)
+
+        slot = PackManifestSlot.from_dict('nice slot', data, manifest_dependencies={})
+        self.assertEqual(slot.hash_algorithm, 'blake2b')
+        self.assertEqual(slot.serialized_sha256_hash, 'ahash')
+        self.assertEqual(slot.pack_objects, ['blake2b-ahash.slot', 'blake2b-bhash.slot'])
+
+        with self.assertRaises(MLIOPackWrongFormat):
+            PackManifestSlot.from_dict('nice slot', dict(data, hash_algorithm='unknown'), manifest_dependencies={})
+        with self.assertRaises(MLIOPackWrongFormat):
+            PackManifestSlot.from_dict('nice slot', {'serializer': 'generic-ml-models', 'serialized_sha256_hash': 'a',
+                                                     'hash_algorithm': 'blake2b'}, manifest_dependencies={})
+
+    def test_to_from_dict_external(self):
+        ser = GenericMLModelsSerializer()
+
+        slot = PackManifestSlot(slot_key='nice slot', serialized_sha256_hash='ahash', serializer=ser)
+        self.assertNotIn('external', slot.to_dict())
+
+        slot.external = True
+        data = slot.to_dict()
+        self.assertIs(data['external'], True)
+        self.assertTrue(PackManifestSlot.from_dict('nice slot', data, manifest_dependencies={}).external)
+
     def test_from_dict_missing_hash_field(self):
 
         manifest_deps = {}
@@ -411,6 +488,20 @@ class PackManifestTestCase(unittest.TestCase):
                 }
             })
 
+    def test_whiteouts(self):
+        manifest = PackManifest()
+        self.assertNotIn('whiteouts', manifest.to_dict())
+
+        manifest.add_whiteout('slot2')
+        manifest.add_whiteout('slot1')
+        data = manifest.to_dict()
+        self.assertListEqual(data['whiteouts'], ['slot1', 'slot2'])
+        self.assertSetEqual(PackManifest.from_dict(data).whiteouts, {'slot1', 'slot2'})
+
+        # Inserting a slot cancels its whiteout
+        manifest.insert_slot(self.slots_by_id['slot1'])
+        self.assertSetEqual(manifest.whiteouts, {'slot2'})
+
     def test_from_dict(self):
         creation_time = datetime(2017, 1, 1, 0, 2, 2, tzinfo=timezone(timedelta(0)))
         updated_time = datetime(2018, 1, 1, 0, 2, 2, tzinfo=timezone(timedelta(0)))
@@ -1,11 +1,17 @@
+import io
+import os
+import hashlib
 import warnings
 import unittest
 import tempfile
+import zipfile
 from unittest import mock
+from collections import OrderedDict
 from datetime import datetime
 from mlio.io import Pack
 from mlio.io.context_dependencies.module_version import ModuleVersionContextDependency
-from mlio.io.exc import SlotKeyError, MLIOPackSlotWrongChecksum, MLIODependenciesNotSatisfied
+from mlio.io.exc import (SlotKeyError, MLIOPackSlotWrongChecksum, MLIODependenciesNotSatisfied,
+                         MLIOPackSlotNotMappable, MLIOPackWrongFormat, MLIOPackReadOnlyError, MLIOPackBusyError)
 from mlio.io.pack import PackManifest
 
 from tests.io_tests.generic import ObjectFixturesMixIn
@@ -97,6 +103,33 @@ class PackTestCase(ObjectFixturesMixIn, unittest.TestCase):
                 self.assertListEqual(list(pck._existing_pack_objects()),
                                      [f'{self.obj1k_hash}.slot'])
 
+    def test_pack_objects_index(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k)
+                pck.dump('slot2', self.obj2k)
+                pck.dump('slot3', self.obj2k)
+                obj1k_object = pck.slots_info['slot1'].pack_object
+                obj2k_object = pck.slots_info['slot2'].pack_object
+
+                # Writes must not rescan the archive
+                with mock.patch.object(pck._zip_fh, 'infolist', side_effect=AssertionError):
+                    pck.dump('slot4', self.obj1k)
+                    pck.remove('slot2')
+                    self.assertSetEqual(pck._existing_pack_objects(), {obj1k_object, obj2k_object})
+                    pck.remove('slot3')
+                    self.assertSetEqual(pck._existing_pack_objects(), {obj1k_object})
+
+                index_entry = pck._pack_objects_index[obj1k_object]
+                self.assertEqual(index_entry.header_offset, pck._zip_fh.getinfo(obj1k_object).header_offset)
+                self.assertGreater(index_entry.file_size, 0)
+
+            # Index is rebuilt from the archive
+            with Pack(tf) as pck:
+                self.assertSetEqual(pck._existing_pack_objects(), {obj1k_object})
+                self.assertDictEqual(dict(pck._pack_object_references), {obj1k_object: 2})
+
     def test_dump_on_existing(self):
 
         with tempfile.TemporaryFile("w+") as tf:
@@ -114,6 +147,30 @@ class PackTestCase(ObjectFixturesMixIn, unittest.TestCase):
                 pck.dump('slot1', self.obj1k)
                 self.assertIn('slot1', pck.slots_info.keys())
 
+    def test_dump_without_named_temporary_file(self):
+
+        with tempfile.TemporaryFile("w+") as tf:
+            with Pack(tf) as pck:
+                with mock.patch('tempfile.NamedTemporaryFile') as mocked_named_temp:
+                    pck.dump('slot1', self.obj1k)
+                    mocked_named_temp.assert_not_called()
+
+                slot = pck.slots_info['slot1']
+                data = pck._zip_fh.read(slot.pack_object)
+                self.assertEqual(hashlib.sha256(data).hexdigest(), slot.serialized_sha256_hash)
+                self.assertEqualObj1k(pck.load('slot1'))
+
+    @mock.patch.object(Pack, 'SPOOL_MAX_SIZE', 128)
+    def test_dump_spilled_to_disk(self):
+
+        with tempfile.TemporaryFile("w+") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k)
+                pck.dump('slot2', self.obj2k)
+
+                self.assertEqualObj1k(pck.load('slot1'))
+                self.assertEqualObj2k(pck.load('slot2'))
+
     def test_dump_same_object_and_remove_one_slot(self):
 
         with tempfile.TemporaryFile("w+") as tf:
@@ -160,6 +217,108 @@ class PackTestCase(ObjectFixturesMixIn, unittest.TestCase):
                 with self.assertRaises(MLIOPackSlotWrongChecksum):
                     pck.load('slot1')
 
+    def test_load_reads_pack_object_once(self):
+
+        with tempfile.TemporaryFile("w+") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k)
+
+                with mock.patch.object(pck, '_open_pack_object', wraps=pck._open_pack_object) as mocked_open:
+                    self.assertEqualObj1k(pck.load('slot1'))
+                    self.assertEqual(mocked_open.call_count, 1)
+
+    def test_load_with_trailing_data(self):
+
+        with tempfile.TemporaryFile("w+") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k)
+
+                # Append trailing garbage that pickle will not consume
+                slot = pck.slots_info['slot1']
+                data = pck._zip_fh.read(slot.pack_object) + b'trailing'
+                slot.serialized_sha256_hash = hashlib.sha256(data).hexdigest()
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    pck._zip_fh.writestr(slot.pack_object, data)
+
+                self.assertEqualObj1k(pck.load('slot1'))
+
+                with self.assertRaises(MLIOPackSlotWrongChecksum):
+                    pck.load('slot1', drain=False)
+
+    def test_load_without_drain(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k)
+                pck.dump('slot2', self.obj2k, compression='deflate')
+
+                # Serializers stop at the end of their data, unmodified slots are still verified
+                self.assertEqualObj1k(pck.load('slot1', drain=False))
+                self.assertEqualObj2k(pck.load('slot2', drain=False))
+
+    def test_open_slot_buffer(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k)
+
+                view = pck.open_slot_buffer('slot1')
+                self.assertTrue(view.readonly)
+                self.assertEqual(view.tobytes(), pck._zip_fh.read(pck.slots_info['slot1'].pack_object))
+                del view
+
+                with self.assertRaises(SlotKeyError):
+                    pck.open_slot_buffer('unknown')
+
+                # Break object checksum
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    pck._zip_fh.writestr(pck.slots_info['slot1'].pack_object, b'broken data')
+
+                with self.assertRaises(MLIOPackSlotWrongChecksum):
+                    pck.open_slot_buffer('slot1')
+                self.assertEqual(pck.open_slot_buffer('slot1', verify=False).tobytes(), b'broken data')
+
+    def test_compact_with_mapped_buffers(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k)
+                view = pck.open_slot_buffer('slot1')[:10]
+
+                # Buffers of previous maps are also tracked when the pack file grows and it is mapped again
+                pck.dump('slot2', self.obj2k)
+                other_view = pck.open_slot_buffer('slot2')
+                pck.remove('slot2')
+                with self.assertRaises(MLIOPackBusyError):
+                    pck.compact()
+                del other_view
+                with self.assertRaises(MLIOPackBusyError):
+                    pck.compact()
+
+                # Compacting in a new file is always permitted
+                with tempfile.TemporaryFile("w+b") as target:
+                    pck.compact(target=target)
+
+                del view
+                pck.compact()
+                self.assertEqualObj1k(pck.load('slot1'))
+
+    def test_open_slot_buffer_not_mappable(self):
+
+        buffer = io.BytesIO()
+        buffer.mode = 'w+b'
+
+        with Pack(buffer) as pck:
+            pck.dump('slot1', self.obj1k)
+
+            with self.assertRaises(MLIOPackSlotNotMappable):
+                pck.open_slot_buffer('slot1')
+
+            # Loading falls back to zip streams
+            self.assertEqualObj1k(pck.load('slot1'))
+
     def test_load_unsatisfied_dependencies(self):
 
         with tempfile.TemporaryFile("w+") as tf:
@@ -188,6 +347,222 @@ class PackTestCase(ObjectFixturesMixIn, unittest.TestCase):
                 self.assertEqualObj1k(pck.load('slot1'))
                 self.assertEqualObj2k(pck.load('slot2'))
 
+    def _count_manifests(self, pck):
+        return sum(1 for info in pck._zip_fh.infolist() if info.filename == PackManifest.MANIFEST_FILENAME)
+
+    def test_transaction(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k)
+                manifests_before = self._count_manifests(pck)
+
+                with pck.transaction():
+                    pck.dump('slot2', self.obj2k)
+                    pck.dump('slot3', self.obj2k)
+                    with pck.transaction():
+                        pck.remove('slot1')
+                    self.assertListEqual(sorted(pck.slots_info.keys()), ['slot2', 'slot3'])
+                    self.assertEqual(self._count_manifests(pck), manifests_before)
+
+                self.assertEqual(self._count_manifests(pck), manifests_before + 1)
+                self.assertListEqual(sorted(pck._existing_pack_objects()),
+                                     [pck.slots_info['slot2'].pack_object])
+
+            with Pack(tf) as pck:
+                self.assertListEqual(sorted(pck.slots_info.keys()), ['slot2', 'slot3'])
+                self.assertEqualObj2k(pck.load('slot3'))
+
+    def test_transaction_rollback(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k)
+
+                with self.assertRaises(RuntimeError):
+                    with pck.transaction():
+                        pck.remove('slot1')
+                        pck.dump('slot2', self.obj2k)
+                        raise RuntimeError()
+
+                self.assertListEqual(list(pck.slots_info.keys()), ['slot1'])
+                self.assertListEqual(sorted(pck._existing_pack_objects()),
+                                     [pck.slots_info['slot1'].pack_object])
+                self.assertEqualObj1k(pck.load('slot1'))
+
+    def test_dump_many(self):
+
+        objects = OrderedDict([
+            ('slot1', self.obj1k),
+            ('slot2', self.obj2k),
+            ('slot3', self.obj1k),
+        ])
+
+        for workers, use_processes in [(None, True), (2, False), (2, True)]:
+            with self.subTest(workers=workers, use_processes=use_processes):
+                with tempfile.TemporaryFile("w+b") as tf:
+                    with Pack(tf) as pck:
+                        manifests_before = self._count_manifests(pck)
+                        pck.dump_many(objects, workers=workers, use_processes=use_processes)
+
+                        self.assertListEqual(list(pck.slots_info.keys()), ['slot1', 'slot2', 'slot3'])
+                        self.assertEqual(self._count_manifests(pck), manifests_before + 1)
+                        self.assertEqual(len(pck._existing_pack_objects()), 2)
+
+                    with Pack(tf) as pck:
+                        self.assertEqualObj1k(pck.load('slot1'))
+                        self.assertEqualObj2k(pck.load('slot2'))
+                        self.assertEqualObj1k(pck.load('slot3'))
+
+    def test_dump_many_on_existing(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot2', self.obj2k)
+
+                with self.assertRaises(SlotKeyError):
+                    pck.dump_many({'slot1': self.obj1k, 'slot2': self.obj2k}, workers=2)
+                self.assertListEqual(list(pck.slots_info.keys()), ['slot2'])
+
+    def test_load_many(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k)
+                pck.dump('slot2', self.obj2k, compression='deflate')
+                pck.dump('slot3', [1, 2, 3])
+
+                for workers in [None, 1, 4]:
+                    with self.subTest(workers=workers):
+                        objects = pck.load_many(['slot3', 'slot1', 'slot2'], workers=workers)
+                        self.assertListEqual(list(objects.keys()), ['slot3', 'slot1', 'slot2'])
+                        self.assertEqualObj1k(objects['slot1'])
+                        self.assertEqualObj2k(objects['slot2'])
+                        self.assertEqual(objects['slot3'], [1, 2, 3])
+
+                # Pack stays writable after loading
+                pck.dump('slot4', 4)
+                self.assertDictEqual(
+                    dict(pck.iter_load_many(['slot3', 'slot4'], workers=2)),
+                    {'slot3': [1, 2, 3], 'slot4': 4})
+
+                with self.assertRaises(SlotKeyError):
+                    pck.iter_load_many(['slot1', 'unknown'])
+
+    def test_read_only_mode(self):
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pack_path = os.path.join(tmp_dir, 'pack.zip')
+            with open(pack_path, 'w+b') as f:
+                with Pack(f) as pck:
+                    pck.dump('slot1', self.obj1k)
+                    pck.dump('slot2', self.obj2k, compression='deflate')
+            with open(pack_path, 'rb') as f:
+                pack_data = f.read()
+
+            # Multiple readers on read-only handlers
+            with open(pack_path, 'rb') as f1, open(pack_path, 'rb') as f2:
+                with Pack(f1, mode='r') as pck1, Pack(f2, mode='r') as pck2:
+                    self.assertEqual(pck1.mode, 'r')
+                    self.assertEqualObj1k(pck1.load('slot1'))
+                    self.assertEqualObj2k(pck2.load('slot2'))
+                    self.assertEqual(len(pck1.load_many(['slot1', 'slot2'], workers=2)), 2)
+
+                    with self.assertRaises(MLIOPackReadOnlyError):
+                        pck1.dump('slot3', self.obj1k)
+                    with self.assertRaises(MLIOPackReadOnlyError):
+                        pck1.remove('slot1')
+                    with self.assertRaises(MLIOPackReadOnlyError):
+                        pck1.compact()
+                    with self.assertRaises(MLIOPackReadOnlyError):
+                        with pck1.transaction():
+                            pass
+
+            # File is never touched
+            with open(pack_path, 'rb') as f:
+                self.assertEqual(f.read(), pack_data)
+
+    def test_read_only_mode_wrong_format(self):
+
+        with self.assertRaises(ValueError):
+            Pack(io.BytesIO(), mode='w')
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with self.assertRaises(MLIOPackWrongFormat):
+                Pack(tf, mode='r')
+
+            with zipfile.ZipFile(tf, 'w') as zf:
+                zf.writestr('other', b'data')
+            with self.assertRaises(MLIOPackWrongFormat):
+                Pack(tf, mode='r')
+
+    def test_compact(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k)
+                pck.dump('slot2', self.obj2k)
+                pck.dump('slot3', self.obj2k)
+                pck.remove('slot2')
+                pck.remove('slot3')
+
+                stats = pck.compact()
+
+                # 6 copies of manifest, 2 objects and 1 tombstone reduced to 1 manifest and 1 object
+                self.assertEqual(stats.entries_before, 9)
+                self.assertEqual(stats.entries_after, 2)
+                self.assertEqual(stats.reclaimed_entries, 7)
+                self.assertGreater(stats.reclaimed_bytes, 0)
+                self.assertEqual(stats.bytes_after, tf.seek(0, io.SEEK_END))
+
+                self.assertListEqual(sorted(pck._zip_fh.namelist()),
+                                     sorted([PackManifest.MANIFEST_FILENAME, pck.slots_info['slot1'].pack_object]))
+                self.assertEqualObj1k(pck.load('slot1'))
+
+                # Pack is still writable
+                pck.dump('slot2', self.obj2k)
+
+            with Pack(tf) as pck:
+                self.assertListEqual(sorted(pck.slots_info.keys()), ['slot1', 'slot2'])
+                self.assertEqualObj1k(pck.load('slot1'))
+                self.assertEqualObj2k(pck.load('slot2'))
+
+    def test_compact_to_target(self):
+
+        with tempfile.TemporaryFile("w+b") as tf, tempfile.TemporaryFile("w+b") as target:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k)
+                pck.dump('slot2', self.obj2k)
+                pck.remove('slot2')
+
+                stats = pck.compact(target=target)
+                self.assertEqual(stats.entries_after, 2)
+                self.assertEqual(stats.bytes_after, target.seek(0, io.SEEK_END))
+
+                # Original pack is untouched
+                self.assertEqual(len(pck._zip_fh.infolist()), stats.entries_before)
+
+            with Pack(target) as pck:
+                self.assertListEqual(list(pck.slots_info.keys()), ['slot1'])
+                self.assertEqualObj1k(pck.load('slot1'))
+
+    def test_compact_in_transaction(self):
+
+        with tempfile.TemporaryFile("w+b") as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k)
+
+                with self.assertRaises(RuntimeError):
+                    with pck.transaction():
+                        pck.dump('slot2', self.obj2k)
+                        with self.assertRaises(MLIOPackBusyError):
+                            pck.compact()
+                        raise RuntimeError()
+
+            # Changes of the aborted transaction are not persisted
+            with Pack(tf) as pck:
+                self.assertListEqual(list(pck.slots_info.keys()), ['slot1'])
+
     def test_has_slot_and_contains(self):
 
         with tempfile.TemporaryFile("w+") as tf:
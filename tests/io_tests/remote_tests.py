@@ -0,0 +1,162 @@
+import unittest
+import os
+import re
+import tempfile
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+
+import numpy as np
+
+from mlio.io import Pack
+from mlio.io.exc import MLIORemoteReadError, MLIOPackReadOnlyError
+from mlio.io.remote import RemoteFileObject, LocalFileRangeReader, HTTPRangeReader
+
+from tests.io_tests.generic import ObjectFixturesMixIn
+
+
+class _RangeRequestHandler(BaseHTTPRequestHandler):
+    """
+    Minimal handler that serves the content of the server with support of range requests
+    """
+
+    def do_GET(self):
+        content = self.server.content
+        etag = '"{}"'.format(self.server.version)
+
+        if self.headers.get('If-Match') not in (None, etag):
+            self.send_response(412)
+            self.end_headers()
+            return
+
+        requested_range = re.match(r'bytes=(\d+)-(\d+)', self.headers.get('Range', ''))
+        if requested_range is None or not self.server.support_ranges:
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+            return
+
+        start, end = int(requested_range.group(1)), min(int(requested_range.group(2)), len(content) - 1)
+        self.server.served_bytes += end - start + 1
+        self.send_response(206)
+        self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, end, len(content)))
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(content[start:end + 1])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class RemoteFileObjectTestCase(ObjectFixturesMixIn, unittest.TestCase):
+
+    def setUp(self):
+        super(RemoteFileObjectTestCase, self).setUp()
+        self.big_data = np.random.RandomState(0).bytes(4 * 1024 * 1024)
+
+        with tempfile.NamedTemporaryFile('w+b', delete=False) as tf:
+            with Pack(tf) as pck:
+                pck.dump('big1', self.big_data)
+                pck.dump('slot1', self.obj1k)
+                pck.dump('big2', self.big_data[::-1])
+                pck.dump('slot2', self.obj2k, compression='deflate')
+        self.pack_path = tf.name
+        self.pack_size = os.path.getsize(self.pack_path)
+
+    def tearDown(self):
+        os.unlink(self.pack_path)
+
+    def test_read_seek(self):
+        with open(self.pack_path, 'rb') as f:
+            content = f.read()
+
+        fh = RemoteFileObject(LocalFileRangeReader(self.pack_path), block_size=1000, cache_blocks=2)
+        self.assertEqual(fh.mode, 'rb')
+        self.assertEqual(fh.read(10), content[:10])
+        fh.seek(2500)
+        self.assertEqual(fh.read(1500), content[2500:4000])
+        fh.seek(-5, os.SEEK_END)
+        self.assertEqual(fh.read(100), content[-5:])
+        self.assertEqual(fh.read(100), b'')
+
+        fh.seek(0)
+        self.assertEqual(fh.read(3500), content[:3500])
+        self.assertEqual(len(fh._blocks), 4)
+
+        with self.assertRaises(ValueError):
+            fh.seek(-1)
+
+    def test_read_ahead(self):
+        fh = RemoteFileObject(LocalFileRangeReader(self.pack_path), block_size=1000, read_ahead=3)
+
+        fh.read(500)
+        self.assertEqual(fh.bytes_fetched, 1000)
+        # Sequential reads fetch the next blocks in advance
+        fh.read(1000)
+        self.assertEqual(fh.bytes_fetched, 5000)
+        fh.read(2000)
+        self.assertEqual(fh.requests, 2)
+
+    def test_load_fetches_only_needed_ranges(self):
+        fh = RemoteFileObject(LocalFileRangeReader(self.pack_path), block_size=64 * 1024)
+
+        with Pack(fh, mode='r') as pck:
+            self.assertListEqual(sorted(pck.slots_info), ['big1', 'big2', 'slot1', 'slot2'])
+            self.assertEqualObj1k(pck.load('slot1'))
+            self.assertEqualObj2k(pck.load('slot2'))
+            self.assertLess(fh.bytes_fetched, 1024 * 1024)
+
+            self.assertEqual(pck.load('big2'), self.big_data[::-1])
+            self.assertLess(fh.bytes_fetched, self.pack_size / 2 + 1024 * 1024)
+
+            fetched = fh.bytes_fetched
+            self.assertEqual(len(pck.load_many(['big1', 'slot1'], workers=2)), 2)
+            self.assertGreater(fh.bytes_fetched - fetched, len(self.big_data))
+
+            with self.assertRaises(MLIOPackReadOnlyError):
+                pck.dump('slot3', self.obj1k)
+
+    def test_http(self):
+        with open(self.pack_path, 'rb') as f:
+            content = f.read()
+
+        server = _ThreadingHTTPServer(('127.0.0.1', 0), _RangeRequestHandler)
+        server.content = content
+        server.version = 1
+        server.support_ranges = True
+        server.served_bytes = 0
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = 'http://127.0.0.1:{}/model.pack'.format(server.server_address[1])
+
+        try:
+            reader = HTTPRangeReader(url)
+            self.assertEqual(reader.size(), len(content))
+            self.assertEqual(reader.read_range(100, 50), content[100:150])
+
+            with Pack(RemoteFileObject(reader), mode='r') as pck:
+                self.assertEqualObj1k(pck.load('slot1'))
+            self.assertLess(server.served_bytes, 1024 * 1024)
+
+            # File was replaced while reading it
+            server.version = 2
+            with self.assertRaises(MLIORemoteReadError):
+                reader.read_range(0, 10)
+
+            # Server without support of ranges
+            server.support_ranges = False
+            with self.assertRaises(MLIORemoteReadError):
+                HTTPRangeReader(url).size()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,257 @@
+import unittest
+import weakref
+import zipfile
+import tempfile
+import io as sys_io
+from unittest import mock
+
+import numpy as np
+
+from mlio.io import Pack
+from mlio.io.exc import MLIOPackSlotNotMappable, MLIOPackBusyError
+from mlio.io.compression import available_codecs
+from mlio.io._lib import zip_member_alignment
+from mlio.io.serializers.arrays import NumpyArraySerializer, ChunkedArraySerializer
+from tests.io_tests.generic import GenericObject
+
+
+class NumpyArraySerializerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.np_array = np.random.rand(10, 100, 20)
+        self.int_array = np.arange(1000, dtype='int32').reshape(10, 100)
+
+    def test_class_method(self):
+
+        self.assertEqual(NumpyArraySerializer.serializer_type(), 'numpy-ndarray')
+
+    def test_can_process(self):
+
+        self.assertTrue(NumpyArraySerializer.can_serialize(self.np_array))
+        self.assertTrue(NumpyArraySerializer.can_serialize(self.int_array))
+
+        # Anything else
+        self.assertFalse(NumpyArraySerializer.can_serialize(np.array([GenericObject(1)], dtype=object)))
+        self.assertFalse(NumpyArraySerializer.can_serialize(np.ma.masked_array([1, 2])))
+        self.assertFalse(NumpyArraySerializer.can_serialize(1))
+        self.assertFalse(NumpyArraySerializer.can_serialize([1, 2]))
+
+    def test_dump_load_file(self):
+
+        ser = NumpyArraySerializer()
+        with tempfile.TemporaryFile('w+b') as tf:
+            ser.dump(self.np_array, tf)
+            size = tf.tell()
+            tf.seek(0, sys_io.SEEK_SET)
+            recovered_np_array = ser.load(tf)
+        np.testing.assert_array_equal(self.np_array, recovered_np_array)
+
+        alignment, header_size = ser.get_data_alignment()
+        self.assertEqual(header_size, size - self.np_array.nbytes)
+        self.assertEqual(len(ser.get_context_dependencies()), 0)
+
+    def test_dump_load_string(self):
+
+        ser = NumpyArraySerializer()
+        payload = ser.dumps(self.int_array)
+        np.testing.assert_array_equal(self.int_array, ser.loads(payload))
+
+
+class PackNumpyArrayTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.np_array = np.random.rand(100, 30)
+        self.fortran_array = np.asfortranarray(np.arange(3000, dtype='int16').reshape(100, 30))
+
+    def test_load_mmap(self):
+
+        with tempfile.TemporaryFile('w+b') as tf:
+            with Pack(tf) as pck:
+                pck.dump('other', {'a': 1})
+                pck.dump('array', self.np_array)
+                pck.dump('fortran', self.fortran_array)
+                self.assertEqual(pck.slots_info['array'].serializer.serializer_type(), 'numpy-ndarray')
+
+                for slot_key, array in [('array', self.np_array), ('fortran', self.fortran_array)]:
+                    mapped = pck.load(slot_key, mmap_mode='r')
+                    self.assertIsInstance(mapped, np.memmap)
+                    np.testing.assert_array_equal(mapped, array)
+                    # Data are page aligned in the pack
+                    self.assertEqual(mapped.offset % NumpyArraySerializer.DATA_ALIGNMENT, 0)
+                    with self.assertRaises(ValueError):
+                        mapped[0, 0] = 1
+
+                copied = pck.load('array', mmap_mode='c')
+                copied[0, 0] = -1
+                np.testing.assert_array_equal(pck.load('array'), self.np_array)
+
+                # Arrays are read exactly, so they are verified without draining
+                np.testing.assert_array_equal(pck.load('array', drain=False), self.np_array)
+
+                # Mapped objects would be invalidated by compaction in-place
+                pck.remove('other')
+                view = mapped[1:]
+                del mapped, copied
+                with self.assertRaises(MLIOPackBusyError):
+                    pck.compact()
+                del view
+
+                # Alignment is kept on compaction
+                pck.compact()
+                mapped = pck.load('fortran', mmap_mode='r')
+                self.assertEqual(mapped.offset % NumpyArraySerializer.DATA_ALIGNMENT, 0)
+                np.testing.assert_array_equal(mapped, self.fortran_array)
+                del mapped
+
+                # References to collected objects are not kept
+                for _ in range(100):
+                    pck.load('array', mmap_mode='r')
+                self.assertLessEqual(len(pck._mapped_refs), 1)
+
+    def test_alignment_overhead(self):
+
+        arrays = [np.arange(i, i + 600, dtype='float64') for i in range(50)]
+        small_array = np.arange(16, dtype='float64')
+        with tempfile.TemporaryFile('w+b') as tf:
+            with Pack(tf) as pck:
+                for i, array in enumerate(arrays):
+                    pck.dump('array{}'.format(i), array)
+                pck.dump('small', small_array)
+                small_object = pck.slots_info['small'].pack_object
+
+            # Padding is only in local headers, the central directory keeps the requested alignment
+            with zipfile.ZipFile(tf) as zip_fh:
+                for zip_info in zip_fh.infolist():
+                    self.assertLessEqual(len(zip_info.extra), 6)
+                    if zip_info.filename != small_object and zip_info.filename.endswith('.slot'):
+                        self.assertEqual(zip_member_alignment(zip_info), NumpyArraySerializer.DATA_ALIGNMENT)
+                self.assertIsNone(zip_member_alignment(zip_fh.getinfo(small_object)))
+                central_directory_size = tf.seek(0, sys_io.SEEK_END) - zip_fh.start_dir
+                self.assertLess(central_directory_size, len(zip_fh.infolist()) * 128)
+
+            with Pack(tf) as pck:
+                for i, array in enumerate(arrays):
+                    mapped = pck.load('array{}'.format(i), mmap_mode='r')
+                    self.assertEqual(mapped.offset % NumpyArraySerializer.DATA_ALIGNMENT, 0)
+                    np.testing.assert_array_equal(mapped, array)
+                    del mapped
+                np.testing.assert_array_equal(pck.load('small', mmap_mode='r'), small_array)
+
+    def test_load_mmap_not_mappable(self):
+
+        with tempfile.TemporaryFile('w+b') as tf:
+            with Pack(tf) as pck:
+                pck.dump('compressed', self.np_array, compression='deflate')
+                pck.dump('other', {'a': 1})
+
+                np.testing.assert_array_equal(pck.load('compressed'), self.np_array)
+                with self.assertRaises(MLIOPackSlotNotMappable):
+                    pck.load('compressed', mmap_mode='r')
+                with self.assertRaises(MLIOPackSlotNotMappable):
+                    pck.load('other', mmap_mode='r')
+                with self.assertRaises(ValueError):
+                    pck.load('compressed', mmap_mode='r+')
+
+
+class PackChunkedArrayTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.np_array = np.arange(1000 * 37, dtype='float64').reshape(1000, 37)
+
+    def test_dump_load(self):
+
+        with tempfile.TemporaryFile('w+b') as tf:
+            with Pack(tf) as pck:
+                pck.dump('chunked', self.np_array, serializer=ChunkedArraySerializer(chunk_shape=(128, 10)))
+                pck.dump('compressed', self.np_array, serializer=ChunkedArraySerializer(chunk_shape=100),
+                         compression='deflate')
+                pck.dump('scalar', np.array(3, dtype='int8'), serializer=ChunkedArraySerializer())
+
+                # 8 x 4 chunks
+                self.assertEqual(len(pck.slots_info['chunked'].linked_objects), 32)
+                self.assertEqual(len(pck.slots_info['compressed'].linked_objects), 10)
+
+            with Pack(tf) as pck:
+                np.testing.assert_array_equal(pck.load('chunked'), self.np_array)
+                np.testing.assert_array_equal(pck.load('compressed'), self.np_array)
+                self.assertEqual(pck.load('scalar'), 3)
+
+    def test_dump_load_all_codecs(self):
+
+        for codec_type in available_codecs():
+            with self.subTest(codec=codec_type):
+                with tempfile.TemporaryFile('w+b') as tf:
+                    with Pack(tf) as pck:
+                        pck.dump('chunked', self.np_array, serializer=ChunkedArraySerializer(chunk_shape=300),
+                                 compression=codec_type)
+                        np.testing.assert_array_equal(pck.load('chunked'), self.np_array)
+                        np.testing.assert_array_equal(pck.load_slice('chunked', slice(290, 310)),
+                                                      self.np_array[290:310])
+
+    def test_load_slice(self):
+
+        with tempfile.TemporaryFile('w+b') as tf:
+            with Pack(tf) as pck:
+                pck.dump('chunked', self.np_array, serializer=ChunkedArraySerializer(chunk_shape=(128, 10)))
+
+                for index in [5, -1, slice(100, 300), (slice(None), 3), (slice(990, 100, -7), slice(2, 30, 3)),
+                              (slice(5, 5),), (10, slice(None, None, -1))]:
+                    with self.subTest(index=index):
+                        np.testing.assert_array_equal(pck.load_slice('chunked', index), self.np_array[index])
+
+                with self.assertRaises(IndexError):
+                    pck.load_slice('chunked', 1000)
+                with self.assertRaises(IndexError):
+                    pck.load_slice('chunked', (1, 2, 3))
+
+                # Only overlapping chunks are read
+                with mock.patch.object(Pack, '_read_linked_object', wraps=pck._read_linked_object) as mocked_read:
+                    pck.load_slice('chunked', (slice(120, 130), slice(0, 5)))
+                    self.assertEqual(mocked_read.call_count, 2)
+
+                pck.dump('plain', self.np_array)
+                with self.assertRaises(TypeError):
+                    pck.load_slice('plain', 1)
+
+    def test_reuse_serializer(self):
+
+        serializer = ChunkedArraySerializer(chunk_shape=250)
+        with tempfile.TemporaryFile('w+b') as tf:
+            with Pack(tf) as pck:
+                array = self.np_array.copy()
+                array_ref = weakref.ref(array)
+                pck.dump('a', array, serializer=serializer)
+                pck.dump('b', self.np_array[:500], serializer=serializer)
+
+                self.assertEqual(len(pck.slots_info['a'].linked_objects), 4)
+                self.assertEqual(len(pck.slots_info['b'].linked_objects), 2)
+                self.assertIsNot(pck.slots_info['a'].serializer, serializer)
+                self.assertIsNot(pck.slots_info['a'].serializer, pck.slots_info['b'].serializer)
+                self.assertListEqual(serializer.get_linked_objects(), [])
+
+                # The pack does not keep dumped objects alive
+                del array
+                self.assertIsNone(array_ref())
+
+                np.testing.assert_array_equal(pck.load('a'), self.np_array)
+                np.testing.assert_array_equal(pck.load('b'), self.np_array[:500])
+
+    def test_remove_and_compact(self):
+
+        with tempfile.TemporaryFile('w+b') as tf:
+            with Pack(tf) as pck:
+                pck.dump('chunked', self.np_array, serializer=ChunkedArraySerializer(chunk_shape=250))
+                pck.dump('other', self.np_array[:250], serializer=ChunkedArraySerializer(chunk_shape=250))
+                # The first chunk is shared
+                self.assertEqual(len(pck._existing_pack_objects()), 6)
+
+                pck.compact()
+                np.testing.assert_array_equal(pck.load('chunked'), self.np_array)
+
+                pck.remove('chunked')
+                self.assertEqual(len(pck._existing_pack_objects()), 2)
+                np.testing.assert_array_equal(pck.load('other'), self.np_array[:250])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+import weakref
 import tempfile
 import io as sys_io
 import packaging
@@ -9,7 +10,9 @@ from sklearn.ensemble import RandomForestClassifier
 from xgboost import XGBClassifier
 import numpy as np
 
-from mlio.io.serializers.generic import (DefaultSerializer, GenericMLModelsSerializer)
+from mlio.io import Pack
+from mlio.io.exc import MLIOPackBusyError
+from mlio.io.serializers.generic import (DefaultSerializer, GenericMLModelsSerializer, OutOfBandPickleSerializer)
 from tests.io_tests.generic import GenericObject
 
 
@@ -111,5 +114,93 @@ class GeneralMLTestCase(unittest.TestCase):
         self.assertEqual(ser.get_context_dependencies()[0].dependency_id(), "module-version:numpy-~=0.12.1")
 
 
+@unittest.skipUnless(OutOfBandPickleSerializer.is_supported(), "pickle protocol 5 is not supported")
+class OutOfBandPickleSerializerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.np_array = np.random.rand(100, 1000)
+        self.pipeline = {
+            'name': 'pipeline',
+            'weights': self.np_array,
+            'same_weights': self.np_array.copy(),
+            'bias': np.arange(10),
+            'transposed': self.np_array.T[::2],
+            'obj': GenericObject(10)
+        }
+
+    def test_can_process(self):
+
+        self.assertEqual(OutOfBandPickleSerializer.serializer_type(), 'pickle-out-of-band')
+        self.assertFalse(OutOfBandPickleSerializer.can_serialize(self.np_array))
+
+    def test_dump_linked_buffers(self):
+
+        ser = OutOfBandPickleSerializer()
+        with tempfile.TemporaryFile('w+b') as tf:
+            ser.dump(self.pipeline, tf)
+            # Weights are out-of-band only once, small and non-contiguous buffers are kept in the stream
+            self.assertLess(tf.tell(), self.np_array.nbytes)
+        linked_objects = ser.get_linked_objects()
+        self.assertEqual(len(linked_objects), 1)
+        self.assertEqual(linked_objects[0].size, self.np_array.nbytes)
+        self.assertEqual(bytes(linked_objects[0].data_provider()), self.np_array.tobytes())
+
+        # Linked objects can only be read from a pack
+        with self.assertRaises(RuntimeError):
+            ser.loads(ser.dumps(self.pipeline))
+
+    def test_compact_with_loaded_buffers(self):
+
+        with tempfile.TemporaryFile('w+b') as tf:
+            with Pack(tf) as pck:
+                pck.dump('stored', self.pipeline, serializer=OutOfBandPickleSerializer())
+                pck.dump('other', {'a': 1})
+                weights = pck.load('stored')['weights']
+                self.assertFalse(weights.flags.owndata)
+
+                # Compaction would rewrite the file under the loaded buffers
+                pck.remove('other')
+                with self.assertRaises(MLIOPackBusyError):
+                    pck.compact()
+                np.testing.assert_array_equal(weights, self.np_array)
+
+                del weights
+                pck.compact()
+                np.testing.assert_array_equal(pck.load('stored')['weights'], self.np_array)
+
+    def test_dump_load_pack(self):
+
+        with tempfile.TemporaryFile('w+b') as tf:
+            with Pack(tf) as pck:
+                pck.dump('stored', self.pipeline, serializer=OutOfBandPickleSerializer())
+                pck.dump('compressed', self.pipeline, serializer=OutOfBandPickleSerializer(min_buffer_size=0),
+                         compression='deflate')
+                self.assertEqual(len(pck.slots_info['stored'].linked_objects), 1)
+                self.assertEqual(len(pck.slots_info['compressed'].linked_objects), 2)
+
+            with Pack(tf) as pck:
+                for slot_key in ['stored', 'compressed']:
+                    with self.subTest(slot_key=slot_key):
+                        recovered = pck.load(slot_key)
+                        self.assertEqual(recovered['name'], 'pipeline')
+                        self.assertDictEqual(recovered['obj'].data, self.pipeline['obj'].data)
+                        for key in ['weights', 'same_weights', 'bias', 'transposed']:
+                            np.testing.assert_array_equal(recovered[key], self.pipeline[key])
+
+                # Buffers of stored slots are shared with the pack file
+                self.assertFalse(pck.load('stored')['weights'].flags.writeable)
+
+                pck.remove('stored')
+                pck.remove('compressed')
+                self.assertEqual(len(pck._existing_pack_objects()), 0)
+
+                # The pack does not keep buffers of dumped objects alive
+                weights = np.random.rand(1000)
+                weights_ref = weakref.ref(weights)
+                pck.dump('other', {'weights': weights}, serializer=OutOfBandPickleSerializer(min_buffer_size=0))
+                del weights
+                self.assertIsNone(weights_ref())
+
+
 if __name__ == '__main__':
     unittest.main()
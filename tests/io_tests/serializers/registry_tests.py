@@ -1,4 +1,5 @@
 import unittest
+from unittest import mock
 from xgboost import XGBClassifier
 from gensim.models import Word2Vec
 import numpy as np
@@ -11,6 +12,7 @@ from mlio.io.serializers._registry import (get_serializer_by_type, find_suitable
 from mlio.io.serializers.base import SerializerBase
 from mlio.io.serializers.generic import DefaultSerializer, GenericMLModelsSerializer
 from mlio.io.serializers.gensim import GensimWord2VecModelsSerializer
+from mlio.io.serializers.arrays import NumpyArraySerializer
 
 
 from tests.io_tests.generic import GenericObject
@@ -30,6 +32,27 @@ class IntSerializer(SerializerBase):
         return isinstance(obj, int)
 
 
+class TaggedObjectSerializer(SerializerBase):
+    """
+    Custom serializer declaring its type
+    """
+    @classmethod
+    def serializer_type(cls):
+        return 'tagged-object'
+
+    @classmethod
+    def serializable_types(cls):
+        return '{}.{}'.format(TaggedObject.__module__, TaggedObject.__qualname__),
+
+    @classmethod
+    def can_serialize(cls, obj):
+        return isinstance(obj, TaggedObject)
+
+
+class TaggedObject(object):
+    pass
+
+
 class SerializersRegistryTestCase(unittest.TestCase):
 
     def test_get_serializer_by_id(self):
@@ -63,7 +86,7 @@ class SerializersRegistryTestCase(unittest.TestCase):
         self.assertIs(find_suitable_serializer(obj1k),
                       DefaultSerializer)
         self.assertIs(find_suitable_serializer(np_array),
-                      GenericMLModelsSerializer)
+                      NumpyArraySerializer)
         self.assertIs(find_suitable_serializer(wv_model),
                       GensimWord2VecModelsSerializer)
 
@@ -89,6 +112,33 @@ class SerializersRegistryTestCase(unittest.TestCase):
         self.assertIs(find_suitable_serializer(i),
                       IntSerializer)
 
+    def test_find_suitable_serializer_declared_types(self):
+
+        obj1k = GenericObject(1000)
+        np_array = np.random.rand(10, 20)
+
+        # Serializers that declare other types are skipped without calling them
+        with mock.patch.object(GensimWord2VecModelsSerializer, 'can_serialize') as mocked_gensim_can_serialize, \
+                mock.patch.object(NumpyArraySerializer, 'can_serialize',
+                                  wraps=NumpyArraySerializer.can_serialize) as mocked_numpy_can_serialize:
+            for _ in range(3):
+                self.assertIs(find_suitable_serializer(obj1k), DefaultSerializer)
+                self.assertIs(find_suitable_serializer(np_array), NumpyArraySerializer)
+            self.assertEqual(mocked_gensim_can_serialize.call_count, 0)
+            self.assertEqual(mocked_numpy_can_serialize.call_count, 3)
+
+        # Instances of declared types are still checked one by one
+        self.assertIs(find_suitable_serializer(np.array([obj1k], dtype=object)), GenericMLModelsSerializer)
+
+        # Registering a serializer invalidates the dispatch cache, subclasses of declared types are matched
+        class SubTaggedObject(TaggedObject):
+            pass
+
+        self.assertIs(find_suitable_serializer(SubTaggedObject()), DefaultSerializer)
+        register_serializer(TaggedObjectSerializer)
+        self.assertIs(find_suitable_serializer(SubTaggedObject()), TaggedObjectSerializer)
+        self.assertIs(find_suitable_serializer(obj1k), DefaultSerializer)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,203 @@
+import io as sys_io
+import os
+import hashlib
+import unittest
+import tempfile
+from unittest import mock
+
+import numpy as np
+
+from mlio.io import Pack, VerificationPolicy, load, dump
+from mlio.io.exc import MLIOPackSlotWrongChecksum
+from mlio.io.verification import VerifiedObjectsMemo, PersistentVerifiedObjectsMemo
+from mlio.io.serializers.arrays import ChunkedArraySerializer
+
+from tests.io_tests.generic import ObjectFixturesMixIn
+
+
+class VerificationPolicyTestCase(unittest.TestCase):
+
+    def test_policies(self):
+        memo = VerifiedObjectsMemo()
+        identity = (1, 2, 3, 4, 5, 'sha256', 'ahash')
+
+        self.assertTrue(VerificationPolicy('always').needs_verification(identity))
+        self.assertFalse(VerificationPolicy('never').needs_verification(identity))
+        self.assertFalse(VerificationPolicy('sampled', sample_rate=0).needs_verification(identity))
+        self.assertTrue(VerificationPolicy('sampled', sample_rate=1).needs_verification(identity))
+
+        policy = VerificationPolicy('once-per-process', memo=memo)
+        self.assertTrue(policy.needs_verification(identity))
+        policy.mark_verified(identity)
+        self.assertFalse(policy.needs_verification(identity))
+        self.assertTrue(policy.needs_verification(identity[:-1] + ('otherhash',)))
+        # Objects without identity are always verified
+        policy.mark_verified(None)
+        self.assertTrue(policy.needs_verification(None))
+
+        with self.assertRaises(ValueError):
+            VerificationPolicy('sometimes')
+        with self.assertRaises(ValueError):
+            VerificationPolicy('sampled', sample_rate=2)
+
+    def test_from_value(self):
+        policy = VerificationPolicy('never')
+        self.assertIs(VerificationPolicy.from_value(policy), policy)
+        self.assertEqual(VerificationPolicy.from_value(None).policy, 'always')
+        self.assertEqual(VerificationPolicy.from_value('sampled').policy, 'sampled')
+
+    def test_memo_bounded(self):
+        memo = VerifiedObjectsMemo(max_entries=2)
+        for identity in ['a', 'b', 'a', 'c']:
+            memo.add(identity)
+        self.assertEqual(len(memo), 2)
+        self.assertIn('a', memo)
+        self.assertNotIn('b', memo)
+
+        memo.clear()
+        self.assertEqual(len(memo), 0)
+
+    def test_object_identity(self):
+        self.assertIsNone(VerifiedObjectsMemo.object_identity(sys_io.BytesIO(), 0, 'sha256', 'ahash'))
+
+        with tempfile.TemporaryFile('w+b') as tf:
+            identity = VerifiedObjectsMemo.object_identity(tf, 10, 'sha256', 'ahash')
+            self.assertEqual(identity[-3:], (10, 'sha256', 'ahash'))
+
+            # Modifications of the file change its identity
+            tf.write(b'data')
+            tf.flush()
+            self.assertNotEqual(VerifiedObjectsMemo.object_identity(tf, 10, 'sha256', 'ahash'), identity)
+
+
+class PersistentVerifiedObjectsMemoTestCase(unittest.TestCase):
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'cache', 'verified.jsonl')
+
+            memo = PersistentVerifiedObjectsMemo(path)
+            self.assertEqual(len(memo), 0)
+            memo.add((1, 2, 3, 4, 5, 'sha256', 'ahash'))
+            memo.add((1, 2, 3, 4, 5, 'sha256', 'ahash'))
+            memo.add((1, 2, 3, 4, 6, 'sha256', 'bhash'))
+
+            # An interrupted write leaves a partial line
+            with open(path, 'a') as f:
+                f.write('[1, 2, 3')
+
+            memo = PersistentVerifiedObjectsMemo(path)
+            self.assertEqual(len(memo), 2)
+            self.assertIn((1, 2, 3, 4, 5, 'sha256', 'ahash'), memo)
+
+            memo.clear()
+            self.assertFalse(os.path.exists(path))
+            self.assertEqual(len(PersistentVerifiedObjectsMemo(path)), 0)
+
+    def test_compaction(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'verified.jsonl')
+
+            memo = PersistentVerifiedObjectsMemo(path, max_entries=3)
+            memo.COMPACTION_MIN_LINES = 2
+            for offset in range(10):
+                memo.add((1, 2, 3, 4, offset, 'sha256', 'ahash'))
+
+            with open(path) as f:
+                self.assertLessEqual(len(f.readlines()), 6)
+            memo = PersistentVerifiedObjectsMemo(path, max_entries=3)
+            self.assertIn((1, 2, 3, 4, 9, 'sha256', 'ahash'), memo)
+            self.assertNotIn((1, 2, 3, 4, 0, 'sha256', 'ahash'), memo)
+
+    def test_pack_across_restarts(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pack_path = os.path.join(tmp_dir, 'pack.mlpack')
+            memo_path = os.path.join(tmp_dir, 'verified.jsonl')
+            with open(pack_path, 'w+b') as f:
+                dump({'a': 1}, f)
+
+            with open(pack_path, 'rb') as f:
+                policy = VerificationPolicy('once-per-process', memo=PersistentVerifiedObjectsMemo(memo_path))
+                self.assertEqual(load(f, verification=policy), {'a': 1})
+
+            # A new memo, as in a new process, does not verify again
+            with open(pack_path, 'rb') as f, mock.patch('mlio.io.hashing.Sha256HashAlgorithm.new') as mocked_new:
+                policy = VerificationPolicy('once-per-process', memo=PersistentVerifiedObjectsMemo(memo_path))
+                self.assertEqual(load(f, verification=policy), {'a': 1})
+                self.assertEqual(mocked_new.call_count, 0)
+
+
+class PackVerificationTestCase(ObjectFixturesMixIn, unittest.TestCase):
+
+    def setUp(self):
+        super(PackVerificationTestCase, self).setUp()
+        self.memo = VerifiedObjectsMemo()
+
+    def test_once_per_process(self):
+        array = np.arange(1000).reshape(100, 10)
+
+        with tempfile.NamedTemporaryFile('w+b') as tf:
+            with Pack(tf) as pck:
+                pck.dump('slot1', self.obj1k)
+                pck.dump('chunked', array, serializer=ChunkedArraySerializer(chunk_shape=50))
+
+            policy = VerificationPolicy('once-per-process', memo=self.memo)
+            for _ in range(3):
+                with open(tf.name, 'rb') as f, Pack(f, mode='r', verification=policy) as pck:
+                    self.assertEqualObj1k(pck.load('slot1'))
+                    np.testing.assert_array_equal(pck.load('chunked'), array)
+            # Slot objects and chunks are verified only once
+            self.assertEqual(len(self.memo), 4)
+
+            with open(tf.name, 'rb') as f, Pack(f, mode='r', verification=policy) as pck:
+                with mock.patch('mlio.io.hashing.Sha256HashAlgorithm.new') as mocked_new:
+                    self.assertEqualObj1k(pck.load('slot1'))
+                    np.testing.assert_array_equal(pck.load('chunked'), array)
+                    self.assertEqual(mocked_new.call_count, 0)
+
+            # Changing the pack file invalidates the memo
+            with open(tf.name, 'r+b') as f, Pack(f) as pck:
+                pck.dump('slot2', self.obj2k)
+                with mock.patch('mlio.io.hashing.Sha256HashAlgorithm.new', wraps=hashlib.sha256) as mocked_new:
+                    pck._verification = policy
+                    self.assertEqualObj1k(pck.load('slot1'))
+                    self.assertEqual(mocked_new.call_count, 1)
+
+    def test_never_skips_corrupted_data(self):
+
+        array = np.zeros(100, dtype='uint8')
+
+        with tempfile.NamedTemporaryFile('w+b') as tf:
+            with Pack(tf) as pck:
+                pck.dump('array', array)
+                pack_object = pck.slots_info['array'].pack_object
+                data_end = pck._pack_object_data_offset(pack_object) + pck._pack_objects_index[pack_object].file_size
+
+            # Corrupt the last element of the array
+            with open(tf.name, 'r+b') as f:
+                f.seek(data_end - 1)
+                f.write(b'\x01')
+
+            with open(tf.name, 'rb') as f:
+                with Pack(f, mode='r', verification='never') as pck:
+                    self.assertEqual(pck.load('array')[-1], 1)
+
+                with Pack(f, mode='r') as pck:
+                    with self.assertRaises(MLIOPackSlotWrongChecksum):
+                        pck.load('array')
+
+    def test_compat_load(self):
+
+        with tempfile.NamedTemporaryFile('w+b') as tf:
+            dump(self.obj1k, tf)
+            tf.flush()
+
+            policy = VerificationPolicy('once-per-process', memo=self.memo)
+            with open(tf.name, 'rb') as f:
+                self.assertEqualObj1k(load(f, verification=policy))
+                self.assertEqualObj1k(load(f, verification=policy))
+            self.assertEqual(len(self.memo), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()